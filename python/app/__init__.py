@@ -1,3 +1,6 @@
+from datetime import datetime, timedelta, timezone
+
+import click
 from flask import Flask
 from .config import Config
 from .extensions import db, migrate
@@ -6,7 +9,7 @@ from .seed import seed
 import logging
 
 
-def create_app():
+def create_app(config_overrides: dict | None = None):
     """App-Factory: erstellt und konfiguriert die Flask-Anwendung (DB, Routes, CLI)."""
     logging.basicConfig(
         level=logging.INFO,
@@ -15,6 +18,8 @@ def create_app():
 
     flask_app = Flask(__name__)
     flask_app.config.from_object(Config)  # Config (z. B. DB-URI) laden
+    if config_overrides:
+        flask_app.config.update(config_overrides)  # z. B. SQLite-URI für Benchmarks
 
     db.init_app(flask_app)               # SQLAlchemy an Flask hängen
     migrate.init_app(flask_app, db)      # Alembic/Flask-Migrate initialisieren
@@ -22,9 +27,120 @@ def create_app():
     @flask_app.cli.command("seed")
     def seed_command():
         """CLI-Befehl: flask seed -> füllt die Datenbank mit Seed-Daten."""
+        from .models.services import rebuild_rollups
+
         seed()
+        rebuild_rollups(datetime.now(timezone.utc) - timedelta(days=1))  # Rollups für die Demo-Daten
         print("Seed complete")
 
+    @flask_app.cli.command("rollups-rebuild")
+    @click.option("--days", default=30, show_default=True, help="Zeitraum in Tagen, der neu aggregiert wird")
+    def rollups_rebuild_command(days):
+        """CLI-Befehl: flask rollups-rebuild -> baut die Rollups aus den Rohdaten neu auf."""
+        from .models.services import rebuild_rollups
+
+        count = rebuild_rollups(datetime.now(timezone.utc) - timedelta(days=days))
+        print(f"Rebuilt {count} rollup buckets")
+
+    @flask_app.cli.command("device-token")
+    @click.argument("device_key")
+    @click.option("--room", "room", default="", help="Raum (Slug oder ID, Standard: Standardraum)")
+    @click.option("--name", default=None, help="Anzeigename des Knotens")
+    def device_token_command(device_key, room, name):
+        """CLI-Befehl: flask device-token <key> -> legt einen Sensor-Knoten an und gibt ein neues API-Token aus."""
+        from .models.services import issue_device_token, room_registry
+
+        settings = room_registry().resolve(room)
+        if settings is None:
+            raise click.BadParameter(f"Unbekannter Raum: {room}", param_hint="--room")
+        token = issue_device_token(device_key, settings.room_id, name=name)
+        print(f"Device {device_key} (Raum {settings.slug}): {token}")
+        print("Das Token wird nur jetzt angezeigt; ein erneuter Aufruf ersetzt es.")
+
+    @flask_app.cli.command("sample-sensors")
+    @click.option("--hz", type=float, default=None, help="Abtastrate in Hz (Standard: SAMPLER_HZ bzw. 1.0)")
+    @click.option("--emit-seconds", type=float, default=None, help="Intervall der gespeicherten Aggregate (Standard: SAMPLER_EMIT_SECONDS bzw. 60)")
+    def sample_sensors_command(hz, emit_seconds):
+        """CLI-Befehl: flask sample-sensors -> liest den BME680 dauerhaft und speichert geglättete Aggregate."""
+        import dataclasses
+        import signal
+        import threading
+
+        from .logic.sampler import get_sampler_config, run_sampler
+        from .logic.sensor_backends import read_sensor_data  # öffnet den Sensor einmal für die gesamte Laufzeit
+        from .tasks.tasks import record_reading
+
+        config = get_sampler_config()
+        if hz is not None:
+            config = dataclasses.replace(config, hz=hz)
+        if emit_seconds is not None:
+            config = dataclasses.replace(config, emit_seconds=emit_seconds)
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())  # sauber beenden, letztes Aggregat noch speichern
+
+        def emit(aggregate):
+            result = record_reading(aggregate["temperature"], aggregate["humidity"], aggregate["voc"], aggregate["motion"])
+            logging.getLogger(__name__).info(
+                "Sampler aggregate: samples=%s temp=%.2f hum=%.2f voc=%.0f persons=%s status=%s",
+                aggregate["samples"], aggregate["temperature"], aggregate["humidity"], aggregate["voc"],
+                result["persons"], result["status"],
+            )
+
+        print(f"Sampling at {config.hz} Hz, emitting every {config.emit_seconds}s")
+        run_sampler(read_sensor_data, emit, config, stop)
+
+    @flask_app.cli.command("motion-events")
+    @click.option("--reconcile-seconds", type=float, default=30.0, show_default=True, help="Abgleich mit dem PIR-Pegel (verpasste Flanken)")
+    def motion_events_command(reconcile_seconds):
+        """CLI-Befehl: flask motion-events -> startet Aufnahmen direkt über GPIO-Flanken des PIR (ohne Beat-Polling)."""
+        import signal
+        import threading
+
+        from .celery_app import celery
+        from .extensions.redis_client import get_redis
+        from .logic.motion_events import MotionEventService
+        from .logic import sensor_backends
+        from .logic.rpi import motion_sensor_infrared
+        from .tasks.tasks import MOTION_ACTIVE_KEY
+
+        redis_client = get_redis()
+        service = MotionEventService(
+            redis_client,
+            # Steigende Flanke: Aufnahme sofort an den Worker; veraltete Trigger verfallen
+            on_rising=lambda: celery.send_task("videos.capture_on_motion", kwargs={"motion": True}, expires=30),
+            # Fallende Flanke: Bewegungsphase beenden, die nächste Bewegung darf wieder aufnehmen
+            on_falling=lambda: redis_client.delete(MOTION_ACTIVE_KEY),
+            read_level=sensor_backends.motion_detected,
+        )
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        print("Watching PIR edges")
+        try:
+            service.run(motion_sensor_infrared.watch_edges, stop, reconcile_seconds=reconcile_seconds)
+        finally:
+            motion_sensor_infrared.stop_watching()
+
+    @flask_app.cli.command("camera-ring")
+    def camera_ring_command():
+        """CLI-Befehl: flask camera-ring -> nimmt dauerhaft in den Pre-Roll-Ringpuffer auf (VIDEO_CAPTURE_MODE=continuous)."""
+        import signal
+        import threading
+
+        from .logic.rpi.camera_ring_buffer import get_ring_buffer_config, run_ring_recorder
+
+        config = get_ring_buffer_config()
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        print(f"Recording {config.ring_seconds}s ring buffer to {config.directory}")
+        run_ring_recorder(config, stop)
+
     # Models im App-Context importieren, damit SQLAlchemy sie kennt
     with flask_app.app_context():
         from . import models  # noqa: F401
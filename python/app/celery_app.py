@@ -1,6 +1,7 @@
 import os
 from celery import Celery
 from app import create_app
+from app.logic.metrics import connect_celery_signals
 from celery.schedules import crontab
 
 
@@ -19,21 +20,23 @@ def make_celery() -> Celery:
         timezone=os.getenv("TZ", "Europe/Berlin"),
         enable_utc=True,
         imports=("app.tasks.tasks",),
+        # Uploads (und Vorschaubilder) in eigener Queue: ein separater Worker mit begrenzter Parallelität
+        # arbeitet sie ab, ohne Aufnahmen und Messwerte im Standard-Worker auszubremsen.
+        task_routes={
+            "videos.upload": {"queue": "uploads"},
+            "videos.thumbnails": {"queue": "uploads"},
+        },
     )
 
     celery.autodiscover_tasks(["app.tasks"])
+    connect_celery_signals()  # Task-Laufzeiten für /metrics
 
     # Zeitgesteuerte Jobs (Celery Beat)
     celery.conf.beat_schedule = {
-        "read-measurements": {  # alle 5 Minuten Messwerte lesen
-            "task": "measurements.read_job",
-            "schedule": crontab(minute="*/5"),
-            "args": (),
-        },
-        "capture-video-on-motion": {  # jede Sekunde Bewegung prüfen und ggf. ein Video speichern
-            "task": "videos.capture_on_motion",
-            "schedule": 1.0,
-            "options": {"expires": 1},
+        "requeue-pending-video-uploads": {  # verlorene Upload-Tasks für Clips im Spool neu einstellen
+            "task": "videos.requeue_pending_uploads",
+            "schedule": crontab(minute="*/10"),
+            "kwargs": {"older_than_minutes": 30},
         },
         "delete-old-measurements-daily": {  # täglich um 03:00 alte Daten löschen
             "task": "measurements.delete_old",
@@ -42,6 +45,30 @@ def make_celery() -> Celery:
         },
     }
 
+    # Nur im gepufferten Modus gibt es etwas zu schreiben; im Standardmodus (direct) kein Flush alle paar Sekunden
+    if os.getenv("MEASUREMENT_INGEST_MODE", "direct").lower() == "buffered":
+        celery.conf.beat_schedule["flush-measurement-buffer"] = {  # gepufferte Messwerte gesammelt schreiben
+            "task": "measurements.flush_buffer",
+            "schedule": float(os.getenv("INGEST_FLUSH_INTERVAL_SECONDS", "5")),
+            "options": {"expires": 30},
+        }
+
+    # Läuft der Sampler (`flask sample-sensors`), liest er den Sensor selbst; sonst alle 5 Minuten per Beat
+    if os.getenv("SENSOR_SAMPLER_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        celery.conf.beat_schedule["read-measurements"] = {  # alle 5 Minuten Messwerte lesen
+            "task": "measurements.read_job",
+            "schedule": crontab(minute="*/5"),
+            "args": (),
+        }
+
+    # Mit dem Bewegungsdienst (`flask motion-events`) lösen GPIO-Flanken die Aufnahme aus; sonst Polling
+    if os.getenv("MOTION_EVENTS_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        celery.conf.beat_schedule["capture-video-on-motion"] = {  # jede Sekunde Bewegung prüfen und ggf. ein Video speichern
+            "task": "videos.capture_on_motion",
+            "schedule": 1.0,
+            "options": {"expires": 1},
+        }
+
     class ContextTask(celery.Task):
         """Sorgt dafür, dass jeder Task innerhalb des Flask-App-Context läuft."""
         def __call__(self, *args, **kwargs):
@@ -1,2 +1,3 @@
 from .db import db          # DB-Extension (SQLAlchemy Instanz)
-from .migrate import migrate  # Migration-Extension (Flask-Migrate Instanz)
\ No newline at end of file
+from .migrate import migrate  # Migration-Extension (Flask-Migrate Instanz)
+from .redis_client import get_redis  # gemeinsamer Redis-Client (Broker-URL)
\ No newline at end of file
@@ -0,0 +1,10 @@
+import os
+from functools import lru_cache
+
+from redis import Redis
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> Redis:
+    """Gemeinsamer Redis-Client pro Prozess (eigener Connection-Pool, gleiche URL wie der Celery-Broker)."""
+    return Redis.from_url(os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"), decode_responses=True)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Dict
+import bisect
+import math
+
+from app.logic.occupancy_estimator import Baseline
+
+
+class RollingMedian:
+    """Gleitender Median über die letzten `size` Werte (sortiertes Fenster per bisect, Speicher fest auf `size`).
+
+    Einfügen und Entfernen kosten O(size) für das Verschieben im Array; bei Fenstern von einigen hundert
+    Werten ist das schneller und vorhersehbarer als Heaps mit verzögertem Löschen.
+    """
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("size muss > 0 sein")
+        self.size = size
+        self._window: deque[float] = deque()  # Reihenfolge des Eintreffens (zum Entfernen des ältesten Werts)
+        self._sorted: list[float] = []        # dieselben Werte, aufsteigend sortiert
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def push(self, value: float) -> None:
+        """Fügt einen Wert hinzu; bei vollem Fenster fällt der älteste heraus."""
+        value = float(value)
+        if math.isnan(value):
+            raise ValueError("NaN kann nicht in den Median eingehen")
+
+        self._window.append(value)
+        bisect.insort(self._sorted, value)
+        if len(self._window) > self.size:
+            oldest = self._window.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+
+    def median(self) -> float:
+        """Median wie statistics.median(): bei gerader Anzahl Mittelwert der beiden mittleren Werte."""
+        if not self._sorted:
+            raise ValueError("Median eines leeren Fensters ist undefiniert")
+        mid = len(self._sorted) // 2
+        if len(self._sorted) % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+    def values(self) -> list[float]:
+        """Aktueller Fensterinhalt (älteste zuerst), z. B. zum Persistieren."""
+        return list(self._window)
+
+
+class BaselineTracker:
+    """Streaming-Baseline: Median von Temperatur, Feuchte und Gas über ein gleitendes Fenster nach Warmup.
+
+    Entspricht calculate_baseline_from_window(), wird aber Messwert für Messwert gefüttert und folgt
+    so langsamer Sensor-Drift. Der Zustand lässt sich als JSON-fähiges Dict sichern und wiederherstellen.
+    """
+
+    STATE_VERSION = 1
+
+    def __init__(self, *, warmup_count: int = 30, window_count: int = 60):
+        if window_count <= 0:
+            raise ValueError("window_count muss > 0 sein")
+        if warmup_count < 0:
+            raise ValueError("warmup_count muss >= 0 sein")
+        self.warmup_count = warmup_count
+        self.window_count = window_count
+        self.seen = 0  # Anzahl aller bisher gefütterten Samples (inkl. Warmup)
+        self._temps = RollingMedian(window_count)
+        self._rhs = RollingMedian(window_count)
+        self._gases = RollingMedian(window_count)
+
+    @property
+    def ready(self) -> bool:
+        """True, sobald Warmup vorbei und das Fenster vollständig gefüllt ist."""
+        return len(self._temps) >= self.window_count
+
+    def update(self, temperature_c: float, rh_percent: float, gas_resistance_ohm: float) -> Baseline | None:
+        """Füttert einen Messwert ein und gibt die aktuelle Baseline zurück (None während Warmup/Aufbau)."""
+        self.seen += 1
+        if self.seen > self.warmup_count:
+            self._temps.push(temperature_c)
+            self._rhs.push(rh_percent)
+            self._gases.push(gas_resistance_ohm)
+        return self.baseline()
+
+    def baseline(self) -> Baseline | None:
+        """Aktuelle Baseline aus den gleitenden Medianen (oder None, solange das Fenster nicht voll ist)."""
+        if not self.ready:
+            return None
+        return Baseline(
+            temperature_c=float(self._temps.median()),
+            rh_percent=float(self._rhs.median()),
+            gas_resistance_ohm=float(self._gases.median()),
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialisiert den Zustand (Fensterinhalt + Zähler) für Redis/Datei."""
+        return {
+            "version": self.STATE_VERSION,
+            "warmup_count": self.warmup_count,
+            "window_count": self.window_count,
+            "seen": self.seen,
+            "window": [list(row) for row in zip(self._temps.values(), self._rhs.values(), self._gases.values())],
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        *,
+        warmup_count: int | None = None,
+        window_count: int | None = None,
+    ) -> BaselineTracker:
+        """Stellt einen Tracker aus to_state() wieder her; bei kleinerem Fenster bleiben die neuesten Werte."""
+        if state.get("version") != cls.STATE_VERSION:
+            raise ValueError(f"Unbekannte Baseline-State-Version: {state.get('version')!r}")
+
+        tracker = cls(
+            warmup_count=state["warmup_count"] if warmup_count is None else warmup_count,
+            window_count=state["window_count"] if window_count is None else window_count,
+        )
+        tracker.seen = int(state["seen"])
+        for t, rh, gas in state["window"][-tracker.window_count:]:
+            tracker._temps.push(t)
+            tracker._rhs.push(rh)
+            tracker._gases.push(gas)
+        return tracker
@@ -0,0 +1,185 @@
+"""Batch-Ingest für entfernte Sensor-Knoten: Token-Prüfung und Dekodieren von NDJSON/MessagePack (optional gzip).
+
+Ein Knoten puffert Rohmessungen lokal und schickt sie gesammelt an POST /api/measurements/batch. Jede Zeile
+enthält `temperature`, `humidity`, `voc`, optional `motion` (bzw. `radar`) und `timestamp` (ISO-8601 oder
+Unix-Sekunden; fehlt er, gilt der Empfangszeitpunkt). Die Personenschätzung passiert erst auf dem Server.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import math
+import os
+import secrets
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+class BatchFormatError(ValueError):
+    """Batch ist als Ganzes nicht lesbar (Kodierung, Größe, Format); einzelne kaputte Zeilen werden nur verworfen."""
+
+
+class UnsupportedBatchType(BatchFormatError):
+    """Content-Type/-Encoding wird nicht unterstützt (oder msgpack ist nicht installiert)."""
+
+
+@dataclass(frozen=True)
+class BatchIngestConfig:
+    """Obergrenzen pro Anfrage und erlaubte Uhrabweichung der Knoten."""
+    max_rows: int = 5000
+    max_bytes: int = 8 * 1024 * 1024
+    max_clock_skew_seconds: float = 300.0
+
+
+def get_batch_ingest_config() -> BatchIngestConfig:
+    """Liest die Konfiguration aus der Umgebung (INGEST_API_MAX_ROWS, INGEST_API_MAX_BYTES, INGEST_API_MAX_CLOCK_SKEW_SECONDS)."""
+    return BatchIngestConfig(
+        max_rows=max(1, int(os.getenv("INGEST_API_MAX_ROWS", "5000"))),
+        max_bytes=max(1024, int(os.getenv("INGEST_API_MAX_BYTES", str(8 * 1024 * 1024)))),
+        max_clock_skew_seconds=float(os.getenv("INGEST_API_MAX_CLOCK_SKEW_SECONDS", "300")),
+    )
+
+
+def generate_token() -> str:
+    """Neues zufälliges API-Token für einen Knoten (Klartext wird nur einmal ausgegeben)."""
+    return secrets.token_urlsafe(32)
+
+
+def hash_token(token: str) -> str:
+    """SHA-256 (hex) eines Tokens; nur dieser Wert liegt in der DB."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def bearer_token(authorization: str | None) -> str | None:
+    """Token aus einem `Authorization: Bearer <token>`-Header (None, wenn keiner oder falsches Schema)."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def _decompress(body: bytes, content_encoding: str, max_bytes: int) -> bytes:
+    """Entpackt gzip/deflate mit harter Größengrenze (schützt vor Dekompressionsbomben)."""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding not in ("gzip", "x-gzip", "deflate"):
+        raise UnsupportedBatchType(f"Content-Encoding {encoding} wird nicht unterstützt")
+
+    wbits = 16 + zlib.MAX_WBITS if encoding != "deflate" else zlib.MAX_WBITS
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        data = decompressor.decompress(body, max_bytes + 1)
+    except zlib.error as exc:
+        raise BatchFormatError(f"Batch lässt sich nicht entpacken: {exc}") from exc
+    if len(data) > max_bytes or decompressor.unconsumed_tail:
+        raise BatchFormatError(f"Batch ist entpackt größer als {max_bytes} Bytes")
+    return data
+
+
+def _decode_records(data: bytes, content_type: str) -> Iterable[Any]:
+    """Zerlegt den entpackten Body in einzelne Datensätze (Fehler pro Zeile bleiben am Datensatz hängen)."""
+    mimetype = (content_type or "").split(";", 1)[0].strip().lower()
+    if mimetype in NDJSON_TYPES:
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield exc
+        return
+
+    if mimetype in MSGPACK_TYPES:
+        try:
+            import msgpack
+        except ImportError as exc:
+            raise UnsupportedBatchType("MessagePack ist auf diesem Server nicht installiert") from exc
+
+        # Ein Array von Maps oder ein Strom einzelner Maps; Timestamp-Extension wird zu datetime
+        unpacker = msgpack.Unpacker(raw=False, timestamp=3, max_buffer_size=len(data) or 1)
+        unpacker.feed(data)
+        try:
+            items = list(unpacker)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise BatchFormatError(f"MessagePack ist ungültig: {exc}") from exc
+        if len(items) == 1 and isinstance(items[0], list):
+            items = items[0]
+        yield from items
+        return
+
+    raise UnsupportedBatchType(f"Content-Type {mimetype or '-'} wird nicht unterstützt (NDJSON oder MessagePack)")
+
+
+def _timestamp(value: Any, now: datetime) -> datetime:
+    """Messzeitpunkt aus ISO-String, Unix-Sekunden oder datetime; naive Werte gelten als UTC."""
+    if value is None:
+        return now
+    if isinstance(value, datetime):
+        timestamp = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        timestamp = datetime.fromtimestamp(float(value), timezone.utc)
+    elif isinstance(value, str):
+        timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    else:
+        raise ValueError("timestamp muss ISO-8601 oder Unix-Sekunden sein")
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def _reading(record: Any, now: datetime, max_skew: timedelta) -> Dict[str, Any]:
+    """Prüft einen Datensatz und normalisiert ihn auf die Spalten der measurements-Tabelle (ohne persons)."""
+    if isinstance(record, Exception):
+        raise ValueError(f"ungültiges JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("Datensatz muss ein Objekt sein")
+
+    values = {}
+    for name in ("temperature", "humidity", "voc"):
+        value = record.get(name)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{name} fehlt oder ist keine endliche Zahl")
+        values[name] = float(value)
+
+    timestamp = _timestamp(record.get("timestamp"), now)
+    if timestamp - now > max_skew:
+        raise ValueError("timestamp liegt in der Zukunft")
+
+    return {
+        "timestamp": timestamp,
+        **values,
+        "radar": bool(record.get("motion", record.get("radar", False))),
+    }
+
+
+def parse_batch(
+    body: bytes,
+    *,
+    content_type: str,
+    content_encoding: str = "",
+    config: BatchIngestConfig,
+    now: datetime | None = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Dekodiert einen Batch und gibt (gültige Messungen, verworfene Zeilen mit Index und Grund) zurück.
+
+    Jede Messung behält unter "index" ihre Zeilennummer im Batch, damit spätere Prüfungen sie melden können.
+    Einzelne kaputte Zeilen blockieren den Rest nicht; ein unlesbarer oder zu großer Batch wirft BatchFormatError.
+    """
+    now = now or datetime.now(timezone.utc)
+    max_skew = timedelta(seconds=config.max_clock_skew_seconds)
+    data = _decompress(body, content_encoding, config.max_bytes)
+
+    readings, rejected = [], []
+    for index, record in enumerate(_decode_records(data, content_type)):
+        if index >= config.max_rows:
+            raise BatchFormatError(f"Batch hat mehr als {config.max_rows} Zeilen")
+        try:
+            readings.append({"index": index, **_reading(record, now, max_skew)})
+        except (TypeError, ValueError, OverflowError) as exc:
+            rejected.append({"index": index, "error": str(exc)})
+    return readings, rejected
@@ -0,0 +1,65 @@
+"""Antwort-Cache für /api/dashboard: Datenversion (neueste Messungs-ID) in Redis, Payload als fertiges JSON."""
+from __future__ import annotations
+import hashlib
+import os
+
+from redis import Redis
+
+from app.logic.rooms import DEFAULT_ROOM_ID
+
+VERSION_KEY = "dashboard:version"
+PAYLOAD_KEY_PREFIX = "dashboard:payload:"
+
+# Setzt die Version nur, wenn die neue ID größer ist (parallele Commits dürfen sie nicht zurückdrehen).
+# KEYS: version; ARGV: measurement_id
+_BUMP_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tonumber(ARGV[1]) > current then
+  redis.call('SET', KEYS[1], ARGV[1])
+  return 1
+end
+return 0
+"""
+
+
+def cache_ttl_seconds() -> int:
+    """Lebensdauer eines gecachten Payloads; begrenzt auch, wie lange das gleitende 24h-Fenster stehen bleibt."""
+    return int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "300"))
+
+
+def version_key(room_id: int = DEFAULT_ROOM_ID) -> str:
+    """Redis-Key der Datenversion eines Raums (der Standardraum behält den bisherigen Key)."""
+    return VERSION_KEY if room_id == DEFAULT_ROOM_ID else f"{VERSION_KEY}:{room_id}"
+
+
+def bump_version(redis_client: Redis, measurement_id: int, *, room_id: int = DEFAULT_ROOM_ID) -> None:
+    """Markiert neue Daten eines Raums: alle bisherigen ETags und Payloads des Raums werden damit ungültig."""
+    redis_client.eval(_BUMP_SCRIPT, 1, version_key(room_id), int(measurement_id))
+
+
+def get_version(redis_client: Redis, *, room_id: int = DEFAULT_ROOM_ID) -> str | None:
+    """Aktuelle Datenversion eines Raums (None, wenn Redis sie nicht kennt, z. B. nach einem Neustart)."""
+    return redis_client.get(version_key(room_id))
+
+
+def seed_version(redis_client: Redis, measurement_id: int | None, *, room_id: int = DEFAULT_ROOM_ID) -> str:
+    """Initialisiert die Version aus der DB, ohne eine inzwischen neuere Version zu überschreiben."""
+    bump_version(redis_client, measurement_id or 0, room_id=room_id)
+    return get_version(redis_client, room_id=room_id) or "0"
+
+
+def make_etag(version: str, *params: object, now: float) -> str:
+    """ETag aus Datenversion, Anfrage-Parametern und Zeit-Bucket (das 24h-Fenster wandert auch ohne neue Daten)."""
+    ttl = max(1, cache_ttl_seconds())
+    raw = ":".join(str(part) for part in (version, *params, int(now // ttl)))
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def get_payload(redis_client: Redis, etag: str) -> str | None:
+    """Gecachtes JSON für einen ETag."""
+    return redis_client.get(PAYLOAD_KEY_PREFIX + etag)
+
+
+def store_payload(redis_client: Redis, etag: str, body: str) -> None:
+    """Legt fertiges JSON unter dem ETag ab; alte Versionen laufen über die TTL aus."""
+    redis_client.set(PAYLOAD_KEY_PREFIX + etag, body, ex=max(1, cache_ttl_seconds()) * 2)
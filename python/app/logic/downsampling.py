@@ -0,0 +1,73 @@
+"""Reduziert Zeitreihen für Charts auf eine begrenzte Punktzahl, ohne Spitzen zu verlieren."""
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: wählt `threshold` repräsentative Punkte (Indizes, aufsteigend).
+
+    Erster und letzter Punkt bleiben immer erhalten; pro Bucket wird der Punkt gewählt, der mit dem
+    zuletzt gewählten Punkt und dem Mittelwert des nächsten Buckets das größte Dreieck bildet.
+    Erwartet nach x sortierte Daten.
+    """
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return np.arange(n)
+    if threshold <= 2:
+        return np.array([0, n - 1])
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        # Mittelwert des nächsten Buckets als dritter Eckpunkt
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        # Kandidaten im aktuellen Bucket
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[range_start:range_end] - y[a])
+            - (x[a] - x[range_start:range_end]) * (avg_y - y[a])
+        )
+        a = range_start + int(area.argmax())
+        selected[i + 1] = a
+
+    selected[-1] = n - 1
+    return selected
+
+
+def bucket_aggregate(x: np.ndarray, y: np.ndarray, width: float) -> Dict[str, np.ndarray]:
+    """Fasst Punkte in feste x-Intervalle (z. B. Sekunden) zusammen: Start, min, max, avg pro Bucket.
+
+    Erwartet nach x sortierte Daten; leere Intervalle erscheinen nicht im Ergebnis.
+    """
+    if width <= 0:
+        raise ValueError("width muss > 0 sein")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.size == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {"start": empty, "min": empty, "max": empty, "avg": empty, "count": np.empty(0, dtype=np.int64)}
+
+    keys = np.floor(x / width) * width
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])  # erster Index je Bucket
+    counts = np.diff(np.r_[starts, x.size])
+
+    return {
+        "start": keys[starts],
+        "min": np.minimum.reduceat(y, starts),
+        "max": np.maximum.reduceat(y, starts),
+        "avg": np.add.reduceat(y, starts) / counts,
+        "count": counts,
+    }
@@ -0,0 +1,195 @@
+"""Gepufferte Messwert-Erfassung: Samples landen in einer Redis-Liste und werden gesammelt in die DB geschrieben.
+
+Ablauf (Reliable Queue):
+1. enqueue() hängt ein Sample (JSON, inkl. Messzeitpunkt) an QUEUE_KEY an.
+2. claim() verschiebt atomar bis zu N Samples nach PROCESSING_KEY und vergibt eine Batch-ID. Liegt dort
+   noch ein Batch eines abgestürzten Flushers, wird zuerst dieser (mit derselben ID) erneut geliefert.
+3. Der Flusher schreibt Samples und Batch-ID in einer Transaktion; existiert die ID schon in der DB,
+   war der Batch bereits geschrieben (Absturz zwischen Commit und ack) und wird nur bestätigt.
+4. Nach dem DB-Commit entfernt ack() den Batch aus PROCESSING_KEY.
+5. Scheitert derselbe Batch wiederholt an den Daten (nicht an der Verbindung), verschiebt dead_letter() ihn
+   nach DEAD_LETTER_KEY, damit er neue Samples nicht dauerhaft blockiert.
+
+Bis zum ack() bleibt jedes Sample in Redis; mit AOF-Persistenz übersteht der Puffer auch einen Redis-Neustart.
+Ist max_queue_rows gesetzt, verwirft enqueue() die ältesten Samples, statt den Puffer unbegrenzt wachsen zu lassen.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from redis import Redis
+
+from app.logic.rooms import DEFAULT_ROOM_ID
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "measurements:ingest"
+PROCESSING_KEY = "measurements:ingest:processing"
+BATCH_ID_KEY = "measurements:ingest:batch-id"
+FLUSH_LOCK_KEY = "measurements:ingest:flush-lock"
+ATTEMPTS_KEY = "measurements:ingest:attempts"
+DEAD_LETTER_KEY = "measurements:ingest:dead-letter"
+
+# Obergrenze pro Batch (Lua-unpack und Paketgröße des INSERT bleiben klein)
+MAX_BATCH_ROWS = 5000
+
+# Liefert einen offenen Batch erneut (recovered = 1) oder verschiebt bis zu ARGV[1] neue Samples.
+# KEYS: queue, processing, batch_id; ARGV: max_rows, neue Batch-ID
+_CLAIM_SCRIPT = """
+local pending = redis.call('LRANGE', KEYS[2], 0, -1)
+if #pending > 0 then
+  return {1, redis.call('GET', KEYS[3]) or '', pending}
+end
+local batch = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #batch == 0 then
+  return {0, '', batch}
+end
+redis.call('RPUSH', KEYS[2], unpack(batch))
+redis.call('LTRIM', KEYS[1], #batch, -1)
+redis.call('SET', KEYS[3], ARGV[2])
+return {0, ARGV[2], batch}
+"""
+
+# Verschiebt den offenen Batch ans Ende der Dead-Letter-Liste und gibt PROCESSING_KEY frei.
+# KEYS: processing, dead_letter, batch_id, attempts
+_DEAD_LETTER_SCRIPT = """
+local batch = redis.call('LRANGE', KEYS[1], 0, -1)
+if #batch > 0 then
+  redis.call('RPUSH', KEYS[2], unpack(batch))
+end
+redis.call('DEL', KEYS[1], KEYS[3], KEYS[4])
+return #batch
+"""
+
+
+@dataclass(frozen=True)
+class IngestConfig:
+    """Flush-Schwellen, Versuche bis zur Dead-Letter-Liste und Obergrenze des Puffers (0 = unbegrenzt)."""
+    max_rows: int = 500
+    max_age_seconds: float = 10.0
+    max_attempts: int = 3
+    max_queue_rows: int = 0
+
+
+def get_ingest_config() -> IngestConfig:
+    """Liest die Konfiguration aus der Umgebung (INGEST_FLUSH_MAX_ROWS, INGEST_FLUSH_MAX_AGE_SECONDS,
+    INGEST_FLUSH_MAX_ATTEMPTS, INGEST_BUFFER_MAX_ROWS)."""
+    return IngestConfig(
+        max_rows=max(1, int(os.getenv("INGEST_FLUSH_MAX_ROWS", "500"))),
+        max_age_seconds=float(os.getenv("INGEST_FLUSH_MAX_AGE_SECONDS", "10")),
+        max_attempts=max(1, int(os.getenv("INGEST_FLUSH_MAX_ATTEMPTS", "3"))),
+        max_queue_rows=max(0, int(os.getenv("INGEST_BUFFER_MAX_ROWS", "0"))),
+    )
+
+
+def encode_sample(
+    *,
+    temperature: float,
+    humidity: float,
+    voc: float,
+    persons: int,
+    radar: bool,
+    room_id: int = DEFAULT_ROOM_ID,
+    timestamp: datetime | None = None,
+) -> str:
+    """Serialisiert ein Sample; der Zeitstempel wird beim Messen gesetzt, nicht erst beim Flush."""
+    timestamp = timestamp or datetime.now(timezone.utc)
+    return json.dumps({
+        "timestamp": timestamp.isoformat(),
+        "temperature": float(temperature),
+        "humidity": float(humidity),
+        "voc": float(voc),
+        "persons": int(persons),
+        "radar": bool(radar),
+        "room_id": int(room_id),
+    }, separators=(",", ":"))
+
+
+def decode_sample(raw: str) -> Dict[str, Any]:
+    """Gegenstück zu encode_sample(): Dict mit Spaltennamen der measurements-Tabelle."""
+    sample = json.loads(raw)
+    sample["timestamp"] = datetime.fromisoformat(sample["timestamp"])
+    sample.setdefault("room_id", DEFAULT_ROOM_ID)  # Einträge aus der Zeit vor den Räumen
+    return sample
+
+
+def enqueue(redis_client: Redis, raw_sample: str, *, max_length: int = 0) -> int:
+    """Hängt ein kodiertes Sample an den Puffer an und gibt die neue Pufferlänge zurück.
+
+    Mit `max_length` > 0 bleiben nur die neuesten `max_length` Samples erhalten (z. B. bei langem DB-Ausfall).
+    """
+    if max_length <= 0:
+        return redis_client.rpush(QUEUE_KEY, raw_sample)
+    pipe = redis_client.pipeline()
+    pipe.rpush(QUEUE_KEY, raw_sample)
+    pipe.ltrim(QUEUE_KEY, -max_length, -1)
+    length, _ = pipe.execute()
+    if length > max_length:
+        logger.warning("Ingest buffer full: dropped %s oldest samples", length - max_length)
+    return min(length, max_length)
+
+
+def pending_count(redis_client: Redis) -> int:
+    """Anzahl noch nicht geschriebener Samples (Puffer + offener Batch)."""
+    return redis_client.llen(QUEUE_KEY) + redis_client.llen(PROCESSING_KEY)
+
+
+def should_flush(redis_client: Redis, config: IngestConfig, *, now: float | None = None) -> bool:
+    """True, wenn genug Samples gesammelt sind, das älteste zu alt ist oder ein Batch offen liegt."""
+    if redis_client.llen(PROCESSING_KEY):
+        return True
+    length = redis_client.llen(QUEUE_KEY)
+    if length == 0:
+        return False
+    if length >= config.max_rows:
+        return True
+
+    oldest = redis_client.lindex(QUEUE_KEY, 0)
+    if oldest is None:
+        return False
+    try:
+        age = (now or time.time()) - decode_sample(oldest)["timestamp"].timestamp()
+    except (KeyError, TypeError, ValueError):
+        return True  # kaputter Eintrag: flushen, damit er verworfen wird und nicht den Puffer blockiert
+    return age >= config.max_age_seconds
+
+
+@dataclass(frozen=True)
+class ClaimedBatch:
+    """Reservierter Batch: ID (für idempotentes Schreiben), kodierte Samples, erneut geliefert ja/nein."""
+    batch_id: str
+    samples: List[str]
+    recovered: bool
+
+
+def claim(redis_client: Redis, max_rows: int) -> ClaimedBatch:
+    """Reserviert einen Batch; ein nach Absturz offener Batch wird zuerst und mit derselben ID geliefert."""
+    max_rows = max(1, min(max_rows, MAX_BATCH_ROWS))
+    recovered, batch_id, samples = redis_client.eval(
+        _CLAIM_SCRIPT, 3, QUEUE_KEY, PROCESSING_KEY, BATCH_ID_KEY, max_rows, uuid4().hex
+    )
+    return ClaimedBatch(batch_id=batch_id or uuid4().hex, samples=list(samples), recovered=bool(recovered))
+
+
+def ack(redis_client: Redis) -> None:
+    """Bestätigt den geschriebenen Batch (erst nach dem DB-Commit aufrufen)."""
+    redis_client.delete(PROCESSING_KEY, BATCH_ID_KEY, ATTEMPTS_KEY)
+
+
+def record_failure(redis_client: Redis, batch_id: str) -> int:
+    """Zählt einen fehlgeschlagenen Schreibversuch des Batches und gibt die bisherige Anzahl zurück."""
+    return int(redis_client.hincrby(ATTEMPTS_KEY, batch_id, 1))
+
+
+def dead_letter(redis_client: Redis) -> int:
+    """Verschiebt den offenen Batch nach DEAD_LETTER_KEY (statt ack) und gibt die Anzahl der Samples zurück.
+
+    Zum erneuten Einspielen nach einer Korrektur: Einträge per LMOVE zurück nach QUEUE_KEY schieben.
+    """
+    return int(redis_client.eval(_DEAD_LETTER_SCRIPT, 4, PROCESSING_KEY, DEAD_LETTER_KEY, BATCH_ID_KEY, ATTEMPTS_KEY))
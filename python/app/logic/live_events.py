@@ -0,0 +1,39 @@
+"""Live-Events fürs Dashboard: Fan-out über Redis Pub/Sub, Auslieferung als Server-Sent Events."""
+from __future__ import annotations
+import json
+from typing import Any, Iterator
+
+from redis import Redis
+from redis.client import PubSub
+
+CHANNEL = "dashboard:events"
+
+
+def publish(redis_client: Redis, event: str, data: Any) -> int:
+    """Veröffentlicht ein Event an alle verbundenen Dashboards; gibt die Anzahl der Empfänger zurück."""
+    return redis_client.publish(CHANNEL, json.dumps({"event": event, "data": data}, separators=(",", ":")))
+
+
+def subscribe(redis_client: Redis) -> PubSub:
+    """Abonniert den Event-Kanal (eigene Verbindung pro Stream)."""
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CHANNEL)
+    return pubsub
+
+
+def sse_stream(pubsub: PubSub, *, heartbeat_seconds: float = 15.0, retry_ms: int = 5000) -> Iterator[str]:
+    """Formatiert Pub/Sub-Nachrichten als SSE; Kommentarzeilen halten Proxy-Verbindungen offen."""
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            message = pubsub.get_message(timeout=heartbeat_seconds)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            if message.get("type") != "message":
+                continue
+            envelope = json.loads(message["data"])
+            yield f"event: {envelope['event']}\ndata: {json.dumps(envelope['data'], separators=(',', ':'))}\n\n"
+    finally:
+        # Client weg (GeneratorExit) oder Redis-Fehler: Abo und Verbindung freigeben
+        pubsub.close()
@@ -0,0 +1,149 @@
+"""Prometheus-Metriken für Tasks, Sensor, DB-Commits, S3 und Dashboard (Endpoint: GET /metrics).
+
+Web- und Worker-Prozesse laufen in mehreren Containern und Prozessen (gunicorn, Celery prefork). Mit METRICS_DIR
+schreibt jeder Prozess seine Werte als mmap-Dateien unter METRICS_DIR/<METRICS_SERVICE> (prometheus_client
+Multiprocess-Modus); /metrics fasst alle Unterverzeichnisse zusammen. Der eigene Unterordner pro Dienst
+verhindert, dass gleiche PIDs aus verschiedenen Containern dieselbe Datei beschreiben.
+
+Ohne installiertes prometheus_client (oder mit METRICS_ENABLED=false) sind alle Metriken No-ops.
+"""
+from __future__ import annotations
+import logging
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    """Ob Metriken erfasst werden und wo die Prozesse sie ablegen (None = nur im eigenen Prozess)."""
+    enabled: bool = True
+    directory: str | None = None
+    service: str = "app"
+
+
+def get_metrics_config() -> MetricsConfig:
+    """Liest die Konfiguration aus der Umgebung (METRICS_ENABLED, METRICS_DIR, METRICS_SERVICE)."""
+    return MetricsConfig(
+        enabled=os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes"),
+        directory=os.getenv("METRICS_DIR") or None,
+        service=os.getenv("METRICS_SERVICE", "app").strip() or "app",
+    )
+
+
+_config = get_metrics_config()
+if _config.enabled and _config.directory:
+    # Muss vor dem Import von prometheus_client gesetzt sein, sonst schreibt der Prozess nur in den Speicher
+    _process_dir = Path(_config.directory) / _config.service
+    _process_dir.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", str(_process_dir))
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+ENABLED = _config.enabled and prometheus_client is not None
+
+
+class _NoopMetric:
+    """Platzhalter mit der Schnittstelle von Counter/Histogram, wenn Metriken aus sind."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> _NoopMetric:
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+def _histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (), **kwargs: Any):
+    if not ENABLED:
+        return _NoopMetric()
+    return prometheus_client.Histogram(name, documentation, labelnames, **kwargs)
+
+
+def _counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+    if not ENABLED:
+        return _NoopMetric()
+    return prometheus_client.Counter(name, documentation, labelnames)
+
+
+# Uploads und Aufnahmen dauern Sekunden bis Minuten; die Standard-Buckets enden bei 10 s
+_TASK_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+_SIZE_BUCKETS = tuple(mb * 1024 * 1024 for mb in (0.25, 1, 2, 5, 10, 25, 50, 100))
+
+TASK_DURATION = _histogram(
+    "asia_celery_task_duration_seconds", "Laufzeit von Celery-Tasks", ("task", "state"), buckets=_TASK_BUCKETS
+)
+SENSOR_READ_DURATION = _histogram("asia_sensor_read_duration_seconds", "Dauer einer Sensor-Abfrage", ("backend",))
+MEASUREMENT_COMMIT_DURATION = _histogram(
+    "asia_measurement_commit_duration_seconds", "Transaktion beim Schreiben von Messwerten inkl. Rollups", ("mode",)
+)
+S3_UPLOAD_DURATION = _histogram(
+    "asia_s3_upload_duration_seconds", "Dauer eines S3-Uploads", ("mode",), buckets=_TASK_BUCKETS
+)
+S3_UPLOAD_BYTES = _histogram("asia_s3_upload_bytes", "Größe hochgeladener Objekte", ("mode",), buckets=_SIZE_BUCKETS)
+S3_PRESIGN_DURATION = _histogram("asia_s3_presign_duration_seconds", "Erzeugen einer presigned URL", ("cache",))
+DASHBOARD_DURATION = _histogram(
+    "asia_dashboard_duration_seconds", "Dashboard-Payload: DB-Abfrage/Aufbereitung bzw. JSON-Serialisierung", ("phase",)
+)
+CAPTURE_LOCK = _counter("asia_capture_lock_total", "Versuche, den Aufnahme-Lock zu bekommen", ("result",))
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Aktueller Stand im Prometheus-Textformat (im Multiprocess-Modus über alle Dienste summiert)."""
+    if prometheus_client is None:
+        return b"", "text/plain; charset=utf-8"
+    if _config.directory:
+        registry = prometheus_client.CollectorRegistry()
+        registry.register(_SharedDirectoryCollector(Path(_config.directory)))
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+class _SharedDirectoryCollector:
+    """Liest die Dateien aller Dienste (METRICS_DIR/*/*.db) und führt sie wie MultiProcessCollector zusammen."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def collect(self):
+        from prometheus_client.multiprocess import MultiProcessCollector
+
+        files = sorted(str(path) for path in self.root.glob("*/*.db"))
+        return MultiProcessCollector.merge(files, accumulate=True)
+
+
+_task_started: dict[str, float] = {}
+
+
+def _on_task_prerun(task_id=None, **kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_DURATION.labels(task=task.name, state=(state or "UNKNOWN").lower()).observe(time.perf_counter() - started)
+
+
+def connect_celery_signals() -> None:
+    """Misst die Laufzeit jedes Tasks über task_prerun/task_postrun (Label state: success, failure, retry, ...)."""
+    if not ENABLED:
+        return
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_on_task_prerun, weak=False)
+    task_postrun.connect(_on_task_postrun, weak=False)
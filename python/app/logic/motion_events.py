@@ -0,0 +1,73 @@
+"""Ereignisgesteuerte Bewegungserkennung: GPIO-Flanken des PIR werden veröffentlicht und lösen sofort eine Aufnahme aus."""
+from __future__ import annotations
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable
+
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "motion:events"
+
+
+class MotionEventService:
+    """Verarbeitet Pegelwechsel des PIR: Redis-Event veröffentlichen, bei steigender Flanke Aufnahme starten.
+
+    GPIO-Callbacks laufen im Thread der GPIO-Bibliothek; ein Lock serialisiert Flanken und den periodischen
+    Abgleich mit dem tatsächlichen Pegel (fängt verpasste Flanken, z. B. nach einem Neustart, wieder ein).
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        *,
+        on_rising: Callable[[], None],
+        on_falling: Callable[[], None],
+        read_level: Callable[[], bool],
+    ):
+        self.redis = redis_client
+        self.on_rising = on_rising
+        self.on_falling = on_falling
+        self.read_level = read_level
+        self.active: bool | None = None  # None = Zustand noch unbekannt
+        self._lock = threading.Lock()
+
+    def handle_level(self, level: bool, *, source: str = "edge") -> bool:
+        """Verarbeitet einen Pegel; gibt True zurück, wenn er eine echte Zustandsänderung war."""
+        with self._lock:
+            if level == self.active:
+                return False  # Prellen/doppelte Flanke
+            self.active = level
+
+            edge = "rising" if level else "falling"
+            try:
+                self.redis.publish(CHANNEL, json.dumps({
+                    "edge": edge,
+                    "source": source,
+                    "at": datetime.now(timezone.utc).isoformat(),
+                }))
+            except Exception:
+                logger.warning("Failed to publish motion %s event", edge, exc_info=True)
+
+            try:
+                (self.on_rising if level else self.on_falling)()
+            except Exception:
+                logger.exception("Motion %s handler failed", edge)
+
+            logger.info("Motion %s (%s)", edge, source)
+            return True
+
+    def reconcile(self) -> bool:
+        """Gleicht den gemerkten Zustand mit dem aktuellen Pegel ab (Startzustand, verlorene Flanken)."""
+        return self.handle_level(bool(self.read_level()), source="reconcile")
+
+    def run(self, watch: Callable[[Callable[[bool], None]], bool], stop: threading.Event, *, reconcile_seconds: float = 30.0) -> None:
+        """Registriert die Flankenerkennung und gleicht bis `stop` periodisch ab."""
+        self.reconcile()
+        if not watch(self.handle_level):
+            logger.warning("GPIO not available: motion events only via periodic reconcile")
+        while not stop.wait(reconcile_seconds):
+            self.reconcile()
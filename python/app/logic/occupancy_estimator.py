@@ -3,8 +3,11 @@ from dataclasses import dataclass
 from typing import Dict, Any
 import math
 from typing import Iterable, Tuple
+from itertools import islice
 import statistics
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class Baseline:
@@ -50,15 +53,15 @@ def calculate_baseline_from_window(
     window_count: int = 60,
 ) -> Baseline:
     """Berechnet eine Baseline aus einem Messfenster (Median nach Warmup-Phase)."""
-    data = list(readings)
     if window_count <= 0:
         raise ValueError("window_count muss > 0 sein")
     if warmup_count < 0:
         raise ValueError("warmup_count muss >= 0 sein")
-    if len(data) < warmup_count + window_count:
-        raise ValueError("Nicht genug Samples für warmup_count + window_count")
 
-    window = data[warmup_count: warmup_count + window_count]
+    # Nur das benötigte Fenster lesen statt das ganze Iterable zu kopieren
+    window = list(islice(readings, warmup_count, warmup_count + window_count))
+    if len(window) < window_count:
+        raise ValueError("Nicht genug Samples für warmup_count + window_count")
 
     temps = [t for (t, rh, rgas) in window]
     rhs = [rh for (t, rh, rgas) in window]
@@ -95,6 +98,8 @@ def absolute_humidity_g_m3(temperature_c: float, rh_percent: float) -> float:
     """Rechnet relative Luftfeuchte in absolute Luftfeuchte (g/m³) um."""
     if not (0.0 <= rh_percent <= 100.0):
         raise ValueError("rh_percent muss zwischen 0 und 100 liegen")
+    if not math.isfinite(temperature_c):
+        raise ValueError("temperature_c muss eine endliche Zahl sein")
 
     e_s_hpa = 6.112 * math.exp((17.62 * temperature_c) / (243.12 + temperature_c))
     e_hpa = (rh_percent / 100.0) * e_s_hpa
@@ -205,6 +210,174 @@ def estimate_people(
     return n_final
 
 
+def _exp_exact(x: np.ndarray) -> np.ndarray:
+    """Elementweises exp mit math.exp, damit Batch und Einzelberechnung bitgenau übereinstimmen."""
+    # np.exp weicht in der letzten Stelle teils von math.exp ab; Sensorwerte wiederholen sich aber stark,
+    # daher wird math.exp nur für die eindeutigen Werte aufgerufen und danach zurückverteilt.
+    unique, inverse = np.unique(x, return_inverse=True)
+    values = np.fromiter(map(math.exp, unique.tolist()), dtype=np.float64, count=unique.size)
+    return values[inverse].reshape(x.shape)
+
+
+def _first_invalid_row(mask: np.ndarray) -> int:
+    """Gibt den Index der ersten ungültigen Zeile zurück (für verständliche Fehlermeldungen)."""
+    return int(np.flatnonzero(mask)[0])
+
+
+@dataclass(frozen=True)
+class EstimatorPlan:
+    """Vorkompilierte Schätzung für eine feste Kombination aus Baseline, Modell und Raum.
+
+    Alle Konfigurationsprüfungen und abgeleiteten Konstanten (Raumskalierung, normierte Gewichte,
+    absolute Baseline-Feuchte) werden einmal in compile() berechnet. Pro Messwert bleiben nur noch
+    die datenabhängigen Prüfungen und wenige Rechenschritte; die Ergebnisse sind identisch zu
+    estimate_people().
+    """
+    baseline: Baseline
+    cfg: ModelConfig
+    room: RoomConfig
+
+    baseline_abs_humidity_g_m3: float
+    weight_gas: float    # normiertes Gas-Gewicht
+    weight_hum: float    # normiertes Feuchte-Gewicht
+    volume_factor: float  # Raumvolumen / Referenzvolumen
+    ach_factor: float     # Luftwechselrate / Referenz-Luftwechselrate
+
+    @classmethod
+    def compile(cls, baseline: Baseline, cfg: ModelConfig, room: RoomConfig) -> EstimatorPlan:
+        """Prüft die Konfiguration einmalig und berechnet alle konstanten Anteile vor."""
+        if baseline.gas_resistance_ohm <= 0:
+            raise ValueError("baseline gas_resistance_ohm muss > 0 sein")
+        base_abs_h = baseline.abs_humidity_g_m3
+        if base_abs_h <= 0:
+            raise ValueError("baseline abs humidity muss > 0 sein")
+
+        w_sum = cfg.weight_gas + cfg.weight_hum
+        if w_sum <= 0:
+            raise ValueError("Summe der Gewichte muss > 0 sein")
+        if cfg.i_ref_full <= 0:
+            raise ValueError("i_ref_full muss > 0 sein")
+
+        v = room_volume_m3(room)
+        if room.v_ref_m3 <= 0 or room.ach_ref_per_hour <= 0:
+            raise ValueError("Referenzwerte müssen > 0 sein")
+
+        return cls(
+            baseline=baseline,
+            cfg=cfg,
+            room=room,
+            baseline_abs_humidity_g_m3=base_abs_h,
+            weight_gas=cfg.weight_gas / w_sum,
+            weight_hum=cfg.weight_hum / w_sum,
+            volume_factor=v / room.v_ref_m3,
+            ach_factor=room.ach_per_hour / room.ach_ref_per_hour,
+        )
+
+    def with_baseline(self, baseline: Baseline) -> EstimatorPlan:
+        """Gibt einen Plan mit neuer Baseline zurück (z. B. nach Drift-Korrektur), Modell/Raum bleiben."""
+        return EstimatorPlan.compile(baseline, self.cfg, self.room)
+
+    def index(self, temperature_c: float, rh_percent: float, gas_resistance_ohm: float) -> float:
+        """Kombinierter Index wie combined_index()["index"], aber ohne erneute Konfigurationsprüfung."""
+        cfg = self.cfg
+        if not (cfg.min_gas_ohm <= gas_resistance_ohm <= cfg.max_gas_ohm):
+            raise ValueError(
+                f"gas_resistance_ohm außerhalb plausibler Grenzen ({cfg.min_gas_ohm}..{cfg.max_gas_ohm})"
+            )
+
+        abs_h = absolute_humidity_g_m3(temperature_c, rh_percent)
+
+        base_gas = self.baseline.gas_resistance_ohm
+        k = cfg.gas_temp_coeff_per_C
+        if k != 0.0:
+            base_gas = base_gas * math.exp(k * (temperature_c - self.baseline.temperature_c))
+
+        base_abs_h = self.baseline_abs_humidity_g_m3
+        ig = max(0.0, (base_gas - gas_resistance_ohm) / base_gas)
+        ih = max(0.0, (abs_h - base_abs_h) / base_abs_h)
+        return self.weight_gas * ig + self.weight_hum * ih
+
+    def estimate(self, temperature_c: float, rh_percent: float, gas_resistance_ohm: float) -> int:
+        """Geschätzte Personenanzahl (0..n_max), identisch zu estimate_people()."""
+        cfg = self.cfg
+        n_raw = cfg.n_max * (self.index(temperature_c, rh_percent, gas_resistance_ohm) / cfg.i_ref_full)
+        n_scaled = n_raw * self.volume_factor * self.ach_factor
+        return int(round(clamp(n_scaled, 0.0, float(cfg.n_max))))
+
+    def estimate_batch(self, temperature_c: Any, rh_percent: Any, gas_resistance_ohm: Any) -> Dict[str, np.ndarray]:
+        """Vektorisierte Schätzung für viele Messwerte; Details siehe estimate_people_batch()."""
+        t = np.asarray(temperature_c, dtype=np.float64)
+        rh = np.asarray(rh_percent, dtype=np.float64)
+        gas = np.asarray(gas_resistance_ohm, dtype=np.float64)
+        if not (t.shape == rh.shape == gas.shape) or t.ndim != 1:
+            raise ValueError("temperature_c, rh_percent und gas_resistance_ohm müssen gleich lange 1D-Arrays sein")
+
+        cfg = self.cfg
+        baseline = self.baseline
+
+        # Messwerte prüfen; wie im Einzelpfad führt ein ungültiger Wert zu einem ValueError.
+        # NaN fällt bei Gas und Feuchte schon durch die Bereichsprüfung, bei der Temperatur nur über isfinite.
+        bad_gas = ~((cfg.min_gas_ohm <= gas) & (gas <= cfg.max_gas_ohm))
+        if bad_gas.any():
+            raise ValueError(
+                f"gas_resistance_ohm außerhalb plausibler Grenzen ({cfg.min_gas_ohm}..{cfg.max_gas_ohm}) "
+                f"in Zeile {_first_invalid_row(bad_gas)}"
+            )
+        bad_rh = ~((0.0 <= rh) & (rh <= 100.0))
+        if bad_rh.any():
+            raise ValueError(f"rh_percent muss zwischen 0 und 100 liegen (Zeile {_first_invalid_row(bad_rh)})")
+        bad_t = ~np.isfinite(t)
+        if bad_t.any():
+            raise ValueError(f"temperature_c muss eine endliche Zahl sein (Zeile {_first_invalid_row(bad_t)})")
+
+        # Gleiche Rechenreihenfolge wie absolute_humidity_g_m3(), damit die Ergebnisse identisch sind
+        e_s_hpa = 6.112 * _exp_exact((17.62 * t) / (243.12 + t))
+        e_hpa = (rh / 100.0) * e_s_hpa
+        abs_h = 216.7 * (e_hpa / (t + 273.15))
+
+        k = cfg.gas_temp_coeff_per_C
+        if k == 0.0:
+            base_gas_corr = np.full_like(t, baseline.gas_resistance_ohm)
+        else:
+            base_gas_corr = baseline.gas_resistance_ohm * _exp_exact(k * (t - baseline.temperature_c))
+
+        base_abs_h = self.baseline_abs_humidity_g_m3
+        ig = np.maximum(0.0, (base_gas_corr - gas) / base_gas_corr)
+        ih = np.maximum(0.0, (abs_h - base_abs_h) / base_abs_h)
+        i_total = self.weight_gas * ig + self.weight_hum * ih
+
+        n_raw = cfg.n_max * (i_total / cfg.i_ref_full)
+        n_scaled = n_raw * self.volume_factor * self.ach_factor
+        # np.rint rundet wie round() kaufmännisch zur geraden Zahl (banker's rounding)
+        persons = np.rint(np.clip(n_scaled, 0.0, float(cfg.n_max))).astype(np.int64)
+
+        return {
+            "gas_index": ig,
+            "hum_index": ih,
+            "index": i_total,
+            "abs_humidity_g_m3": abs_h,
+            "baseline_abs_humidity_g_m3": np.full_like(t, base_abs_h),
+            "baseline_gas_corrected_ohm": base_gas_corr,
+            "persons": persons,
+        }
+
+
+def estimate_people_batch(
+    temperature_c: Any,
+    rh_percent: Any,
+    gas_resistance_ohm: Any,
+    baseline: Baseline,
+    cfg: ModelConfig,
+    room: RoomConfig,
+) -> Dict[str, np.ndarray]:
+    """Vektorisierte Variante von estimate_people() für viele Messwerte (z. B. Neuberechnung der Historie).
+
+    Erwartet gleich lange Arrays für Temperatur, rel. Feuchte und Gas-Widerstand und liefert pro Zeile
+    dieselben Werte wie combined_index() sowie die Personenanzahl unter "persons".
+    """
+    return EstimatorPlan.compile(baseline, cfg, room).estimate_batch(temperature_c, rh_percent, gas_resistance_ohm)
+
+
 if __name__ == "__main__":
     # Mini-Testlauf (direktes Ausführen der Datei)
     room = RoomConfig(area_m2=180.0, height_m=3.0, ach_per_hour=2.0, v_ref_m3=300.0, ach_ref_per_hour=2.0)
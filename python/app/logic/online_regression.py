@@ -0,0 +1,193 @@
+"""Inkrementelle lineare Regression (Temperatur ~ Personen) über ein gleitendes Zeitfenster."""
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+import math
+
+from redis import Redis
+
+from app.extensions.redis_client import get_redis
+from app.logic.rooms import DEFAULT_ROOM_ID
+
+# Entfernt abgelaufene Samples atomar aus Fenster, Summen und x-Histogramm.
+# KEYS: samples (ZSET), sums (HASH), xcounts (HASH); ARGV: cutoff (Unix-Zeit, exklusiv)
+_EXPIRE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+for _, member in ipairs(expired) do
+  local xs, ys = string.match(member, '^[^|]*|([^|]*)|([^|]*)$')
+  local x, y = tonumber(xs), tonumber(ys)
+  redis.call('HINCRBY', KEYS[2], 'n', -1)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'sx', -x)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'sy', -y)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'sxy', -x * y)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'sxx', -x * x)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'syy', -y * y)
+  if redis.call('HINCRBY', KEYS[3], xs, -1) <= 0 then
+    redis.call('HDEL', KEYS[3], xs)
+  end
+end
+if #expired > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+  -- Leeres Fenster: Summen zurücksetzen, damit sich keine Rundungsfehler ansammeln
+  if tonumber(redis.call('HGET', KEYS[2], 'n') or '0') <= 0 then
+    redis.call('DEL', KEYS[2])
+  end
+end
+return #expired
+"""
+
+# Fügt ein Sample hinzu (idempotent pro Member).
+# KEYS: samples, sums, xcounts; ARGV: score, member, x, y
+_ADD_SCRIPT = """
+if redis.call('ZADD', KEYS[1], 'NX', ARGV[1], ARGV[2]) == 0 then
+  return 0
+end
+local x, y = tonumber(ARGV[3]), tonumber(ARGV[4])
+redis.call('HINCRBY', KEYS[2], 'n', 1)
+redis.call('HINCRBYFLOAT', KEYS[2], 'sx', x)
+redis.call('HINCRBYFLOAT', KEYS[2], 'sy', y)
+redis.call('HINCRBYFLOAT', KEYS[2], 'sxy', x * y)
+redis.call('HINCRBYFLOAT', KEYS[2], 'sxx', x * x)
+redis.call('HINCRBYFLOAT', KEYS[2], 'syy', y * y)
+redis.call('HINCRBY', KEYS[3], ARGV[3], 1)
+return 1
+"""
+
+
+@dataclass
+class RegressionSums:
+    """Laufende Summen für eine einfache lineare Regression y = slope·x + intercept."""
+    n: int = 0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxy: float = 0.0
+    sxx: float = 0.0
+    syy: float = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        """Nimmt ein Wertepaar auf."""
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxy += x * y
+        self.sxx += x * x
+        self.syy += y * y
+
+    def fit(self) -> Dict[str, float] | None:
+        """Steigung, Achsenabschnitt und R² wie scipy.stats.linregress (None bei zu wenigen Daten)."""
+        if self.n < 2:
+            return None
+        ss_x = self.n * self.sxx - self.sx * self.sx
+        if ss_x <= 0:
+            return None
+        ss_xy = self.n * self.sxy - self.sx * self.sy
+        ss_y = self.n * self.syy - self.sy * self.sy
+
+        slope = ss_xy / ss_x
+        intercept = (self.sy - slope * self.sx) / self.n
+        # linregress setzt r = 0, wenn eine der Varianzen 0 ist
+        r2 = 0.0 if ss_y <= 0 else min(1.0, (ss_xy * ss_xy) / (ss_x * ss_y))
+        return {"slope": slope, "intercept": intercept, "r2": r2}
+
+
+class RegressionWindow:
+    """Redis-gestützte Regressionssummen über die letzten `window_seconds` (O(1) pro Abfrage).
+
+    Jedes Sample liegt zusätzlich in einem ZSET (Score = Zeitstempel), damit abgelaufene Werte
+    wieder abgezogen werden können. Ein Histogramm der x-Werte (Personen) liefert min/max für die
+    Regressionslinie und die Anzahl unterschiedlicher x-Werte.
+    """
+
+    def __init__(self, redis_client: Redis, *, prefix: str = "dashboard:regression", window_seconds: int = 86400):
+        self.redis = redis_client
+        self.window_seconds = window_seconds
+        self.samples_key = f"{prefix}:samples"
+        self.sums_key = f"{prefix}:sums"
+        self.xcounts_key = f"{prefix}:xcounts"
+        self.ready_key = f"{prefix}:ready"
+        self._keys = [self.samples_key, self.sums_key, self.xcounts_key]
+        self._add = self.redis.register_script(_ADD_SCRIPT)
+        self._expire = self.redis.register_script(_EXPIRE_SCRIPT)
+
+    @staticmethod
+    def _member(sample_id: str | int, x: int, y: float) -> str:
+        return f"{sample_id}|{int(x)}|{float(y)!r}"
+
+    def add(self, sample_id: str | int, timestamp: float, x: int, y: float) -> None:
+        """Fügt ein Sample (Unix-Zeit, Personen, Temperatur) hinzu; doppelte IDs werden ignoriert."""
+        self._add(keys=self._keys, args=[timestamp, self._member(sample_id, x, y), int(x), float(y)])
+
+    def is_ready(self) -> bool:
+        """True, solange die Summen aus einem Neuaufbau stammen und seitdem gepflegt wurden."""
+        return bool(self.redis.exists(self.ready_key))
+
+    def invalidate(self) -> None:
+        """Erzwingt beim nächsten Lesen einen Neuaufbau (z. B. nach Schreibvorgängen ohne Einzel-IDs)."""
+        self.redis.delete(self.ready_key)
+
+    def rebuild(self, samples: Iterable[Tuple[str | int, float, int, float]]) -> None:
+        """Setzt das Fenster aus (id, Unix-Zeit, x, y)-Tupeln komplett neu auf (z. B. nach Redis-Neustart)."""
+        sums = RegressionSums()
+        members: Dict[str, float] = {}
+        xcounts: Dict[str, int] = {}
+        for sample_id, timestamp, x, y in samples:
+            sums.add(int(x), float(y))
+            members[self._member(sample_id, x, y)] = timestamp
+            xcounts[str(int(x))] = xcounts.get(str(int(x)), 0) + 1
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(*self._keys)
+        if members:
+            pipe.zadd(self.samples_key, members)
+            pipe.hset(self.sums_key, mapping={
+                "n": sums.n, "sx": sums.sx, "sy": sums.sy, "sxy": sums.sxy, "sxx": sums.sxx, "syy": sums.syy,
+            })
+            pipe.hset(self.xcounts_key, mapping=xcounts)
+        # Läuft nach einem Fenster ab: periodischer Neuaufbau korrigiert verlorene Updates und Rundungsdrift
+        pipe.set(self.ready_key, "1", ex=self.window_seconds)
+        pipe.execute()
+
+    def snapshot(self, now: float) -> Tuple[RegressionSums, list[int]]:
+        """Entfernt abgelaufene Samples und gibt Summen sowie die vorhandenen x-Werte zurück."""
+        self._expire(keys=self._keys, args=[now - self.window_seconds])
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self.sums_key)
+        pipe.hkeys(self.xcounts_key)
+        raw, xs = pipe.execute()
+
+        sums = RegressionSums(
+            n=int(raw.get("n", 0)),
+            sx=float(raw.get("sx", 0.0)),
+            sy=float(raw.get("sy", 0.0)),
+            sxy=float(raw.get("sxy", 0.0)),
+            sxx=float(raw.get("sxx", 0.0)),
+            syy=float(raw.get("syy", 0.0)),
+        )
+        return sums, sorted(int(x) for x in xs)
+
+
+@lru_cache(maxsize=128)
+def dashboard_regression_window(room_id: int = DEFAULT_ROOM_ID) -> RegressionWindow:
+    """Regressionsfenster des Dashboards (letzte 24h) eines Raums auf dem gemeinsamen Redis-Client."""
+    prefix = "dashboard:regression" if room_id == DEFAULT_ROOM_ID else f"dashboard:regression:{room_id}"
+    return RegressionWindow(get_redis(), prefix=prefix)
+
+
+def regression_payload(sums: RegressionSums, distinct_xs: list[int]) -> Dict[str, object]:
+    """Baut den Regressionsteil des Dashboard-Payloads (gleiches Format wie bisher)."""
+    fit = sums.fit() if len(distinct_xs) >= 2 else None
+    if fit is None or not all(math.isfinite(v) for v in fit.values()):
+        return {"slope": None, "intercept": None, "r2": None, "line_points": []}
+
+    slope, intercept = fit["slope"], fit["intercept"]
+    x_min, x_max = distinct_xs[0], distinct_xs[-1]
+    return {
+        "slope": slope,
+        "intercept": intercept,
+        "r2": fit["r2"],
+        "line_points": [
+            {"x": x_min, "y": slope * x_min + intercept},
+            {"x": x_max, "y": slope * x_max + intercept},
+        ],
+    }
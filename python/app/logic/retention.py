@@ -0,0 +1,80 @@
+"""Aufbewahrung der Messwerte: Löschen in kleinen PK-Bereichen mit Pausen, optional vorher Archiv als CSV.gz in S3.
+
+Ein einzelnes DELETE über Millionen Zeilen hält InnoDB-Locks und füllt das Undo-Log der kleinen Pi-MariaDB;
+kurze Transaktionen pro Bereich lassen laufende INSERTs dazwischen. Das Archiv liegt unter
+`archive/measurements/YYYY/MM/DD/` im Bucket und bleibt offline auswertbar (pandas, DuckDB, Spark).
+"""
+from __future__ import annotations
+import csv
+import gzip
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+from uuid import uuid4
+
+ARCHIVE_COLUMNS = ("id", "room_id", "timestamp", "temperature", "humidity", "voc", "persons", "radar")
+_TIMESTAMP_INDEX = ARCHIVE_COLUMNS.index("timestamp")
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    """Zeilen pro Lösch-Transaktion, Pause dazwischen und ob vorher archiviert wird."""
+    chunk_rows: int = 5000
+    pause_seconds: float = 0.2
+    archive: bool = False
+    archive_prefix: str = "archive/measurements"
+
+
+def get_retention_config() -> RetentionConfig:
+    """Liest die Konfiguration aus der Umgebung (RETENTION_CHUNK_ROWS, RETENTION_PAUSE_SECONDS, RETENTION_ARCHIVE_*)."""
+    config = RetentionConfig(
+        chunk_rows=int(os.getenv("RETENTION_CHUNK_ROWS", "5000")),
+        pause_seconds=float(os.getenv("RETENTION_PAUSE_SECONDS", "0.2")),
+        archive=os.getenv("RETENTION_ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        archive_prefix=os.getenv("RETENTION_ARCHIVE_PREFIX", "archive/measurements").strip("/"),
+    )
+    if config.chunk_rows <= 0:
+        raise ValueError("RETENTION_CHUNK_ROWS muss > 0 sein")
+    if config.pause_seconds < 0:
+        raise ValueError("RETENTION_PAUSE_SECONDS darf nicht negativ sein")
+    return config
+
+
+def archive_object_key(prefix: str, cutoff: datetime, *, now: datetime | None = None) -> str:
+    """Object-Key eines Archivlaufs: <prefix>/YYYY/MM/DD/measurements_before_<cutoff>_<uuid>.csv.gz"""
+    now = now or datetime.now(timezone.utc)
+    stamp = cutoff.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{prefix}/{now:%Y/%m/%d}/measurements_before_{stamp}_{uuid4().hex}.csv.gz"
+
+
+class CsvGzipWriter:
+    """Schreibt Messwert-Zeilen chunkweise in eine gzip-komprimierte CSV-Datei (Kopfzeile = ARCHIVE_COLUMNS)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows = 0
+        self._file = gzip.open(self.path, "wt", encoding="utf-8", newline="", compresslevel=6)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(ARCHIVE_COLUMNS)
+
+    def write(self, rows: Iterable[Sequence]) -> None:
+        for row in rows:
+            values = list(row)
+            timestamp = values[_TIMESTAMP_INDEX]
+            if isinstance(timestamp, datetime):
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=timezone.utc)
+                values[_TIMESTAMP_INDEX] = timestamp.astimezone(timezone.utc).isoformat()
+            self._writer.writerow(values)
+            self.rows += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "CsvGzipWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
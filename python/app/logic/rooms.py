@@ -0,0 +1,175 @@
+"""Raum-Registry: Schätzparameter je Raum aus der DB, prozessweit gecacht und als EstimatorPlan vorkompiliert.
+
+Alle Räume werden mit einer Abfrage geladen und höchstens alle `ttl_seconds` neu gelesen; pro Messwert fällt
+damit keine DB-Abfrage an, egal wie viele Räume es gibt. Raum 1 ist der Standardraum bestehender Installationen.
+"""
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable
+
+from app.logic.occupancy_estimator import Baseline, EstimatorPlan, ModelConfig, RoomConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOM_ID = 1
+DEFAULT_ROOM_SLUG = "default"
+
+
+@dataclass(frozen=True)
+class RoomSettings:
+    """Unveränderliche Sicht auf einen Raum samt Schätzparametern; `version` ändert sich bei jeder Bearbeitung."""
+    room_id: int
+    slug: str
+    name: str
+    room: RoomConfig
+    model: ModelConfig
+    baseline: Baseline
+    version: str
+
+
+# Bisher feste Parameter; Ausweichwert, solange die rooms-Tabelle (noch) leer oder nicht erreichbar ist
+DEFAULT_ROOM_SETTINGS = RoomSettings(
+    room_id=DEFAULT_ROOM_ID,
+    slug=DEFAULT_ROOM_SLUG,
+    name="Gastraum",
+    room=RoomConfig(area_m2=180.0, height_m=3.0, ach_per_hour=2.0, v_ref_m3=300.0, ach_ref_per_hour=2.0),
+    model=ModelConfig(weight_gas=0.8, weight_hum=0.2, n_max=125, i_ref_full=0.20, gas_temp_coeff_per_C=0.0),
+    baseline=Baseline(temperature_c=21.0, rh_percent=35.0, gas_resistance_ohm=22000.0),
+    version="fallback",
+)
+
+
+def room_config_ttl_seconds() -> float:
+    """Wie lange Raumparameter pro Prozess gecacht werden (ROOM_CONFIG_TTL_SECONDS, Standard: 60)."""
+    return float(os.getenv("ROOM_CONFIG_TTL_SECONDS", "60"))
+
+
+def room_settings(room: Any) -> RoomSettings:
+    """Baut RoomSettings aus einer Room-Zeile (ORM-Objekt oder Result-Row mit gleichen Spaltennamen)."""
+    return RoomSettings(
+        room_id=int(room.id),
+        slug=room.slug,
+        name=room.name,
+        room=RoomConfig(
+            area_m2=room.area_m2,
+            height_m=room.height_m,
+            ach_per_hour=room.ach_per_hour,
+            v_ref_m3=room.v_ref_m3,
+            ach_ref_per_hour=room.ach_ref_per_hour,
+        ),
+        model=ModelConfig(
+            weight_gas=room.weight_gas,
+            weight_hum=room.weight_hum,
+            n_max=room.n_max,
+            i_ref_full=room.i_ref_full,
+            gas_temp_coeff_per_C=room.gas_temp_coeff_per_c,
+        ),
+        baseline=Baseline(
+            temperature_c=room.baseline_temperature_c,
+            rh_percent=room.baseline_rh_percent,
+            gas_resistance_ohm=room.baseline_gas_resistance_ohm,
+        ),
+        version=str(room.updated_at),
+    )
+
+
+class RoomRegistry:
+    """Prozessweiter Cache aller Räume und ihrer kompilierten Schätzpläne.
+
+    `loader` liefert alle Räume (eine DB-Abfrage). Unbekannte IDs/Slugs lösen höchstens einmal pro
+    `miss_reload_seconds` ein vorgezogenes Neuladen aus, damit neu angelegte Räume ohne Neustart greifen.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[RoomSettings]],
+        *,
+        ttl_seconds: float = 60.0,
+        miss_reload_seconds: float = 5.0,
+        fallback: RoomSettings | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._loader = loader
+        self._ttl = ttl_seconds
+        self._miss_reload = miss_reload_seconds
+        self._fallback = fallback
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, RoomSettings] = {}
+        self._by_slug: Dict[str, RoomSettings] = {}
+        self._plans: Dict[tuple, EstimatorPlan] = {}
+        self._loaded_at: float | None = None
+
+    def _reload(self) -> None:
+        try:
+            rooms = list(self._loader())
+        except Exception:
+            # DB kurz weg: mit dem bisherigen Stand weiterschätzen statt Messwerte zu verlieren
+            logger.warning("Failed to load rooms, keeping cached settings", exc_info=True)
+            rooms = list(self._by_id.values())
+        if not rooms and self._fallback is not None:
+            rooms = [self._fallback]
+        self._by_id = {r.room_id: r for r in rooms}
+        self._by_slug = {r.slug: r for r in rooms}
+        self._loaded_at = self._clock()
+
+    def _ensure_fresh(self, *, missed: bool = False) -> None:
+        now = self._clock()
+        with self._lock:
+            age = None if self._loaded_at is None else now - self._loaded_at
+            if age is None or age >= self._ttl or (missed and age >= self._miss_reload):
+                self._reload()
+
+    def all(self) -> list[RoomSettings]:
+        """Alle bekannten Räume, nach ID sortiert."""
+        self._ensure_fresh()
+        return sorted(self._by_id.values(), key=lambda r: r.room_id)
+
+    def get(self, room_id: int) -> RoomSettings | None:
+        """Raum per ID (None, wenn unbekannt)."""
+        self._ensure_fresh()
+        settings = self._by_id.get(room_id)
+        if settings is None:
+            self._ensure_fresh(missed=True)
+            settings = self._by_id.get(room_id)
+        return settings
+
+    def by_slug(self, slug: str) -> RoomSettings | None:
+        """Raum per Slug (None, wenn unbekannt)."""
+        self._ensure_fresh()
+        settings = self._by_slug.get(slug)
+        if settings is None:
+            self._ensure_fresh(missed=True)
+            settings = self._by_slug.get(slug)
+        return settings
+
+    def resolve(self, value: str | int | None) -> RoomSettings | None:
+        """Raum aus Query-/Env-Wert: ID (Zahl) oder Slug; None/"" = Standardraum."""
+        if value is None or value == "":
+            return self.get(DEFAULT_ROOM_ID)
+        if isinstance(value, int) or str(value).isdigit():
+            return self.get(int(value))
+        return self.by_slug(str(value))
+
+    def plan(self, room_id: int, baseline: Baseline | None = None) -> EstimatorPlan:
+        """Kompilierter Schätzplan des Raums, optional mit abweichender (gelernter) Baseline; wird wiederverwendet."""
+        settings = self.get(room_id)
+        if settings is None:
+            raise KeyError(f"Unbekannter Raum {room_id}")
+        baseline = baseline or settings.baseline
+        key = (room_id, settings.version, baseline)
+        plan = self._plans.get(key)
+        if plan is None:
+            base_key = (room_id, settings.version, settings.baseline)
+            base = self._plans.get(base_key) or EstimatorPlan.compile(settings.baseline, settings.model, settings.room)
+            self._plans[base_key] = base
+            plan = base if baseline == settings.baseline else base.with_baseline(baseline)
+            if len(self._plans) > 64 * max(1, len(self._by_id)):
+                self._plans.clear()  # alte Versionen/Baselines nicht endlos sammeln
+                self._plans[base_key] = base
+            self._plans[key] = plan
+        return plan
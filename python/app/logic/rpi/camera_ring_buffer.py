@@ -0,0 +1,160 @@
+"""Pre-Roll-Ringpuffer: raspivid nimmt dauerhaft kurze H264-Segmente in ein tmpfs-Verzeichnis auf.
+
+Bei Bewegung werden die Segmente der letzten Sekunden plus die folgenden Live-Segmente aneinandergehängt
+und ohne Neukodierung in MP4 verpackt. Dadurch beginnt der Clip vor dem Auslöser, und die Kamera wird nur
+einmal gestartet. Jedes Segment beginnt mit einem I-Frame inkl. SPS/PPS (-ih), daher lassen sich die rohen
+H264-Dateien direkt hintereinanderschreiben.
+"""
+from __future__ import annotations
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.logic.rpi.motion_camera_capture import remux_h264_to_mp4
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = "segment%04d.h264"
+
+
+@dataclass(frozen=True)
+class RingBufferConfig:
+    """Ablage, Segmentlänge und Puffergröße des Ringpuffers sowie die Kameraparameter."""
+    directory: Path
+    segment_seconds: int = 1
+    ring_seconds: int = 30
+    pre_roll_seconds: int = 3
+    width: int = 320
+    height: int = 240
+    fps: int = 10
+    bitrate: int = 500000
+
+    @property
+    def segment_count(self) -> int:
+        """Anzahl Segmente im Ring (raspivid -wr)."""
+        return max(2, self.ring_seconds // self.segment_seconds)
+
+
+def get_ring_buffer_config() -> RingBufferConfig:
+    """Liest die Ringpuffer-Konfiguration aus der Umgebung (VIDEO_RING_*, VIDEO_PRE_ROLL_SECONDS)."""
+    config = RingBufferConfig(
+        directory=Path(os.getenv("VIDEO_RING_DIR", "/dev/shm/asia-preroll")),
+        segment_seconds=int(os.getenv("VIDEO_SEGMENT_SECONDS", "1")),
+        ring_seconds=int(os.getenv("VIDEO_RING_SECONDS", "30")),
+        pre_roll_seconds=int(os.getenv("VIDEO_PRE_ROLL_SECONDS", "3")),
+    )
+    if config.segment_seconds <= 0:
+        raise ValueError("VIDEO_SEGMENT_SECONDS muss > 0 sein")
+    if config.pre_roll_seconds + 2 * config.segment_seconds > config.ring_seconds:
+        raise ValueError("VIDEO_RING_SECONDS muss Pre-Roll plus zwei Segmente abdecken")
+    return config
+
+
+def raspivid_ring_command(config: RingBufferConfig) -> list[str]:
+    """raspivid-Aufruf für Endlosaufnahme in Segmente mit Wrap-Around."""
+    segment_ms = config.segment_seconds * 1000
+    return [
+        "raspivid",
+        "-t", "0",                                   # endlos
+        "-sg", str(segment_ms),                      # neues Segment alle N ms (an I-Frames)
+        "-wr", str(config.segment_count),            # Dateinamen zyklisch überschreiben
+        "-g", str(config.fps * config.segment_seconds),  # I-Frame pro Segment
+        "-ih",                                       # SPS/PPS vor jedem I-Frame
+        "-w", str(config.width),
+        "-h", str(config.height),
+        "-fps", str(config.fps),
+        "-b", str(config.bitrate),
+        "-o", str(config.directory / SEGMENT_PATTERN),
+    ]
+
+
+def run_ring_recorder(config: RingBufferConfig, stop: threading.Event, *, restart_delay: float = 2.0) -> None:
+    """Hält raspivid am Laufen (Neustart nach Absturz) bis `stop` gesetzt ist."""
+    config.directory.mkdir(parents=True, exist_ok=True)
+    while not stop.is_set():
+        process = subprocess.Popen(raspivid_ring_command(config))
+        logger.info("Ring recorder started (pid=%s, %s x %ss)", process.pid, config.segment_count, config.segment_seconds)
+        while process.poll() is None and not stop.wait(1.0):
+            pass
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        elif not stop.is_set():
+            logger.warning("Ring recorder exited with code %s, restarting", process.returncode)
+            stop.wait(restart_delay)
+
+
+def _segments_by_age(directory: Path) -> list[tuple[float, Path]]:
+    """Segmente nach Änderungszeit (älteste zuerst); der Dateiname sagt wegen Wrap-Around nichts über die Reihenfolge."""
+    segments = []
+    for path in directory.glob("segment*.h264"):
+        try:
+            segments.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    return sorted(segments)
+
+
+def capture_with_preroll(
+    output_path: Path,
+    duration_seconds: int,
+    config: RingBufferConfig,
+    *,
+    triggered_at: float | None = None,
+    poll_seconds: float = 0.2,
+) -> Path:
+    """Schneidet Pre-Roll + `duration_seconds` Live-Material aus dem Ringpuffer zu einer MP4 (ohne Neukodierung).
+
+    Abgeschlossene Segmente werden sofort kopiert, damit der Ring sie während der Aufnahme überschreiben darf.
+    Ein Segment gilt als abgeschlossen, sobald ein neueres existiert.
+    """
+    triggered_at = triggered_at or time.time()
+    start_at = triggered_at - config.pre_roll_seconds
+    end_at = triggered_at + duration_seconds
+    deadline = end_at + 3 * config.segment_seconds + 10
+
+    output_path = Path(output_path)
+    raw_path = output_path.with_suffix(".h264")
+    copied = 0
+    last_written: float | None = None
+
+    with raw_path.open("wb") as raw:
+        while True:
+            segments = _segments_by_age(config.directory)
+            if not segments:
+                raise FileNotFoundError(f"Kein Ringpuffer in {config.directory} (läuft der Ring-Recorder?)")
+            newest_mtime = segments[-1][0]
+
+            for mtime, path in segments[:-1]:  # das neueste Segment wird noch geschrieben
+                # Segment deckt (mtime - Segmentlänge, mtime] ab; nur Überschneidungen mit dem Clip übernehmen
+                if mtime <= start_at or mtime - config.segment_seconds > end_at:
+                    continue
+                if last_written is not None and mtime <= last_written:
+                    continue  # schon kopiert
+                with path.open("rb") as segment:
+                    shutil.copyfileobj(segment, raw)
+                copied += 1
+                last_written = mtime
+
+            # Fertig, wenn das Segment mit dem Clip-Ende abgeschlossen ist
+            if newest_mtime - config.segment_seconds >= end_at or (last_written or 0) >= end_at:
+                break
+            if time.time() > deadline:
+                raise TimeoutError("Ringpuffer liefert keine neuen Segmente")
+            time.sleep(poll_seconds)
+
+    if not copied:
+        raise RuntimeError("Keine Segmente für den Clip im Ringpuffer gefunden")
+
+    try:
+        return remux_h264_to_mp4(raw_path, output_path, fps=config.fps, timeout=60)
+    finally:
+        raw_path.unlink(missing_ok=True)
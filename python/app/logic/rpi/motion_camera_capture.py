@@ -1,7 +1,9 @@
 import os
 import shlex
 import subprocess
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 
 def _duration_seconds(duration_seconds: int | None = None) -> int:
@@ -32,25 +34,79 @@ def capture_mp4(output_path: Path, duration_seconds: int | None = None) -> Path:
     # Standard auf dem Raspberry Pi: erst rohes H264 mit raspivid aufnehmen.
     raw_path = output_path.with_suffix(".h264")
     # Danach in einen browserfähigen MP4-Container schreiben.
-    subprocess.run(
+    subprocess.run(_raspivid_command(duration_ms, str(raw_path)), check=True, timeout=duration + 30)
+    return remux_h264_to_mp4(raw_path, output_path, fps=10, timeout=duration + 30)
+
+
+def _raspivid_command(duration_ms: int, output: str) -> list[str]:
+    """raspivid-Aufruf mit den Dashboard-Clip-Einstellungen (320x240, 10 fps, 500 kbit/s); output "-" = stdout."""
+    return [
+        "raspivid",
+        "-o",
+        output,
+        "-t",
+        str(duration_ms),
+        "-w",
+        "320",
+        "-h",
+        "240",
+        "-fps",
+        "10",
+        "-b",
+        "500000",
+    ]
+
+
+@contextmanager
+def stream_fragmented_mp4(duration_seconds: int | None = None) -> Iterator[BinaryIO]:
+    """Nimmt auf und liefert das Video als fragmentiertes MP4 über eine Pipe, während die Aufnahme noch läuft.
+
+    raspivid schreibt H264 nach stdout, ffmpeg verpackt es ohne Neukodierung in fMP4-Fragmente (kein
+    nachträgliches Verschieben des moov-Atoms nötig). Nichts davon landet auf der SD-Karte.
+    Nach dem Lesen bis EOF wird geprüft, ob beide Prozesse erfolgreich beendet wurden.
+    """
+    duration = _duration_seconds(duration_seconds)
+    raspivid = subprocess.Popen(_raspivid_command(duration * 1000, "-"), stdout=subprocess.PIPE)
+    ffmpeg = subprocess.Popen(
         [
-            "raspivid",
-            "-o",
-            str(raw_path),
-            "-t",
-            str(duration_ms),
-            "-w",
-            "320",
-            "-h",
-            "240",
-            "-fps",
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "h264",
+            "-framerate",
             "10",
-            "-b",
-            "500000",
+            "-i",
+            "pipe:0",
+            "-c",
+            "copy",
+            "-movflags",
+            "frag_keyframe+empty_moov+default_base_moof",
+            "-f",
+            "mp4",
+            "pipe:1",
         ],
-        check=True,
-        timeout=duration + 30,
+        stdin=raspivid.stdout,
+        stdout=subprocess.PIPE,
     )
+    raspivid.stdout.close()  # nur ffmpeg liest; so bekommt raspivid SIGPIPE, falls ffmpeg abbricht
+
+    try:
+        yield ffmpeg.stdout
+        for process in (raspivid, ffmpeg):
+            returncode = process.wait(timeout=duration + 30)
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, process.args)
+    finally:
+        for process in (raspivid, ffmpeg):
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        ffmpeg.stdout.close()
+
+
+def remux_h264_to_mp4(raw_path: Path, output_path: Path, *, fps: int, timeout: float) -> Path:
+    """Verpackt rohes H264 ohne Neukodierung (-c copy) in einen browserfähigen MP4-Container."""
     subprocess.run(
         [
             "ffmpeg",
@@ -58,7 +114,7 @@ def capture_mp4(output_path: Path, duration_seconds: int | None = None) -> Path:
             "-loglevel",
             "error",
             "-framerate",
-            "10",
+            str(fps),
             "-i",
             str(raw_path),
             "-c",
@@ -68,7 +124,7 @@ def capture_mp4(output_path: Path, duration_seconds: int | None = None) -> Path:
             str(output_path),
         ],
         check=True,
-        timeout=duration + 30,
+        timeout=timeout,
     )
     return output_path
 
@@ -16,3 +16,23 @@ def motion_detected():
     if GPIO is None:
         return False
     return GPIO.input(PIR_PIN)
+
+
+def watch_edges(callback, bouncetime: int = 200) -> bool:
+    """Ruft callback(level) bei steigender und fallender Flanke am PIR auf; False ohne GPIO (z. B. lokal)."""
+    if GPIO is None:
+        return False
+
+    GPIO.add_event_detect(
+        PIR_PIN,
+        GPIO.BOTH,
+        callback=lambda channel: callback(bool(GPIO.input(channel))),
+        bouncetime=bouncetime,  # Entprellen in ms
+    )
+    return True
+
+
+def stop_watching() -> None:
+    """Entfernt die Flankenerkennung wieder (z. B. beim Beenden des Dienstes)."""
+    if GPIO is not None:
+        GPIO.remove_event_detect(PIR_PIN)
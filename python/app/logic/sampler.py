@@ -0,0 +1,133 @@
+"""Dauerhaft laufender Sensor-Sampler: liest mit fester Frequenz, glättet im Speicher und gibt Aggregate aus."""
+from __future__ import annotations
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SamplerConfig:
+    """Abtastrate, Ausgabeintervall und Glättungsfaktor (EMA-alpha, 1.0 = keine Glättung)."""
+    hz: float = 1.0
+    emit_seconds: float = 60.0
+    smoothing: float = 0.3
+
+
+def get_sampler_config() -> SamplerConfig:
+    """Liest die Sampler-Konfiguration aus der Umgebung (SAMPLER_HZ, SAMPLER_EMIT_SECONDS, SAMPLER_SMOOTHING)."""
+    config = SamplerConfig(
+        hz=float(os.getenv("SAMPLER_HZ", "1.0")),
+        emit_seconds=float(os.getenv("SAMPLER_EMIT_SECONDS", "60")),
+        smoothing=float(os.getenv("SAMPLER_SMOOTHING", "0.3")),
+    )
+    if config.hz <= 0:
+        raise ValueError("SAMPLER_HZ muss > 0 sein")
+    if config.emit_seconds <= 0:
+        raise ValueError("SAMPLER_EMIT_SECONDS muss > 0 sein")
+    if not 0 < config.smoothing <= 1:
+        raise ValueError("SAMPLER_SMOOTHING muss in (0, 1] liegen")
+    return config
+
+
+@dataclass
+class ReadingSmoother:
+    """Exponentiell geglättete Werte je Kanal plus deren Summen, Zähler und Bewegung im laufenden Ausgabeintervall.
+
+    Die EMA dämpft Ausreißer einzelner Abfragen; ausgegeben wird der Mittelwert der geglätteten Werte über alle
+    Abfragen des Intervalls, damit jede Messung in das Aggregat eingeht (nicht nur die letzten Sekunden).
+    """
+    alpha: float
+    smoothed: Dict[str, float] = field(default_factory=dict)
+    sums: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    samples: int = 0
+    motion: bool = False
+
+    def add(self, reading: Dict[str, Any]) -> bool:
+        """Nimmt eine Rohmessung auf; ungültige Werte (None/NaN, Gas ohne stabilen Heizer = 0) werden übersprungen."""
+        accepted = False
+        for key in ("temperature", "humidity", "voc"):
+            value = reading.get(key)
+            if value is None or not math.isfinite(value) or (key == "voc" and value <= 0):
+                continue
+            previous = self.smoothed.get(key)
+            self.smoothed[key] = value if previous is None else previous + self.alpha * (value - previous)
+            self.sums[key] = self.sums.get(key, 0.0) + self.smoothed[key]
+            self.counts[key] = self.counts.get(key, 0) + 1
+            accepted = True
+
+        if accepted:
+            self.samples += 1
+        # Bewegung im Intervall: einmal erkannt zählt für das ganze Aggregat
+        self.motion = self.motion or bool(reading.get("motion"))
+        return accepted
+
+    def ready(self) -> bool:
+        """True, sobald für alle Kanäle ein geglätteter Wert vorliegt."""
+        return all(key in self.smoothed for key in ("temperature", "humidity", "voc"))
+
+    def emit(self) -> Dict[str, Any]:
+        """Mittelwert des Intervalls je Kanal; die Glättung läuft über Intervallgrenzen weiter, Summen/Zähler/Bewegung starten neu.
+
+        Ein Kanal ohne gültige Abfrage im Intervall behält seinen letzten geglätteten Wert.
+        """
+        means = {key: self.sums[key] / count for key, count in self.counts.items() if count}
+        aggregate = {**self.smoothed, **means, "motion": self.motion, "samples": self.samples}
+        self.sums.clear()
+        self.counts.clear()
+        self.samples = 0
+        self.motion = False
+        return aggregate
+
+
+def run_sampler(
+    read: Callable[[], Dict[str, Any] | None],
+    emit: Callable[[Dict[str, Any]], None],
+    config: SamplerConfig,
+    stop: threading.Event,
+    *,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """Sampling-Schleife mit festem Takt (ohne Drift) bis `stop` gesetzt ist; das letzte Aggregat wird noch ausgegeben.
+
+    `read` liefert eine Rohmessung (oder None), `emit` bekommt alle `emit_seconds` ein geglättetes Aggregat.
+    Fehler beim Lesen oder Ausgeben werden geloggt, die Schleife läuft weiter.
+    """
+    period = 1.0 / config.hz
+    smoother = ReadingSmoother(alpha=config.smoothing)
+    next_sample = clock()
+    next_emit = next_sample + config.emit_seconds
+
+    def flush() -> None:
+        if smoother.samples and smoother.ready():
+            try:
+                emit(smoother.emit())
+            except Exception:
+                logger.exception("Failed to emit sampler aggregate")
+
+    while not stop.is_set():
+        try:
+            reading = read()
+            if reading is not None:
+                smoother.add(reading)
+        except Exception:
+            logger.exception("Sensor read failed")
+
+        now = clock()
+        if now >= next_emit:
+            flush()
+            next_emit += config.emit_seconds * max(1, math.ceil((now - next_emit) / config.emit_seconds))
+
+        # Nächster Zeitpunkt im festen Raster; bei Verzug Takte auslassen statt aufzuholen
+        next_sample += period
+        if next_sample < now:
+            next_sample = now + period - ((now - next_sample) % period)
+        stop.wait(max(0.0, next_sample - clock()))
+
+    flush()
@@ -0,0 +1,257 @@
+"""Austauschbare Sensor-Quellen hinter get_sensor_data()/motion_detected(): BME680+PIR, Simulation oder Replay.
+
+Ohne Hardware (lokal, CI, Lasttests) liefert SENSOR_BACKEND=simulated plausible Werte eines Gastraums mit
+Mittags- und Abendgeschäft; SENSOR_BACKEND=replay spielt aufgezeichnete Messwerte aus CSV/Parquet erneut ab.
+Die Hardware-Module werden nur für SENSOR_BACKEND=bme680 (Standard) importiert.
+"""
+from __future__ import annotations
+import csv
+import logging
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Protocol
+
+from app.logic import metrics
+from app.logic.occupancy_estimator import absolute_humidity_g_m3
+from app.logic.rooms import DEFAULT_ROOM_SETTINGS, RoomSettings
+
+logger = logging.getLogger(__name__)
+
+SENSOR_BACKENDS = ("bme680", "simulated", "replay")
+
+
+class SensorBackend(Protocol):
+    """Gemeinsame Schnittstelle: read() = Klima/VOC + Bewegung (None ohne gültige Daten), motion_detected() = PIR-Pegel."""
+
+    def read(self) -> Dict[str, Any] | None: ...
+
+    def motion_detected(self) -> bool: ...
+
+
+class Bme680Backend:
+    """Echte Hardware: BME680 über I2C und PIR über GPIO (Import erst bei Verwendung)."""
+
+    def read(self) -> Dict[str, Any] | None:
+        from app.logic.rpi.bme680 import read_sensor_data  # öffnet den Sensor beim ersten Import
+
+        return read_sensor_data()
+
+    def motion_detected(self) -> bool:
+        from app.logic.rpi.motion_sensor_infrared import motion_detected
+
+        return bool(motion_detected())
+
+
+# Öffnungszeiten als (Start, Ende, Auslastung) in Stunden; dazwischen ist der Raum leer
+_SERVICE_PERIODS = ((11.5, 14.5, 0.6), (17.5, 22.0, 0.9))
+
+
+def occupancy_share(hour: float) -> float:
+    """Erwartete Auslastung (0..1) zur Tageszeit: sinusförmige Mittags- und Abendspitze."""
+    for start, end, peak in _SERVICE_PERIODS:
+        if start <= hour < end:
+            return peak * math.sin(math.pi * (hour - start) / (end - start))
+    return 0.0
+
+
+class SimulatedBackend:
+    """Erzeugt Messwerte aus einer simulierten Personenzahl, passend zu den Schätzparametern des Raums.
+
+    Gas-Widerstand und absolute Feuchte werden so gewählt, dass der Schätzer ungefähr die simulierte
+    Personenzahl zurückgibt; dazu kommen Rauschen und eine langsame Drift der Baseline. `clock` liefert
+    die simulierte Zeit (Unix-Sekunden), damit Lasttests einen ganzen Tag im Zeitraffer abspielen können.
+    """
+
+    def __init__(
+        self,
+        settings: RoomSettings = DEFAULT_ROOM_SETTINGS,
+        *,
+        seed: int | None = None,
+        noise: float = 0.02,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.settings = settings
+        self.noise = noise
+        self.clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.persons = 0
+
+    def _jitter(self, value: float, noise: float | None = None) -> float:
+        return value * (1.0 + self._rng.gauss(0, self.noise if noise is None else noise))
+
+    def _simulated_persons(self, now: float) -> int:
+        local = datetime.fromtimestamp(now)
+        hour = local.hour + local.minute / 60 + local.second / 3600
+        expected = occupancy_share(hour) * self.settings.model.n_max
+        # Gäste kommen und gehen schrittweise statt zu springen
+        step = (expected - self.persons) * 0.2 + (self._rng.gauss(0, 1.5) if expected else 0.0)
+        self.persons += math.floor(step) if step < 0 else round(step)
+        self.persons = max(0, min(self.persons, self.settings.model.n_max))
+        return self.persons
+
+    def read(self) -> Dict[str, Any] | None:
+        with self._lock:
+            now = self.clock()
+            persons = self._simulated_persons(now)
+            baseline, model, room = self.settings.baseline, self.settings.model, self.settings.room
+
+            # Index, den der Schätzer für diese Personenzahl erwartet (Raumskalierung herausrechnen)
+            volume_factor = room.area_m2 * room.height_m / room.v_ref_m3
+            ach_factor = room.ach_per_hour / room.ach_ref_per_hour
+            index = persons / model.n_max * model.i_ref_full / max(volume_factor * ach_factor, 1e-9)
+
+            drift = 1.0 + 0.03 * math.sin(now / 86400 * 2 * math.pi)  # Sensor-Drift über den Tag
+            gas = baseline.gas_resistance_ohm * drift * max(0.05, 1.0 - index)
+            temperature = baseline.temperature_c + 0.03 * persons
+            # Absolute Feuchte steigt um denselben Index; rel. Feuchte bei der wärmeren Raumluft zurückrechnen
+            abs_humidity = baseline.abs_humidity_g_m3 * (1.0 + index)
+            humidity = 100.0 * abs_humidity / absolute_humidity_g_m3(temperature, 100.0)
+
+            return {
+                "temperature": round(self._jitter(temperature), 2),
+                "humidity": round(min(100.0, self._jitter(humidity)), 2),
+                "voc": round(max(model.min_gas_ohm, self._jitter(gas, self.noise / 4)), 1),
+                "motion": persons > 0 and self._rng.random() < 0.9,
+            }
+
+    def motion_detected(self) -> bool:
+        with self._lock:
+            return self.persons > 0 and self._rng.random() < 0.9
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def _load_rows(path: Path) -> List[Dict[str, Any]]:
+    """Liest Messwerte aus CSV oder Parquet (Spalten wie measurements: temperature, humidity, voc, radar/motion)."""
+    if path.suffix.lower() == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet-Replay braucht pyarrow (uv add pyarrow)") from exc
+        records = pq.read_table(path).to_pylist()
+    else:
+        with path.open(newline="") as fh:
+            records = list(csv.DictReader(fh))
+
+    rows = []
+    for record in records:
+        try:
+            rows.append({
+                "temperature": float(record["temperature"]),
+                "humidity": float(record["humidity"]),
+                "voc": float(record["voc"]),
+                "motion": _parse_bool(record.get("motion", record.get("radar", False))),
+            })
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Skipping invalid replay row in %s: %r", path, record)
+    if not rows:
+        raise ValueError(f"Keine gültigen Messwerte in {path}")
+    return rows
+
+
+class ReplayBackend:
+    """Spielt aufgezeichnete Messwerte der Reihe nach ab (z. B. ein Archiv aus RETENTION_ARCHIVE_*, entpackt).
+
+    Jeder read() liefert die nächste Zeile; mit `loop` beginnt die Datei am Ende von vorn, sonst kommt None.
+    """
+
+    def __init__(self, path: str | Path, *, loop: bool = True, offset: int = 0):
+        self.path = Path(path)
+        self.loop = loop
+        self._rows = _load_rows(self.path)
+        self._position = offset % len(self._rows)
+        self._lock = threading.Lock()
+        self._last: Dict[str, Any] | None = None
+
+    def read(self) -> Dict[str, Any] | None:
+        with self._lock:
+            if self._position >= len(self._rows):
+                if not self.loop:
+                    return None
+                self._position = 0
+            self._last = dict(self._rows[self._position])
+            self._position += 1
+            return dict(self._last)
+
+    def motion_detected(self) -> bool:
+        with self._lock:
+            return bool(self._last and self._last["motion"])
+
+
+@dataclass(frozen=True)
+class SensorBackendConfig:
+    """Gewählte Quelle samt Optionen für Simulation und Replay."""
+    backend: str = "bme680"
+    seed: int | None = None
+    replay_path: str | None = None
+    replay_loop: bool = True
+
+
+def get_sensor_backend_config() -> SensorBackendConfig:
+    """Liest die Konfiguration aus der Umgebung (SENSOR_BACKEND, SENSOR_SIMULATION_SEED, SENSOR_REPLAY_PATH, SENSOR_REPLAY_LOOP)."""
+    seed = os.getenv("SENSOR_SIMULATION_SEED")
+    config = SensorBackendConfig(
+        backend=os.getenv("SENSOR_BACKEND", "bme680").strip().lower(),
+        seed=int(seed) if seed else None,
+        replay_path=os.getenv("SENSOR_REPLAY_PATH") or None,
+        replay_loop=os.getenv("SENSOR_REPLAY_LOOP", "true").lower() in ("1", "true", "yes"),
+    )
+    if config.backend not in SENSOR_BACKENDS:
+        raise ValueError(f"SENSOR_BACKEND muss einer von {', '.join(SENSOR_BACKENDS)} sein")
+    if config.backend == "replay" and not config.replay_path:
+        raise ValueError("SENSOR_BACKEND=replay braucht SENSOR_REPLAY_PATH")
+    return config
+
+
+def create_sensor_backend(config: SensorBackendConfig, settings: RoomSettings = DEFAULT_ROOM_SETTINGS) -> SensorBackend:
+    """Baut die Sensor-Quelle zur Konfiguration (die Simulation passt sich den Parametern des Raums an)."""
+    if config.backend == "simulated":
+        return SimulatedBackend(settings, seed=config.seed)
+    if config.backend == "replay":
+        return ReplayBackend(config.replay_path, loop=config.replay_loop)
+    return Bme680Backend()
+
+
+@lru_cache(maxsize=1)
+def get_sensor_backend() -> SensorBackend:
+    """Sensor-Quelle dieses Prozesses (einmal aus der Umgebung gebaut)."""
+    config = get_sensor_backend_config()
+    logger.info("Using sensor backend %s", config.backend)
+    return create_sensor_backend(config)
+
+
+def _timed_read(backend: SensorBackend) -> Dict[str, Any] | None:
+    # Bme680Backend -> "bme680", SimulatedBackend -> "simulated", ...
+    with metrics.SENSOR_READ_DURATION.labels(backend=type(backend).__name__.removesuffix("Backend").lower()).time():
+        return backend.read()
+
+
+def read_sensor_data() -> Dict[str, Any] | None:
+    """Liest eine Messung aus der konfigurierten Quelle; None, wenn (noch) keine Daten vorliegen."""
+    return _timed_read(get_sensor_backend())
+
+
+def get_sensor_data() -> Dict[str, Any]:
+    """Wie read_sensor_data(), aber immer ein Dict (Nullwerte, wenn die Quelle nichts liefert)."""
+    backend = get_sensor_backend()
+    data = _timed_read(backend)
+    if data is None:
+        data = {"temperature": 0, "humidity": 0, "voc": 0, "motion": backend.motion_detected()}
+    return data
+
+
+def motion_detected() -> bool:
+    """Aktueller Bewegungsstatus aus der konfigurierten Quelle."""
+    return get_sensor_backend().motion_detected()
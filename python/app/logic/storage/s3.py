@@ -1,10 +1,22 @@
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
 import boto3
 from botocore.client import Config
 
+from app.logic import metrics
+
+logger = logging.getLogger(__name__)
+
+# S3 verlangt mindestens 5 MiB pro Part (außer beim letzten)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 @dataclass(frozen=True)
 class S3Config:
@@ -17,6 +29,7 @@ class S3Config:
     access_key_id: str
     secret_access_key: str
     presigned_expires_seconds: int
+    max_pool_connections: int = 10
 
 
 def get_s3_config() -> S3Config:
@@ -31,39 +44,220 @@ def get_s3_config() -> S3Config:
         access_key_id=os.getenv("AWS_ACCESS_KEY_ID") or os.getenv("MINIO_ROOT_USER", "minioadmin"),
         secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY") or os.getenv("MINIO_ROOT_PASSWORD", "minioadmin"),
         presigned_expires_seconds=int(os.getenv("S3_PRESIGNED_URL_EXPIRES_SECONDS", "300")),
+        max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "10")),
     )
 
 
+# Prozessweite Client-Registry: ein boto3-Client pro (Konfiguration, Endpoint). Clients sind thread-safe und
+# halten einen urllib3-Connection-Pool; das Erzeugen kostet dagegen zig Millisekunden und einige MB Speicher.
+_clients: dict[tuple[S3Config, bool], object] = {}
+_clients_lock = threading.Lock()
+
+
 def _client(config: S3Config, *, public_endpoint: bool = False):
-    """Erstellt einen S3-Client; für presigned URLs wird der Browser-Endpoint genutzt."""
-    endpoint_url = config.public_endpoint_url if public_endpoint else config.endpoint_url
-    return boto3.client(
-        "s3",
-        endpoint_url=endpoint_url,
-        region_name=config.region,
-        aws_access_key_id=config.access_key_id,
-        aws_secret_access_key=config.secret_access_key,
-        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
-    )
+    """Liefert den (wiederverwendeten) S3-Client; für presigned URLs wird der Browser-Endpoint genutzt."""
+    key = (config, public_endpoint)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            endpoint_url = config.public_endpoint_url if public_endpoint else config.endpoint_url
+            # Eigene Session: die boto3-Default-Session ist beim Erzeugen von Clients nicht thread-safe.
+            client = boto3.session.Session().client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=config.region,
+                aws_access_key_id=config.access_key_id,
+                aws_secret_access_key=config.secret_access_key,
+                config=Config(
+                    signature_version="s3v4",
+                    s3={"addressing_style": "path"},
+                    max_pool_connections=config.max_pool_connections,
+                    tcp_keepalive=True,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                ),
+            )
+            _clients[key] = client
+    return client
+
+
+def _reset_after_fork() -> None:
+    """Nach fork() (Celery-Prefork, Gunicorn) keine Pool-Sockets des Elternprozesses weiterverwenden."""
+    global _clients_lock, _presigned_lock
+    _clients.clear()
+    _clients_lock = threading.Lock()
+    _presigned_urls.clear()
+    _presigned_lock = threading.Lock()
+
+
+def upload_file(path: Path, *, object_key: str, content_type: str, mode: str = "file") -> str:
+    """Lädt eine lokale Datei in den privaten S3-Bucket hoch und gibt den Bucket zurück.
+
+    `mode` landet als Label in den Upload-Metriken, damit z. B. Vorschaubilder die Clip-Werte nicht verzerren.
+    """
+    config = get_s3_config()
+    size_bytes = path.stat().st_size
+    with metrics.S3_UPLOAD_DURATION.labels(mode=mode).time():
+        _client(config).upload_file(
+            str(path),
+            config.bucket,
+            object_key,
+            ExtraArgs={"ContentType": content_type},
+        )
+    metrics.S3_UPLOAD_BYTES.labels(mode=mode).observe(size_bytes)
+    return config.bucket
 
 
 def upload_video_file(path: Path, *, object_key: str, content_type: str = "video/mp4") -> str:
     """Lädt eine lokale Videodatei in den privaten S3-Bucket hoch."""
+    return upload_file(path, object_key=object_key, content_type=content_type)
+
+
+def download_file(bucket: str, object_key: str, path: Path) -> Path:
+    """Lädt ein Objekt aus dem Bucket in eine lokale Datei."""
+    _client(get_s3_config()).download_file(bucket, object_key, str(path))
+    return path
+
+
+def multipart_part_size() -> int:
+    """Part-Größe für Streaming-Uploads aus S3_MULTIPART_PART_SIZE_MB (Standard 5, mindestens 5 MiB)."""
+    return max(MIN_PART_SIZE, int(float(os.getenv("S3_MULTIPART_PART_SIZE_MB", "5")) * 1024 * 1024))
+
+
+def _read_part(stream: BinaryIO, size: int) -> bytes:
+    """Liest bis zu `size` Bytes; Pipes liefern oft weniger pro read(), daher bis EOF oder Part voll sammeln."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def upload_video_stream(
+    stream: BinaryIO,
+    *,
+    object_key: str,
+    content_type: str = "video/mp4",
+    part_size: int | None = None,
+) -> tuple[str, int]:
+    """Lädt einen Datenstrom (z. B. fMP4 aus einer Aufnahme-Pipe) per Multipart-Upload hoch, solange er noch wächst.
+
+    Jeder volle Part geht sofort raus, sodass der Upload parallel zur Aufnahme läuft. Ist der ganze Strom
+    kleiner als ein Part, wird er mit einem einfachen PUT geschrieben. Bei Fehlern wird der Multipart-Upload
+    abgebrochen, damit keine verwaisten Parts im Bucket liegen bleiben. Gibt Bucket und Größe in Bytes zurück.
+    """
     config = get_s3_config()
-    _client(config).upload_file(
-        str(path),
-        config.bucket,
-        object_key,
-        ExtraArgs={"ContentType": content_type},
-    )
-    return config.bucket
+    client = _client(config)
+    part_size = max(MIN_PART_SIZE, part_size or multipart_part_size())
+    started = time.perf_counter()  # inkl. Warten auf die Aufnahme, der Upload läuft parallel dazu
+
+    first = _read_part(stream, part_size)
+    if len(first) < part_size:
+        client.put_object(Bucket=config.bucket, Key=object_key, Body=first, ContentType=content_type)
+        _observe_upload("stream", started, len(first))
+        return config.bucket, len(first)
+
+    upload_id = client.create_multipart_upload(
+        Bucket=config.bucket,
+        Key=object_key,
+        ContentType=content_type,
+    )["UploadId"]
+    parts = []
+    size_bytes = 0
+    try:
+        data = first
+        while data:
+            part_number = len(parts) + 1
+            response = client.upload_part(
+                Bucket=config.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            size_bytes += len(data)
+            data = _read_part(stream, part_size)
+
+        client.complete_multipart_upload(
+            Bucket=config.bucket,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        try:
+            client.abort_multipart_upload(Bucket=config.bucket, Key=object_key, UploadId=upload_id)
+        except Exception:
+            logger.warning("Failed to abort multipart upload %s for %s", upload_id, object_key, exc_info=True)
+        raise
+    _observe_upload("stream", started, size_bytes)
+    return config.bucket, size_bytes
+
+
+def _observe_upload(mode: str, started: float, size_bytes: int) -> None:
+    metrics.S3_UPLOAD_DURATION.labels(mode=mode).observe(time.perf_counter() - started)
+    metrics.S3_UPLOAD_BYTES.labels(mode=mode).observe(size_bytes)
+
+
+# Presigned URLs: (bucket, key, expires) -> (url, gültig bis, monotonic); LRU-begrenzt
+PRESIGNED_CACHE_MAX_ENTRIES = 1024
+_presigned_urls: OrderedDict[tuple[str, str, int], tuple[str, float]] = OrderedDict()
+_presigned_lock = threading.Lock()
+
+
+def presigned_cache_seconds(config: S3Config) -> int:
+    """Wie lange eine URL wiederverwendet wird (S3_PRESIGNED_URL_CACHE_SECONDS, Standard: halbe Gültigkeit).
+
+    Höchstens Gültigkeit minus 60 s: auch eine URL aus dem Cache ist beim Abspielen noch mindestens eine Minute
+    gültig. 0 schaltet den Cache ab.
+    """
+    default = config.presigned_expires_seconds // 2
+    requested = int(os.getenv("S3_PRESIGNED_URL_CACHE_SECONDS", str(default)))
+    return max(0, min(requested, config.presigned_expires_seconds - 60))
 
 
 def create_presigned_video_url(bucket: str, object_key: str) -> str:
-    """Erzeugt eine kurzlebige URL, über die der Browser das private Video abspielen kann."""
+    """Erzeugt eine kurzlebige URL, über die der Browser das private Video abspielen kann.
+
+    Wiederholte Aufrufe für dasselbe Objekt bekommen die URL aus dem Speicher, solange sie noch sicher gültig ist.
+    """
     config = get_s3_config()
-    return _client(config, public_endpoint=True).generate_presigned_url(
+    cache_seconds = presigned_cache_seconds(config)
+    key = (bucket, object_key, config.presigned_expires_seconds)
+    now = time.monotonic()
+
+    started = time.perf_counter()
+
+    if cache_seconds:
+        with _presigned_lock:
+            cached = _presigned_urls.get(key)
+            if cached is not None and cached[1] > now:
+                _presigned_urls.move_to_end(key)
+                metrics.S3_PRESIGN_DURATION.labels(cache="hit").observe(time.perf_counter() - started)
+                return cached[0]
+
+    url = _client(config, public_endpoint=True).generate_presigned_url(
         "get_object",
         Params={"Bucket": bucket, "Key": object_key},
         ExpiresIn=config.presigned_expires_seconds,
     )
+    metrics.S3_PRESIGN_DURATION.labels(cache="miss").observe(time.perf_counter() - started)
+
+    if cache_seconds:
+        with _presigned_lock:
+            _presigned_urls[key] = (url, now + cache_seconds)
+            _presigned_urls.move_to_end(key)
+            while len(_presigned_urls) > PRESIGNED_CACHE_MAX_ENTRIES:
+                _presigned_urls.popitem(last=False)
+    return url
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
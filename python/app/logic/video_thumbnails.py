@@ -0,0 +1,106 @@
+"""Vorschaubilder für den Videoverlauf: Poster-JPEG und Sprite (Einzelbilder nebeneinander) per ffmpeg.
+
+Beide Bilder liegen neben dem Clip im Bucket (gleicher Object-Key mit anderer Endung). Das Dashboard lädt so
+pro Listeneintrag nur wenige KB statt des ganzen MP4; das Sprite erlaubt Vorschau beim Überfahren mit der Maus.
+"""
+from __future__ import annotations
+import os
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+
+@dataclass(frozen=True)
+class ThumbnailConfig:
+    """Breite des Posters, Anzahl und Breite der Sprite-Kacheln."""
+    poster_width: int = 320
+    sprite_frames: int = 10
+    sprite_width: int = 96
+
+
+def get_thumbnail_config() -> ThumbnailConfig:
+    """Liest die Vorschau-Konfiguration aus der Umgebung (VIDEO_POSTER_WIDTH, VIDEO_SPRITE_FRAMES, VIDEO_SPRITE_WIDTH)."""
+    config = ThumbnailConfig(
+        poster_width=int(os.getenv("VIDEO_POSTER_WIDTH", "320")),
+        sprite_frames=int(os.getenv("VIDEO_SPRITE_FRAMES", "10")),
+        sprite_width=int(os.getenv("VIDEO_SPRITE_WIDTH", "96")),
+    )
+    if config.sprite_frames <= 0:
+        raise ValueError("VIDEO_SPRITE_FRAMES muss > 0 sein")
+    return config
+
+
+def _sibling_key(object_key: str, suffix: str) -> str:
+    """videos/.../clip.mp4 -> videos/.../clip<suffix>"""
+    path = PurePosixPath(object_key)
+    return str(path.with_name(path.stem + suffix))
+
+
+def poster_key_for(object_key: str) -> str:
+    """Object-Key des Poster-JPEGs neben dem Clip."""
+    return _sibling_key(object_key, ".poster.jpg")
+
+
+def sprite_key_for(object_key: str) -> str:
+    """Object-Key des Sprite-JPEGs neben dem Clip."""
+    return _sibling_key(object_key, ".sprite.jpg")
+
+
+def extract_poster(video_path: Path, output_path: Path, *, duration_seconds: int, width: int, timeout: int = 30) -> Path:
+    """Schreibt ein Einzelbild aus der Clipmitte (höchstens nach 1 s) als JPEG."""
+    at_seconds = min(1.0, max(0.0, duration_seconds / 2))
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            f"{at_seconds:.2f}",
+            "-i",
+            str(video_path),
+            "-frames:v",
+            "1",
+            "-vf",
+            f"scale={width}:-2",
+            "-q:v",
+            "4",
+            str(output_path),
+        ],
+        check=True,
+        timeout=timeout,
+    )
+    return output_path
+
+
+def build_sprite(
+    video_path: Path,
+    output_path: Path,
+    *,
+    duration_seconds: int,
+    frames: int,
+    width: int,
+    timeout: int = 60,
+) -> Path:
+    """Schreibt `frames` gleichmäßig verteilte Bilder als eine Zeile (tile=frames x 1) in ein JPEG."""
+    fps = f"{frames}/{max(1, duration_seconds)}"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(video_path),
+            "-vf",
+            f"fps={fps},scale={width}:-2,tile={frames}x1",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "5",
+            str(output_path),
+        ],
+        check=True,
+        timeout=timeout,
+    )
+    return output_path
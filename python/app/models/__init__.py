@@ -1,2 +1,6 @@
 from .measurements import Measurements  # Modell-Klasse importieren (z. B. für DB-Registrierung/Weiterverwendung)
 from .video_recording import VideoRecording
+from .room import Room
+from .device import Device
+from .measurement_rollup import MeasurementRollup
+from .measurement_ingest_batch import MeasurementIngestBatch
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from app.extensions.db import db
+
+
+class Device(db.Model):
+    """Sensor-Knoten (z. B. ein Raspberry Pi) und der Raum, für den er misst."""
+    __tablename__ = "devices"
+
+    id = db.Column(db.Integer, primary_key=True)
+    device_key = db.Column(db.String(64), nullable=False, unique=True)   # DEVICE_KEY des Knotens (Standard: Hostname)
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id"), nullable=False, index=True)
+    name = db.Column(db.String(255), nullable=True)
+    token_hash = db.Column(db.String(64), nullable=True, unique=True, index=True)   # SHA-256 des Batch-API-Tokens
+    last_seen_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    def __repr__(self):
+        return f"<Device id={self.id} device_key={self.device_key} room_id={self.room_id}>"
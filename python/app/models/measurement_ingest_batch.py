@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from app.extensions.db import db
+
+
+class MeasurementIngestBatch(db.Model):
+    """Bereits geschriebene Batches der gepufferten Erfassung (macht das erneute Flushen nach Absturz idempotent)."""
+    __tablename__ = "measurement_ingest_batches"
+
+    batch_id = db.Column(db.String(32), primary_key=True)   # ID aus dem Redis-Puffer
+    row_count = db.Column(db.Integer, nullable=False)        # Anzahl geschriebener Messwerte
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,48 @@
+from app.extensions.db import db
+
+# Bucket-Größen der Rollups in Sekunden (1 Minute, 15 Minuten, 1 Stunde, 1 Tag)
+ROLLUP_BUCKETS = (60, 900, 3600, 86400)
+
+# Messgrößen, für die pro Bucket count/min/max/sum/sum_sq geführt werden
+ROLLUP_METRICS = ("temperature", "humidity", "voc", "persons")
+
+
+class MeasurementRollup(db.Model):
+    """Voraggregierte Messwerte pro Zeit-Bucket (inkrementell beim Schreiben der Rohdaten gepflegt)."""
+    __tablename__ = "measurement_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("room_id", "bucket_seconds", "bucket_start", name="uq_measurement_rollups_room_bucket"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, nullable=False, default=1, server_default="1")  # Rollups je Raum
+    bucket_seconds = db.Column(db.Integer, nullable=False)               # Bucket-Breite (60/900/3600/86400)
+    bucket_start = db.Column(db.DateTime(timezone=True), nullable=False)  # Beginn des Buckets (UTC)
+    count = db.Column(db.Integer, nullable=False)                         # Anzahl Rohwerte im Bucket
+
+    # Je Messgröße: min, max, Summe (-> Mittelwert) und Quadratsumme (-> Standardabweichung)
+    temperature_min = db.Column(db.Float, nullable=False)
+    temperature_max = db.Column(db.Float, nullable=False)
+    temperature_sum = db.Column(db.Float, nullable=False)
+    temperature_sum_sq = db.Column(db.Float, nullable=False)
+
+    humidity_min = db.Column(db.Float, nullable=False)
+    humidity_max = db.Column(db.Float, nullable=False)
+    humidity_sum = db.Column(db.Float, nullable=False)
+    humidity_sum_sq = db.Column(db.Float, nullable=False)
+
+    voc_min = db.Column(db.Float, nullable=False)
+    voc_max = db.Column(db.Float, nullable=False)
+    voc_sum = db.Column(db.Float, nullable=False)
+    voc_sum_sq = db.Column(db.Float, nullable=False)
+
+    persons_min = db.Column(db.Float, nullable=False)
+    persons_max = db.Column(db.Float, nullable=False)
+    persons_sum = db.Column(db.Float, nullable=False)
+    persons_sum_sq = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<MeasurementRollup room_id={self.room_id} bucket_seconds={self.bucket_seconds} "
+            f"bucket_start={self.bucket_start} count={self.count}>"
+        )
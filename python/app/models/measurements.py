@@ -8,6 +8,14 @@ from datetime import datetime, timezone
 class Measurements(db.Model):
     """SQLAlchemy-Modell für einen einzelnen Messwert (Temperatur, Luftfeuchte, VOC, Personen, Radar, Zeit)."""
     __tablename__ = "measurements"
+    __table_args__ = (
+        # Zeitbereich + Dashboard-Spalten (Covering Index für 24h-Abfragen und Retention)
+        db.Index("ix_measurements_timestamp_temperature_persons", "timestamp", "temperature", "persons"),
+        # Gleiches pro Raum: Dashboard/letzter Wert eines Raums ohne Zeilen anderer Räume zu lesen
+        db.Index(
+            "ix_measurements_room_timestamp_temperature_persons", "room_id", "timestamp", "temperature", "persons"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)        # eindeutige ID
     temperature = db.Column(db.Float, nullable=False)   # Temperatur in °C
@@ -15,6 +23,9 @@ class Measurements(db.Model):
     voc = db.Column(db.Float, nullable=False)           # VOC / Gas-Wert (je nach Sensor)
     persons = db.Column(db.Integer, nullable=False)     # geschätzte Personenanzahl
     radar = db.Column(db.Boolean, nullable=False)       # Bewegung erkannt (True/False)
+    room_id = db.Column(                                # Raum des messenden Knotens (1 = Standardraum)
+        db.Integer, db.ForeignKey("rooms.id"), nullable=False, default=1, server_default="1"
+    )
 
     # Zeitpunkt des Messwerts (Standard: jetzt in UTC)
     timestamp = db.Column(
@@ -1,32 +1,149 @@
 from datetime import datetime
+from sqlalchemy import Row, func, or_, select
 from app.extensions.db import db
-from app.models import Measurements, VideoRecording
+from app.logic.rooms import DEFAULT_ROOM_ID
+from app.models import MeasurementRollup, Measurements, Room, VideoRecording
 
 
-def get_latest() -> Measurements | None:
-    """Gibt den neuesten Messwert zurück (oder None, wenn keine Daten existieren)."""
-    return (
+def get_rooms() -> list[Room]:
+    """Alle konfigurierten Räume (aufsteigend nach ID)."""
+    return db.session.query(Room).order_by(Room.id.asc()).all()
+
+
+def get_latest(room_id: int | None = None) -> Measurements | None:
+    """Gibt den neuesten Messwert zurück (optional nur eines Raums; None, wenn keine Daten existieren)."""
+    query = db.session.query(Measurements)
+    if room_id is not None:
+        query = query.filter(Measurements.room_id == room_id)
+    return query.order_by(Measurements.timestamp.desc()).first()  # neuester Zeitstempel zuerst
+
+
+def get_latest_per_room() -> list[Measurements]:
+    """Neuester Messwert je Raum in einer Abfrage (Gruppen-Maximum über ix_measurements_room_timestamp_*)."""
+    latest = (
+        select(Measurements.room_id, func.max(Measurements.timestamp).label("timestamp"))
+        .group_by(Measurements.room_id)
+        .subquery()
+    )
+    rows = (
         db.session.query(Measurements)
-        .order_by(Measurements.timestamp.desc())  # neuester Zeitstempel zuerst
-        .first()
+        .join(latest, (Measurements.room_id == latest.c.room_id) & (Measurements.timestamp == latest.c.timestamp))
+        .order_by(Measurements.room_id.asc(), Measurements.id.desc())
+        .all()
+    )
+    # Bei gleichem Zeitstempel gewinnt die höhere ID
+    by_room: dict[int, Measurements] = {}
+    for row in rows:
+        by_room.setdefault(row.room_id, row)
+    return list(by_room.values())
+
+
+def get_latest_measurement_id(room_id: int | None = None) -> int | None:
+    """Höchste Messungs-ID (optional je Raum; reiner Index-Lookup, z. B. als Datenversion für Caches)."""
+    stmt = select(func.max(Measurements.id))
+    if room_id is not None:
+        stmt = stmt.where(Measurements.room_id == room_id)
+    return db.session.execute(stmt).scalar()
+
+
+def get_expired_measurement_rows(cutoff: datetime, *, after_id: int, max_id: int | None, limit: int) -> list[Row]:
+    """Nächster Block (PK aufsteigend) von Messwerten vor `cutoff` mit id > after_id (und <= max_id); für das Archiv."""
+    m = Measurements
+    stmt = select(m.id, m.room_id, m.timestamp, m.temperature, m.humidity, m.voc, m.persons, m.radar).where(
+        m.timestamp < cutoff, m.id > after_id
+    )
+    if max_id is not None:
+        stmt = stmt.where(m.id <= max_id)
+    return db.session.execute(stmt.order_by(m.id.asc()).limit(limit)).all()
+
+
+def get_since(since: datetime, room_id: int | None = None) -> list[Measurements]:
+    """Gibt alle Messwerte ab einem Zeitpunkt zurück (optional nur eines Raums; aufsteigend nach Zeit sortiert)."""
+    query = db.session.query(Measurements).filter(Measurements.timestamp >= since)  # nur Daten ab 'since'
+    if room_id is not None:
+        query = query.filter(Measurements.room_id == room_id)
+    return query.order_by(Measurements.timestamp.asc()).all()  # ältester zuerst
+
+
+def get_columns_since(since: datetime, columns: tuple[str, ...], room_id: int | None = None) -> list[Row]:
+    """Wie get_since(), liefert aber nur die angefragten Spalten als leichte Tupel (ohne ORM-Objekte)."""
+    table_columns = Measurements.__table__.c
+    unknown = [name for name in columns if name not in table_columns]
+    if unknown:
+        raise ValueError(f"Unbekannte Spalten für measurements: {', '.join(unknown)}")
+
+    stmt = select(*(table_columns[name] for name in columns)).where(Measurements.timestamp >= since)  # nur Daten ab 'since'
+    if room_id is not None:
+        stmt = stmt.where(Measurements.room_id == room_id)
+    return db.session.execute(stmt.order_by(Measurements.timestamp.asc())).all()  # ältester zuerst
+
+
+def get_rollups_since(since: datetime, bucket_seconds: int, room_id: int = DEFAULT_ROOM_ID) -> list[MeasurementRollup]:
+    """Gibt die Rollups eines Raums und einer Bucket-Größe ab einem Zeitpunkt zurück (aufsteigend nach Bucket-Start)."""
+    return (
+        db.session.query(MeasurementRollup)
+        .filter(MeasurementRollup.room_id == room_id)
+        .filter(MeasurementRollup.bucket_seconds == bucket_seconds)
+        .filter(MeasurementRollup.bucket_start >= since)
+        .order_by(MeasurementRollup.bucket_start.asc())
+        .all()
     )
 
 
-def get_since(since: datetime) -> list[Measurements]:
-    """Gibt alle Messwerte ab einem Zeitpunkt zurück (aufsteigend nach Zeit sortiert)."""
+def get_video_recordings(
+    limit: int = 25,
+    *,
+    cursor: tuple[datetime, int] | None = None,
+    before: datetime | None = None,
+    after: datetime | None = None,
+    status: str | None = None,
+) -> list[VideoRecording]:
+    """Gibt Videoaufnahmen absteigend nach (recorded_at, id) zurück, optional ab einem Keyset-Cursor.
+
+    `cursor` ist (recorded_at, id) des letzten Eintrags der vorherigen Seite; statt OFFSET wird direkt im
+    Index (recorded_at, id) bzw. (status, recorded_at, id) weitergesucht, die Kosten hängen nicht von der Tiefe ab.
+    `before`/`after` begrenzen den Zeitraum (recorded_at < before, recorded_at >= after).
+    """
+    query = db.session.query(VideoRecording)
+    if status is not None:
+        query = query.filter(VideoRecording.status == status)
+    if before is not None:
+        query = query.filter(VideoRecording.recorded_at < before)
+    if after is not None:
+        query = query.filter(VideoRecording.recorded_at >= after)
+    if cursor is not None:
+        cursor_at, cursor_id = cursor
+        # (recorded_at, id) < cursor: "<=" auf der führenden Spalte liefert einen reinen Index-Range,
+        # das OR filtert nur noch die Gleichstände am Rand (reines OR-Form nutzen SQLite/MariaDB nicht als Range)
+        query = query.filter(
+            VideoRecording.recorded_at <= cursor_at,
+            or_(VideoRecording.recorded_at < cursor_at, VideoRecording.id < cursor_id),
+        )
     return (
-        db.session.query(Measurements)
-        .filter(Measurements.timestamp >= since)  # nur Daten ab 'since'
-        .order_by(Measurements.timestamp.asc())   # ältester zuerst
+        query
+        .order_by(VideoRecording.recorded_at.desc(), VideoRecording.id.desc())
+        .limit(limit)
         .all()
     )
 
 
-def get_video_recordings(limit: int = 25) -> list[VideoRecording]:
-    """Gibt die neuesten Videoaufnahmen absteigend nach Aufnahmezeit zurück."""
+def get_video_recordings_by_status(status: str, *, created_before: datetime, limit: int = 100) -> list[VideoRecording]:
+    """Gibt die ältesten Aufnahmen mit Status `status` zurück, die vor `created_before` angelegt wurden."""
     return (
         db.session.query(VideoRecording)
-        .order_by(VideoRecording.recorded_at.desc(), VideoRecording.id.desc())
+        .filter(VideoRecording.status == status, VideoRecording.created_at < created_before)
+        .order_by(VideoRecording.created_at.asc(), VideoRecording.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_stale_video_uploads(*, started_before: datetime, limit: int = 100) -> list[VideoRecording]:
+    """Gibt Aufnahmen zurück, deren Upload vor `started_before` übernommen, aber nie abgeschlossen wurde."""
+    return (
+        db.session.query(VideoRecording)
+        .filter(VideoRecording.status == "uploading", VideoRecording.upload_started_at < started_before)
+        .order_by(VideoRecording.upload_started_at.asc(), VideoRecording.id.asc())
         .limit(limit)
         .all()
     )
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+from app.extensions.db import db
+
+
+class Room(db.Model):
+    """Gastraum mit eigenen Schätzparametern (Raumgröße, Modell, Start-Baseline); Messwerte hängen per room_id daran."""
+    __tablename__ = "rooms"
+
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(64), nullable=False, unique=True)   # Kennung in URLs/Env, z. B. "terrasse"
+    name = db.Column(db.String(255), nullable=False)
+
+    # Raumparameter (RoomConfig)
+    area_m2 = db.Column(db.Float, nullable=False, default=180.0)
+    height_m = db.Column(db.Float, nullable=False, default=3.0)
+    ach_per_hour = db.Column(db.Float, nullable=False, default=2.0)
+    v_ref_m3 = db.Column(db.Float, nullable=False, default=300.0)
+    ach_ref_per_hour = db.Column(db.Float, nullable=False, default=2.0)
+
+    # Modellparameter (ModelConfig)
+    weight_gas = db.Column(db.Float, nullable=False, default=0.8)
+    weight_hum = db.Column(db.Float, nullable=False, default=0.2)
+    n_max = db.Column(db.Integer, nullable=False, default=125)
+    i_ref_full = db.Column(db.Float, nullable=False, default=0.20)
+    gas_temp_coeff_per_c = db.Column(db.Float, nullable=False, default=0.0)
+
+    # Feste Baseline, bis die Streaming-Baseline des Raums eingeschwungen ist
+    baseline_temperature_c = db.Column(db.Float, nullable=False, default=21.0)
+    baseline_rh_percent = db.Column(db.Float, nullable=False, default=35.0)
+    baseline_gas_resistance_ohm = db.Column(db.Float, nullable=False, default=22000.0)
+
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    # Geänderte Parameter werden über updated_at erkannt und der Schätzplan neu kompiliert
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    def __repr__(self):
+        return f"<Room id={self.id} slug={self.slug} name={self.name}>"
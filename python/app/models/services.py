@@ -1,13 +1,206 @@
 import logging
+import math
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Sequence
+
+from redis.exceptions import RedisError
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
 from app.extensions.db import db
+from app.extensions.redis_client import get_redis
+from app.logic import dashboard_cache, live_events, metrics
+from app.logic.batch_ingest import generate_token, hash_token
+from app.logic.online_regression import dashboard_regression_window, regression_payload
+from app.logic.rooms import (
+    DEFAULT_ROOM_ID,
+    DEFAULT_ROOM_SETTINGS,
+    RoomRegistry,
+    room_config_ttl_seconds,
+    room_settings,
+)
+from app.models.device import Device
+from app.models.measurement_ingest_batch import MeasurementIngestBatch
+from app.models.measurement_rollup import ROLLUP_BUCKETS, ROLLUP_METRICS, MeasurementRollup
 from app.models.measurements import Measurements
+from app.models.repositories import get_rooms
 from app.models.video_recording import VideoRecording
+from app.serializers import current_payload, video_payload
 
 logger = logging.getLogger(__name__)
 
+# Aufbewahrung der Rollups in Tagen je Bucket-Größe (None = unbegrenzt)
+ROLLUP_RETENTION_DAYS = {60: 7, 900: 90, 3600: 730, 86400: None}
+
+
+def _bucket_start(timestamp: datetime, bucket_seconds: int) -> datetime:
+    """Rundet einen Zeitstempel auf den Beginn seines Buckets ab (UTC; naive Werte gelten als UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % bucket_seconds, timezone.utc)
+
+
+def _bucket_ceil(timestamp: datetime, bucket_seconds: int) -> datetime:
+    """Beginn des ersten Buckets, der vollständig ab `timestamp` liegt (aufgerundet auf die Bucket-Grenze)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    start = _bucket_start(timestamp, bucket_seconds)
+    return start if start == timestamp else start + timedelta(seconds=bucket_seconds)
+
+
+def _aggregate_rollups(rows: Iterable[Mapping[str, Any]], into: dict | None = None) -> dict:
+    """Fasst Rohwerte (Dicts mit room_id, timestamp + Messgrößen) zu Rollup-Zeilen je (Raum, Bucket-Größe, Bucket-Start) zusammen."""
+    aggregated = {} if into is None else into
+    for row in rows:
+        room_id = row.get("room_id") or DEFAULT_ROOM_ID
+        for bucket_seconds in ROLLUP_BUCKETS:
+            bucket_start = _bucket_start(row["timestamp"], bucket_seconds)
+            agg = aggregated.get((room_id, bucket_seconds, bucket_start))
+            if agg is None:
+                agg = {"room_id": room_id, "bucket_seconds": bucket_seconds, "bucket_start": bucket_start, "count": 0}
+                for metric in ROLLUP_METRICS:
+                    agg[f"{metric}_min"] = math.inf
+                    agg[f"{metric}_max"] = -math.inf
+                    agg[f"{metric}_sum"] = 0.0
+                    agg[f"{metric}_sum_sq"] = 0.0
+                aggregated[(room_id, bucket_seconds, bucket_start)] = agg
+
+            agg["count"] += 1
+            for metric in ROLLUP_METRICS:
+                value = float(row[metric])
+                agg[f"{metric}_min"] = min(agg[f"{metric}_min"], value)
+                agg[f"{metric}_max"] = max(agg[f"{metric}_max"], value)
+                agg[f"{metric}_sum"] += value
+                agg[f"{metric}_sum_sq"] += value * value
+    return aggregated
+
+
+def _upsert_rollups(values: list[dict]) -> None:
+    """Addiert voraggregierte Werte per Upsert auf bestehende Buckets (in der laufenden Transaktion).
+
+    MariaDB/MySQL: INSERT ... ON DUPLICATE KEY UPDATE, SQLite/PostgreSQL: ON CONFLICT DO UPDATE, sonst _merge_rollups().
+    """
+    if not values:
+        return
+
+    table = MeasurementRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table).values(values)
+        new, least, greatest = stmt.inserted, func.least, func.greatest
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        # SQLite kennt kein LEAST/GREATEST, min()/max() mit zwei Argumenten verhalten sich gleich
+        stmt = insert(table).values(values)
+        new, least, greatest = stmt.excluded, func.min, func.max
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(table).values(values)
+        new, least, greatest = stmt.excluded, func.least, func.greatest
+    else:
+        _merge_rollups(values)
+        return
 
-def create_measurements(temperature, humidity, voc, persons, radar) -> int:
+    updates = {"count": table.c["count"] + new["count"]}
+    for metric in ROLLUP_METRICS:
+        updates[f"{metric}_min"] = least(table.c[f"{metric}_min"], new[f"{metric}_min"])
+        updates[f"{metric}_max"] = greatest(table.c[f"{metric}_max"], new[f"{metric}_max"])
+        updates[f"{metric}_sum"] = table.c[f"{metric}_sum"] + new[f"{metric}_sum"]
+        updates[f"{metric}_sum_sq"] = table.c[f"{metric}_sum_sq"] + new[f"{metric}_sum_sq"]
+
+    if dialect in ("sqlite", "postgresql"):
+        stmt = stmt.on_conflict_do_update(index_elements=["room_id", "bucket_seconds", "bucket_start"], set_=updates)
+    else:
+        stmt = stmt.on_duplicate_key_update(updates)
+    db.session.execute(stmt)
+
+
+def _merge_rollups(values: list[dict]) -> None:
+    """Fallback für Dialekte ohne Upsert: Bucket mit FOR UPDATE lesen, dann ergänzen oder neu anlegen.
+
+    Eine Anweisung pro Bucket statt einer für alle; legt ein paralleler Schreiber denselben Bucket zuerst an,
+    greift die Unique-Constraint und der Bucket wird im zweiten Durchlauf ergänzt.
+    """
+    table = MeasurementRollup.__table__
+    for value in values:
+        where = and_(*(table.c[key] == value[key] for key in ("room_id", "bucket_seconds", "bucket_start")))
+        for attempt in range(2):
+            current = db.session.execute(select(table).where(where).with_for_update()).mappings().first()
+            if current is not None:
+                merged = {"count": current["count"] + value["count"]}
+                for metric in ROLLUP_METRICS:
+                    merged[f"{metric}_min"] = min(current[f"{metric}_min"], value[f"{metric}_min"])
+                    merged[f"{metric}_max"] = max(current[f"{metric}_max"], value[f"{metric}_max"])
+                    merged[f"{metric}_sum"] = current[f"{metric}_sum"] + value[f"{metric}_sum"]
+                    merged[f"{metric}_sum_sq"] = current[f"{metric}_sum_sq"] + value[f"{metric}_sum_sq"]
+                db.session.execute(update(table).where(table.c.id == current["id"]).values(merged))
+                break
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(table).values(value))
+                break
+            except IntegrityError:
+                if attempt:
+                    raise
+
+
+def _measurement_row(m: Measurements) -> dict:
+    """Messwert als Dict für die Rollup-Aggregation."""
+    return {
+        "room_id": m.room_id,
+        "timestamp": m.timestamp,
+        "temperature": m.temperature,
+        "humidity": m.humidity,
+        "voc": m.voc,
+        "persons": m.persons,
+    }
+
+
+def _after_measurements_commit(measurements: Sequence[Any]) -> None:
+    """Pflegt nach dem Commit die abgeleiteten Redis-Daten und benachrichtigt offene Dashboards.
+
+    Erwartet Objekte mit Spalten-Attributen (ORM-Objekte oder Result-Rows). Pro betroffenem Raum werden
+    Regressionsfenster, Cache-Version und Live-Event getrennt gepflegt. Fehler blockieren das Schreiben nicht.
+    """
+    by_room: dict[int, list] = {}
+    for m in measurements:
+        by_room.setdefault(m.room_id or DEFAULT_ROOM_ID, []).append(m)
+
+    for room_id, room_measurements in by_room.items():
+        regression = None
+        try:
+            window = dashboard_regression_window(room_id)
+            for m in room_measurements:
+                timestamp = m.timestamp if m.timestamp.tzinfo else m.timestamp.replace(tzinfo=timezone.utc)
+                window.add(m.id, timestamp.timestamp(), int(m.persons), float(m.temperature))
+            if window.is_ready():
+                # Nur vollständig aufgebaute Summen verschicken, sonst behält das Dashboard seine Regression
+                regression = regression_payload(*window.snapshot(datetime.now(timezone.utc).timestamp()))
+        except RedisError:
+            logger.warning("Failed to update regression window in Redis (room=%s)", room_id, exc_info=True)
+
+        try:
+            redis_client = get_redis()
+            # Erst nach dem Fenster-Update, damit ein neuer Payload die neuen Summen sieht
+            dashboard_cache.bump_version(redis_client, max(m.id for m in room_measurements), room_id=room_id)
+            live_events.publish(redis_client, "measurements", {
+                "room_id": room_id,
+                "measurements": [{"id": m.id, **current_payload(m)} for m in room_measurements],
+                "regression": regression,
+            })
+        except RedisError:
+            logger.warning("Failed to publish measurement update in Redis (room=%s)", room_id, exc_info=True)
+
+
+def create_measurements(temperature, humidity, voc, persons, radar, room_id: int = DEFAULT_ROOM_ID) -> int:
     """Legt einen neuen Messwert in der DB an und gibt die erzeugte ID zurück."""
     m = Measurements(
         temperature=temperature,
@@ -15,34 +208,233 @@ def create_measurements(temperature, humidity, voc, persons, radar) -> int:
         voc=voc,
         persons=persons,
         radar=radar,
+        room_id=room_id,
     )
     try:
-        db.session.add(m)       # Objekt zur Session hinzufügen
-        db.session.commit()     # in die DB schreiben
+        with metrics.MEASUREMENT_COMMIT_DURATION.labels(mode="single").time():
+            db.session.add(m)       # Objekt zur Session hinzufügen
+            db.session.flush()      # Zeitstempel/ID vergeben, bevor die Rollups berechnet werden
+            _upsert_rollups(list(_aggregate_rollups([_measurement_row(m)]).values()))  # gleiche Transaktion
+            db.session.commit()     # in die DB schreiben
         logger.info("Created measurement id=%s", m.id)
-        return m.id
     except Exception:
         db.session.rollback()   # bei Fehler alles zurückrollen
         logger.exception("Failed to create measurement")
         raise
 
+    _after_measurements_commit([m])
+    return m.id
+
+
+def create_measurements_bulk(rows: Sequence[Mapping[str, Any]], *, batch_id: str | None = None) -> int:
+    """Schreibt viele Messwerte mit einem mehrzeiligen INSERT in einer Transaktion (inkl. Rollups).
+
+    Mit `batch_id` ist der Aufruf idempotent: ein bereits geschriebener Batch wird übersprungen.
+    Gibt die Anzahl neu geschriebener Messwerte zurück.
+    """
+    if not rows:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    values = [
+        {
+            "timestamp": row.get("timestamp") or now,
+            "temperature": float(row["temperature"]),
+            "humidity": float(row["humidity"]),
+            "voc": float(row["voc"]),
+            "persons": int(row["persons"]),
+            "radar": bool(row["radar"]),
+            "room_id": int(row.get("room_id") or DEFAULT_ROOM_ID),
+        }
+        for row in rows
+    ]
+    table = Measurements.__table__
+
+    try:
+        if batch_id is not None:
+            if db.session.get(MeasurementIngestBatch, batch_id) is not None:
+                logger.info("Skipping already written ingest batch %s", batch_id)
+                return 0
+            db.session.add(MeasurementIngestBatch(batch_id=batch_id, row_count=len(values)))
+            try:
+                # Gleichzeitige Wiederholung desselben Batches: der Primärschlüssel entscheidet, wer schreibt
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                logger.info("Skipping ingest batch %s written concurrently", batch_id)
+                return 0
+
+        stmt = insert(table).values(values)   # ein Statement, ein Roundtrip
+        inserted = []
+        with metrics.MEASUREMENT_COMMIT_DURATION.labels(mode="bulk").time():
+            if db.session.get_bind().dialect.insert_returning:
+                # MariaDB >= 10.5 / SQLite >= 3.35: Zeilen inkl. IDs direkt zurück, ohne zweite Abfrage
+                inserted = db.session.execute(stmt.returning(*table.c)).all()
+            else:
+                db.session.execute(stmt)
+            _upsert_rollups(list(_aggregate_rollups(values).values()))
+            db.session.commit()
+        logger.info("Created %s measurements in bulk (batch=%s)", len(values), batch_id)
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to create measurements in bulk (batch=%s)", batch_id)
+        raise
+
+    if inserted:
+        _after_measurements_commit(inserted)
+    else:
+        _invalidate_measurement_caches({value["room_id"] for value in values})
+    return len(values)
 
-def delete_measurements_older_than(days: int = 30) -> int:
-    """Löscht Messwerte, die älter als 'days' sind, und gibt die Anzahl der gelöschten Zeilen zurück."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)  # Stichtag berechnen
+
+def _invalidate_measurement_caches(room_ids: Iterable[int] = (DEFAULT_ROOM_ID,)) -> None:
+    """Ohne eingefügte Zeilen (kein RETURNING): Regressionsfenster und Dashboard-Cache der Räume neu aufbauen lassen."""
+    try:
+        redis_client = get_redis()
+        for room_id in room_ids:
+            dashboard_regression_window(room_id).invalidate()
+            redis_client.delete(dashboard_cache.version_key(room_id))
+    except RedisError:
+        logger.warning("Failed to invalidate measurement caches in Redis", exc_info=True)
+
+
+def delete_measurements_older_than(
+    days: int = 30,
+    *,
+    cutoff: datetime | None = None,
+    max_id: int | None = None,
+    chunk_rows: int = 5000,
+    pause_seconds: float = 0.2,
+) -> int:
+    """Löscht Messwerte vor dem Stichtag in PK-Bereichen von höchstens `chunk_rows` Zeilen, je eigene Transaktion.
+
+    Zwischen den Bereichen wird `pause_seconds` gewartet, damit Locks und Undo-Log klein bleiben und laufende
+    INSERTs nicht blockiert werden. `max_id` begrenzt auf bereits archivierte Zeilen. Gibt die Anzahl zurück.
+    """
+    cutoff = cutoff or datetime.now(timezone.utc) - timedelta(days=days)  # Stichtag berechnen
+    m = Measurements
+    deleted_count = chunks = 0
+    last_id = 0
+
+    try:
+        while True:
+            # Nächsten PK-Bereich bestimmen (nur IDs, kurz und ohne Sperren)
+            id_query = select(m.id).where(m.timestamp < cutoff, m.id > last_id)
+            if max_id is not None:
+                id_query = id_query.where(m.id <= max_id)
+            ids = db.session.execute(id_query.order_by(m.id.asc()).limit(chunk_rows)).scalars().all()
+            db.session.commit()  # Lese-Snapshot beenden
+            if not ids:
+                break
+
+            # timestamp erneut prüfen: im Bereich können neuere Zeilen liegen (gepufferte Messwerte)
+            deleted_count += db.session.execute(
+                m.__table__.delete().where(m.id >= ids[0], m.id <= ids[-1], m.timestamp < cutoff)
+            ).rowcount
+            db.session.commit()
+            chunks += 1
+            last_id = ids[-1]
+
+            if len(ids) < chunk_rows:
+                break
+            time.sleep(pause_seconds)
+
+        logger.info(
+            "Deleted %s measurements older than %s days in %s chunks (cutoff=%s)", deleted_count, days, chunks, cutoff
+        )
+        return deleted_count
+    except Exception:
+        db.session.rollback()
+        logger.exception(
+            "Failed to delete old measurements after %s rows (days=%s, cutoff=%s)", deleted_count, days, cutoff
+        )
+        raise
+
+
+def delete_ingest_batches_older_than(days: int = 7) -> int:
+    """Löscht alte Einträge der Batch-Tabelle (werden nur für Wiederholungen kurz nach einem Absturz gebraucht)."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
     try:
         deleted_count = (
-            db.session.query(Measurements)
-            .filter(Measurements.timestamp < cutoff)            # nur Datensätze vor dem Stichtag
-            .delete(synchronize_session=False)                  # direktes DELETE in SQL
+            db.session.query(MeasurementIngestBatch)
+            .filter(MeasurementIngestBatch.created_at < cutoff)
+            .delete(synchronize_session=False)
         )
         db.session.commit()
-        logger.info("Deleted %s measurements older than %s days (cutoff=%s)", deleted_count, days, cutoff)
+        logger.info("Deleted %s ingest batches older than %s days", deleted_count, days)
         return deleted_count
     except Exception:
         db.session.rollback()
-        logger.exception("Failed to delete old measurements (days=%s, cutoff=%s)", days, cutoff)
+        logger.exception("Failed to delete old ingest batches (days=%s)", days)
+        raise
+
+
+def delete_rollups_older_than(now: datetime | None = None) -> int:
+    """Löscht Rollups gemäß ROLLUP_RETENTION_DAYS (feine Buckets kurz, grobe Buckets lange)."""
+    now = now or datetime.now(timezone.utc)
+    deleted_count = 0
+
+    try:
+        for bucket_seconds, days in ROLLUP_RETENTION_DAYS.items():
+            if days is None:
+                continue
+            deleted_count += (
+                db.session.query(MeasurementRollup)
+                .filter(MeasurementRollup.bucket_seconds == bucket_seconds)
+                .filter(MeasurementRollup.bucket_start < now - timedelta(days=days))
+                .delete(synchronize_session=False)
+            )
+        db.session.commit()
+        logger.info("Deleted %s expired measurement rollups", deleted_count)
+        return deleted_count
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to delete expired measurement rollups")
+        raise
+
+
+def rebuild_rollups(since: datetime, *, chunk_size: int = 10_000) -> int:
+    """Baut die Rollups ab 'since' aus den Rohdaten neu auf und gibt die Anzahl der Buckets zurück.
+
+    Ersetzt werden nur Buckets, die vollständig von Rohdaten abgedeckt sind: 'since' wird auf den ältesten
+    vorhandenen Messwert begrenzt und je Bucket-Größe auf die nächste Bucket-Grenze aufgerundet. Ältere
+    Rollups (deren Rohdaten die Retention schon gelöscht hat) bleiben so erhalten.
+    """
+    since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+    columns = [Measurements.room_id, Measurements.timestamp, *(getattr(Measurements, metric) for metric in ROLLUP_METRICS)]
+
+    try:
+        oldest = db.session.scalar(select(func.min(Measurements.timestamp)))
+        if oldest is None:
+            logger.info("No raw measurements, keeping existing rollups")
+            return 0
+        since = max(since, oldest if oldest.tzinfo else oldest.replace(tzinfo=timezone.utc))
+        starts = {bucket_seconds: _bucket_ceil(since, bucket_seconds) for bucket_seconds in ROLLUP_BUCKETS}
+
+        for bucket_seconds, start in starts.items():
+            db.session.query(MeasurementRollup).filter(
+                MeasurementRollup.bucket_seconds == bucket_seconds,
+                MeasurementRollup.bucket_start >= start,
+            ).delete(synchronize_session=False)
+
+        aggregated: dict = {}
+        result = db.session.execute(
+            select(*columns).where(Measurements.timestamp >= min(starts.values())).execution_options(yield_per=chunk_size)
+        )
+        for partition in result.mappings().partitions():
+            _aggregate_rollups(partition, into=aggregated)
+
+        # Teilweise abgedeckte größere Buckets (z. B. der erste Tag) behalten ihren bisherigen Stand
+        values = [agg for agg in aggregated.values() if agg["bucket_start"] >= starts[agg["bucket_seconds"]]]
+        for offset in range(0, len(values), chunk_size):
+            _upsert_rollups(values[offset:offset + chunk_size])
+        db.session.commit()
+        logger.info("Rebuilt %s measurement rollups since %s", len(values), since)
+        return len(values)
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to rebuild measurement rollups (since=%s)", since)
         raise
 
 
@@ -73,8 +465,156 @@ def create_video_recording(
         db.session.add(recording)
         db.session.commit()
         logger.info("Created video recording id=%s status=%s", recording.id, status)
-        return recording.id
     except Exception:
         db.session.rollback()
         logger.exception("Failed to create video recording")
         raise
+
+    _publish_video(recording)
+    return recording.id
+
+
+def claim_video_upload(recording_id: int, *, stale_after: timedelta) -> VideoRecording | None:
+    """Übernimmt eine Aufnahme atomar für den Upload ("pending_upload" -> "uploading").
+
+    Ein bedingtes UPDATE entscheidet, welcher von mehreren Tasks (Retry, erneut eingestellt) hochladen darf; die
+    anderen bekommen None. Hängt ein Upload länger als `stale_after` (Worker abgestürzt), darf ihn ein neuer
+    Task übernehmen.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        result = db.session.execute(
+            update(VideoRecording)
+            .where(
+                VideoRecording.id == recording_id,
+                or_(
+                    VideoRecording.status == "pending_upload",
+                    and_(VideoRecording.status == "uploading", VideoRecording.upload_started_at < now - stale_after),
+                ),
+            )
+            .values(status="uploading", upload_started_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to claim video recording id=%s for upload", recording_id)
+        raise
+
+    if result.rowcount != 1:
+        return None
+    recording = db.session.get(VideoRecording, recording_id, populate_existing=True)
+    _publish_video(recording)
+    return recording
+
+
+def update_video_recording(
+    recording_id: int,
+    *,
+    status: str,
+    size_bytes: int | None = None,
+    error_message: str | None = None,
+    poster_key: str | None = None,
+    sprite_key: str | None = None,
+    sprite_frames: int | None = None,
+    expected_status: str | None = None,
+) -> VideoRecording | None:
+    """Setzt Status (und ggf. Größe/Fehlertext/Vorschaubilder) einer Aufnahme, z. B. nach dem Hintergrund-Upload.
+
+    Mit `expected_status` wird nur geändert, wenn die Aufnahme (frisch aus der DB, gesperrt) noch diesen Status
+    hat; sonst bleibt sie unverändert und es kommt None zurück.
+    """
+    try:
+        recording = db.session.get(
+            VideoRecording, recording_id, populate_existing=True, with_for_update=expected_status is not None
+        )
+        if recording is None:
+            return None
+        if expected_status is not None and recording.status != expected_status:
+            db.session.rollback()  # Zeilensperre freigeben
+            logger.info(
+                "Keeping video recording id=%s status=%s (expected %s)", recording_id, recording.status, expected_status
+            )
+            return None
+        recording.status = status
+        if size_bytes is not None:
+            recording.size_bytes = size_bytes
+        recording.error_message = error_message
+        if poster_key is not None:
+            recording.poster_key = poster_key
+        if sprite_key is not None:
+            recording.sprite_key = sprite_key
+            recording.sprite_frames = sprite_frames
+        db.session.commit()
+        logger.info("Updated video recording id=%s status=%s", recording_id, status)
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to update video recording id=%s", recording_id)
+        raise
+
+    _publish_video(recording)
+    return recording
+
+
+def _publish_video(recording: VideoRecording) -> None:
+    """Schickt einen neuen/geänderten Video-Eintrag an offene Dashboards (best effort)."""
+    try:
+        live_events.publish(get_redis(), "video", video_payload(recording))
+    except RedisError:
+        logger.warning("Failed to publish video recording id=%s", recording.id, exc_info=True)
+
+
+@lru_cache(maxsize=1)
+def room_registry() -> RoomRegistry:
+    """Prozessweite Raum-Registry (Web und Worker); lädt alle Räume mit einer Abfrage."""
+    return RoomRegistry(
+        lambda: [room_settings(room) for room in get_rooms()],
+        ttl_seconds=room_config_ttl_seconds(),
+        fallback=DEFAULT_ROOM_SETTINGS,
+    )
+
+
+def register_device(device_key: str, room_id: int, *, name: str | None = None) -> Device:
+    """Legt einen Sensor-Knoten an bzw. aktualisiert Raum und last_seen_at; gibt das Device zurück."""
+    now = datetime.now(timezone.utc)
+    try:
+        device = db.session.query(Device).filter(Device.device_key == device_key).one_or_none()
+        if device is None:
+            device = Device(device_key=device_key, room_id=room_id, name=name or device_key)
+            db.session.add(device)
+        elif device.room_id != room_id:
+            logger.info("Device %s moved from room %s to room %s", device_key, device.room_id, room_id)
+            device.room_id = room_id
+        device.last_seen_at = now
+        db.session.commit()
+        return device
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to register device %s", device_key)
+        raise
+
+
+def issue_device_token(device_key: str, room_id: int, *, name: str | None = None) -> str:
+    """Legt den Knoten bei Bedarf an, setzt ein neues API-Token (altes wird ungültig) und gibt es im Klartext zurück."""
+    token = generate_token()
+    device = register_device(device_key, room_id, name=name)
+    try:
+        device.token_hash = hash_token(token)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to issue token for device %s", device_key)
+        raise
+    logger.info("Issued new API token for device %s (room=%s)", device_key, room_id)
+    return token
+
+
+def authenticate_device(token: str) -> Device | None:
+    """Sucht den Knoten zu einem API-Token (über den Hash, ein Index-Lookup); None bei unbekanntem Token."""
+    return db.session.query(Device).filter(Device.token_hash == hash_token(token)).one_or_none()
+
+
+def create_device_measurements(device: Device, rows: Sequence[Mapping[str, Any]], *, batch_id: str | None = None) -> int:
+    """Schreibt einen Batch eines Knotens per Multi-Row-INSERT; last_seen_at wird im selben Commit gesetzt."""
+    device.last_seen_at = datetime.now(timezone.utc)
+    return create_measurements_bulk(rows, batch_id=batch_id)
@@ -7,6 +7,11 @@ class VideoRecording(db.Model):
     """Metadaten zu einem per Bewegung ausgelösten Video in S3/MinIO."""
 
     __tablename__ = "video_recordings"
+    __table_args__ = (
+        # Keyset-Pagination von /api/videos: (recorded_at, id) absteigend, optional mit Statusfilter
+        db.Index("ix_video_recordings_recorded_at_id", "recorded_at", "id"),
+        db.Index("ix_video_recordings_status_recorded_at_id", "status", "recorded_at", "id"),
+    )
 
     # Technische Metadaten zur Datei im S3/MinIO-Bucket
     id = db.Column(db.Integer, primary_key=True)
@@ -17,9 +22,16 @@ class VideoRecording(db.Model):
     content_type = db.Column(db.String(128), nullable=False, default="video/mp4")
     size_bytes = db.Column(db.BigInteger, nullable=True)
 
-    # Status ist "stored" oder "failed"; Fehlertext hilft beim Debuggen im Dashboard/Log.
+    # Vorschaubilder neben dem Clip im Bucket (werden nach dem Upload erzeugt, fehlen bei älteren Clips)
+    poster_key = db.Column(db.String(1024), nullable=True)
+    sprite_key = db.Column(db.String(1024), nullable=True)
+    sprite_frames = db.Column(db.Integer, nullable=True)
+
+    # Status ist "pending_upload" (Clip liegt im Spool, Upload steht aus), "uploading" (ein Upload-Task hat die
+    # Aufnahme seit upload_started_at übernommen), "stored" oder "failed"; Fehlertext hilft beim Debuggen.
     status = db.Column(db.String(32), nullable=False, default="stored")
     error_message = db.Column(db.Text, nullable=True)
+    upload_started_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(
         db.DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
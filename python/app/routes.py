@@ -1,13 +1,55 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
 from datetime import datetime, timedelta, timezone
 
-from flask import Blueprint, abort, jsonify, redirect, render_template, request
+import numpy as np
+from flask import Blueprint, Response, abort, current_app, jsonify, redirect, render_template, request
+from redis.exceptions import RedisError
 from scipy.stats import linregress
 
+from app.extensions.redis_client import get_redis
+from app.logic import dashboard_cache, live_events, metrics
+from app.logic.batch_ingest import (
+    BatchFormatError,
+    UnsupportedBatchType,
+    bearer_token,
+    get_batch_ingest_config,
+    parse_batch,
+)
+from app.logic.downsampling import bucket_aggregate, lttb_indices
+from app.logic.online_regression import dashboard_regression_window, regression_payload
 from app.logic.storage.s3 import create_presigned_video_url
-from app.models.repositories import get_latest, get_since, get_video_recording, get_video_recordings
+from app.models.measurement_rollup import ROLLUP_BUCKETS, ROLLUP_METRICS
+from app.logic.rooms import RoomSettings
+from app.models.repositories import (
+    get_columns_since,
+    get_latest,
+    get_latest_measurement_id,
+    get_latest_per_room,
+    get_rollups_since,
+    get_video_recording,
+    get_video_recordings,
+)
+from app.models.services import authenticate_device, create_device_measurements, room_registry
+from app.serializers import current_payload, dt_iso, video_payload
+from app.tasks.tasks import estimate_readings, update_baseline_from_rows
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint("main", __name__)
 
+# Zeitbereiche für /api/history: Fensterlänge und Standard-Bucket (max. einige hundert Punkte)
+HISTORY_RANGES = {
+    "24h": (timedelta(hours=24), 900),
+    "7d": (timedelta(days=7), 900),
+    "30d": (timedelta(days=30), 3600),
+    "1y": (timedelta(days=365), 86400),
+}
+MAX_HISTORY_BUCKETS = 5000
+
 
 @bp.get("/")
 def home():
@@ -15,95 +57,181 @@ def home():
     return render_template("dashboard.html")
 
 
-def _dt_iso(dt: datetime) -> str:
-    """Konvertiert ein Datum sicher nach UTC und gibt es als ISO-String zurück."""
+def _epoch(dt: datetime) -> float:
+    """Unix-Zeit in Sekunden; naive Zeitstempel aus der DB gelten als UTC."""
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc).isoformat()
+    return dt.timestamp()
+
+
+def _bounded_int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    """Liest einen Integer-Query-Parameter und begrenzt ihn auf [lo, hi] (ungültig -> default)."""
+    try:
+        return max(lo, min(int(request.args.get(name, default)), hi))
+    except ValueError:
+        return default
 
 
-def _video_payload(video):
-    """Serialisiert einen Video-Datensatz für das Dashboard."""
+def _room_arg() -> RoomSettings:
+    """Raum aus ?room= (Slug oder ID, Standard: Standardraum); 404 bei unbekanntem Raum."""
+    value = request.args.get("room", "").strip()
+    settings = room_registry().resolve(value)
+    if settings is None:
+        abort(404, description=f"Unbekannter Raum: {value}")
+    return settings
+
+
+def _linregress_payload(xs: list[int], ys: list[float]) -> dict:
+    """Regression direkt über alle Punkte (Fallback, wenn Redis nicht erreichbar ist)."""
+    if len(xs) < 2 or len(set(xs)) < 2:
+        return {"slope": None, "intercept": None, "r2": None, "line_points": []}
+
+    res = linregress(xs, ys)
+    slope = float(res.slope)
+    intercept = float(res.intercept)
+    x_min, x_max = min(xs), max(xs)
     return {
-        "id": video.id,
-        "recorded_at": _dt_iso(video.recorded_at),
-        "duration_seconds": int(video.duration_seconds),
-        "bucket": video.bucket,
-        "object_key": video.object_key,
-        "content_type": video.content_type,
-        "size_bytes": video.size_bytes,
-        "status": video.status,
-        "error_message": video.error_message,
-        "created_at": _dt_iso(video.created_at),
-        "play_url": f"/api/videos/{video.id}/play" if video.status == "stored" else None,
+        "slope": slope,
+        "intercept": intercept,
+        "r2": float(res.rvalue ** 2),
+        "line_points": [
+            {"x": x_min, "y": slope * x_min + intercept},
+            {"x": x_max, "y": slope * x_max + intercept},
+        ],
     }
 
 
+def _dashboard_regression(rows, now: datetime, room_id: int) -> dict:
+    """Regression aus den inkrementell gepflegten Summen in Redis (O(1)); baut sie bei Bedarf einmal auf."""
+    try:
+        window = dashboard_regression_window(room_id)
+        if not window.is_ready():
+            window.rebuild((r.id, _epoch(r.timestamp), int(r.persons), float(r.temperature)) for r in rows)
+        sums, distinct_xs = window.snapshot(now.timestamp())
+        return regression_payload(sums, distinct_xs)
+    except RedisError:
+        logger.warning("Regression window unavailable, falling back to linregress", exc_info=True)
+        return _linregress_payload([int(r.persons) for r in rows], [float(r.temperature) for r in rows])
+
+
+@bp.get("/metrics")
+def prometheus_metrics():
+    """Prometheus-Scrape-Endpunkt (Histogramme aller Web- und Worker-Prozesse, siehe METRICS_DIR)."""
+    if not metrics.ENABLED:
+        abort(404, description="Metriken sind deaktiviert oder prometheus_client fehlt")
+    body, content_type = metrics.render_latest()
+    return Response(body, content_type=content_type)
+
+
 @bp.get("/api/dashboard")
 def api_dashboard():
     """
     API-Endpunkt fürs Dashboard:
-    - Holt den neuesten Messwert + alle Messwerte der letzten 24h
+    - Holt den neuesten Messwert + alle Messwerte der letzten 24h eines Raums (?room=Slug/ID, Standard: Standardraum)
     - Baut Datenpunkte für Linienchart (Temperatur über Zeit) und Scatterplot (Personen vs Temperatur)
-    - Rechnet eine lineare Regression (Trendlinie) inkl. R² und macht Beispiel-Vorhersagen
-    - Gibt alles als JSON zurück
+    - Reduziert die Chart-Punkte serverseitig (?points=N per LTTB, ?resolution=Sekunden per Bucket min/max/avg)
+    - Liest die lineare Regression (Trendlinie) inkl. R² aus laufenden Summen und macht Beispiel-Vorhersagen
+    - Gibt alles als JSON zurück, mit ETag: unveränderte Polls bekommen 304 ohne DB-Zugriff,
+      sonst kommt der fertige Payload nach Möglichkeit aus dem Redis-Cache
     """
     now = datetime.now(timezone.utc)
-    since = now - timedelta(hours=24)
+    room_id = _room_arg().room_id
 
-    latest = get_latest()
-    rows_24h = get_since(since)
+    # 0 = keine Reduktion; Standard hält den Payload unabhängig von der Abtastrate klein
+    max_points = _bounded_int_arg("points", int(os.getenv("DASHBOARD_MAX_POINTS", "500")), 0, 5000)
+    resolution = _bounded_int_arg("resolution", 0, 0, 24 * 3600)
 
-    xs, ys = [], []
-    scatter_points = []
-    line_points = []
+    try:
+        redis_client = get_redis()
+        version = dashboard_cache.get_version(redis_client, room_id=room_id)
+        if version is None:
+            version = dashboard_cache.seed_version(redis_client, get_latest_measurement_id(room_id), room_id=room_id)
+    except RedisError:
+        logger.warning("Dashboard cache unavailable, serving uncached", exc_info=True)
+        redis_client = None
+        version = str(get_latest_measurement_id(room_id) or 0)
 
-    for r in rows_24h:
-        line_points.append({"t": _dt_iso(r.timestamp), "temperature": float(r.temperature)})
+    etag = dashboard_cache.make_etag(version, room_id, max_points, resolution, now=now.timestamp())
+    if request.if_none_match.contains(etag):
+        return _dashboard_response(Response(status=304), etag)
 
-        if r.persons is not None and r.temperature is not None:
-            xs.append(int(r.persons))
-            ys.append(float(r.temperature))
-            scatter_points.append({"x": int(r.persons), "y": float(r.temperature)})
+    body = None
+    if redis_client is not None:
+        try:
+            body = dashboard_cache.get_payload(redis_client, etag)
+        except RedisError:
+            redis_client = None
 
-    slope = intercept = r2 = None
-    reg_line_points = []
+    if body is None:
+        with metrics.DASHBOARD_DURATION.labels(phase="query").time():
+            payload = _dashboard_payload(now, max_points, resolution, room_id)
+        with metrics.DASHBOARD_DURATION.labels(phase="serialize").time():
+            body = current_app.json.dumps(payload)
+        if redis_client is not None:
+            try:
+                dashboard_cache.store_payload(redis_client, etag, body)
+            except RedisError:
+                logger.warning("Failed to store dashboard payload in Redis", exc_info=True)
 
-    if len(xs) >= 2 and len(set(xs)) >= 2:
-        res = linregress(xs, ys)
-        slope = float(res.slope)
-        intercept = float(res.intercept)
-        r2 = float(res.rvalue ** 2)
+    return _dashboard_response(Response(body, mimetype="application/json"), etag)
 
-        x_min, x_max = min(xs), max(xs)
-        reg_line_points = [
-            {"x": x_min, "y": slope * x_min + intercept},
-            {"x": x_max, "y": slope * x_max + intercept},
+
+def _dashboard_response(response: Response, etag: str) -> Response:
+    """Setzt ETag und zwingt den Browser zur Revalidierung statt zu veralteten Daten."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _dashboard_payload(now: datetime, max_points: int, resolution: int, room_id: int) -> dict:
+    """Berechnet den kompletten Dashboard-Payload eines Raums (DB-Abfrage, Downsampling, Regression)."""
+    since = now - timedelta(hours=24)
+
+    latest = get_latest(room_id)
+    # Nur die benötigten Spalten laden statt kompletter ORM-Objekte
+    rows_24h = get_columns_since(since, ("id", "timestamp", "temperature", "persons"), room_id)
+
+    timestamps = [r.timestamp for r in rows_24h]
+    epochs = np.array([_epoch(timestamp) for timestamp in timestamps], dtype=np.float64)
+    temps = np.array([float(r.temperature) for r in rows_24h], dtype=np.float64)
+
+    keep = lttb_indices(epochs, temps, max_points) if max_points else np.arange(len(rows_24h))
+
+    if resolution:
+        buckets = bucket_aggregate(epochs, temps, resolution)
+        line_points = [
+            {
+                "t": dt_iso(datetime.fromtimestamp(start, timezone.utc)),
+                "temperature": float(avg),
+                "min": float(lo),
+                "max": float(hi),
+            }
+            for start, avg, lo, hi in zip(buckets["start"], buckets["avg"], buckets["min"], buckets["max"])
         ]
+    else:
+        line_points = [{"t": dt_iso(timestamps[i]), "temperature": float(temps[i])} for i in keep.tolist()]
+
+    scatter_points = [{"x": int(rows_24h[i].persons), "y": float(rows_24h[i].temperature)} for i in keep.tolist()]
+
+    # Regression immer über das ganze Fenster, nur die Chart-Punkte werden reduziert
+    regression = _dashboard_regression(rows_24h, now, room_id)
+    slope, intercept = regression["slope"], regression["intercept"]
 
     def predict(x: int):
         if slope is None or intercept is None:
             return None
         return float(slope * x + intercept)
 
-    payload = {
-        "meta": {"generated_at": _dt_iso(now)},
-        "current": None if not latest else {
-            "temperature": float(latest.temperature),
-            "humidity": float(latest.humidity),
-            "voc": float(latest.voc),
-            "persons": int(latest.persons),
-            "radar": bool(latest.radar),
-            "timestamp": _dt_iso(latest.timestamp),
+    return {
+        "meta": {
+            "generated_at": dt_iso(now),
+            "room_id": room_id,
+            "points": {"total": len(rows_24h), "line": len(line_points), "scatter": len(scatter_points)},
         },
+        "current": None if not latest else current_payload(latest),
         "line": {"points": line_points},
         "scatter": {"points": scatter_points},
-        "regression": {
-            "slope": slope,
-            "intercept": intercept,
-            "r2": r2,
-            "line_points": reg_line_points,
-        },
+        "regression": regression,
         "predictions": {
             "p0": predict(0),
             "p60": predict(60),
@@ -111,26 +239,219 @@ def api_dashboard():
         },
     }
 
-    return jsonify(payload)
+
+def _rollup_payload(rollup) -> dict:
+    """Serialisiert einen Rollup-Bucket: count sowie min/max/mean/std je Messgröße."""
+    payload = {"t": dt_iso(rollup.bucket_start), "count": int(rollup.count)}
+    for metric in ROLLUP_METRICS:
+        mean = getattr(rollup, f"{metric}_sum") / rollup.count
+        variance = max(0.0, getattr(rollup, f"{metric}_sum_sq") / rollup.count - mean * mean)
+        payload[metric] = {
+            "min": float(getattr(rollup, f"{metric}_min")),
+            "max": float(getattr(rollup, f"{metric}_max")),
+            "mean": float(mean),
+            "std": float(variance ** 0.5),
+        }
+    return payload
+
+
+@bp.get("/api/history")
+def api_history():
+    """Langzeitverlauf (24h/7d/30d/1y) eines Raums ausschließlich aus den Rollup-Tabellen, unabhängig von der Rohdaten-Menge."""
+    room_id = _room_arg().room_id
+    range_name = request.args.get("range", "7d")
+    if range_name not in HISTORY_RANGES:
+        abort(400, description=f"range muss einer von {', '.join(HISTORY_RANGES)} sein")
+    window, bucket_seconds = HISTORY_RANGES[range_name]
+
+    # Optional feinere/gröbere Auflösung, solange die Antwort begrenzt bleibt
+    raw_bucket = request.args.get("bucket")
+    if raw_bucket is not None:
+        try:
+            bucket_seconds = int(raw_bucket)
+        except ValueError:
+            abort(400, description="bucket muss eine Zahl sein")
+        if bucket_seconds not in ROLLUP_BUCKETS:
+            abort(400, description=f"bucket muss einer von {', '.join(map(str, ROLLUP_BUCKETS))} sein")
+        if window.total_seconds() / bucket_seconds > MAX_HISTORY_BUCKETS:
+            abort(400, description="bucket ist für diesen Zeitbereich zu fein")
+
+    now = datetime.now(timezone.utc)
+    rollups = get_rollups_since(now - window, bucket_seconds, room_id)
+    return jsonify({
+        "meta": {
+            "generated_at": dt_iso(now),
+            "room_id": room_id,
+            "range": range_name,
+            "bucket_seconds": bucket_seconds,
+        },
+        "buckets": [_rollup_payload(rollup) for rollup in rollups],
+    })
+
+
+@bp.get("/api/rooms")
+def api_rooms():
+    """Alle Räume mit ihrem jeweils neuesten Messwert (eine Abfrage für alle Räume, kein N+1)."""
+    latest = {m.room_id: m for m in get_latest_per_room()}
+    return jsonify({
+        "rooms": [
+            {
+                "id": room.room_id,
+                "slug": room.slug,
+                "name": room.name,
+                "current": current_payload(latest[room.room_id]) if room.room_id in latest else None,
+            }
+            for room in room_registry().all()
+        ],
+    })
+
+
+# Höchstens so viele verworfene Zeilen werden in der Antwort einzeln aufgeführt
+MAX_REPORTED_REJECTS = 100
+
+
+@bp.post("/api/measurements/batch")
+def api_measurements_batch():
+    """
+    Batch-Ingest für entfernte Sensor-Knoten (Authorization: Bearer <Device-Token>):
+    - Body als NDJSON (application/x-ndjson) oder MessagePack (application/msgpack), optional gzip-komprimiert
+    - Personenschätzung vektorisiert mit dem Plan des Raums, dem der Knoten zugeordnet ist
+    - Schreiben per Multi-Row-INSERT in einer Transaktion (inkl. Rollups)
+    - Optionaler Header X-Batch-Id macht Wiederholungen idempotent (bereits geschriebene Batches werden übersprungen)
+    """
+    token = bearer_token(request.headers.get("Authorization"))
+    device = authenticate_device(token) if token else None
+    if device is None:
+        abort(401, description="Gültiges Device-Token erforderlich (Authorization: Bearer <token>)")
+
+    config = get_batch_ingest_config()
+    if (request.content_length or 0) > config.max_bytes:
+        abort(413, description=f"Batch ist größer als {config.max_bytes} Bytes")
+    body = request.get_data(cache=False)
+    if len(body) > config.max_bytes:
+        abort(413, description=f"Batch ist größer als {config.max_bytes} Bytes")
+
+    raw_batch_id = request.headers.get("X-Batch-Id", "").strip()
+    if len(raw_batch_id) > 128:
+        abort(400, description="X-Batch-Id darf höchstens 128 Zeichen lang sein")
+
+    try:
+        readings, rejected = parse_batch(
+            body,
+            content_type=request.content_type or "",
+            content_encoding=request.headers.get("Content-Encoding", ""),
+            config=config,
+        )
+    except UnsupportedBatchType as exc:
+        abort(415, description=str(exc))
+    except BatchFormatError as exc:
+        abort(400, description=str(exc))
+
+    received = len(readings) + len(rejected)
+    rows, implausible = estimate_readings(readings, device.room_id)
+    rejected = sorted(rejected + implausible, key=lambda r: r["index"])
+
+    # Batch-IDs sind nur je Knoten eindeutig; gespeichert wird ein Hash in der Länge der Puffer-IDs
+    batch_id = None
+    if raw_batch_id:
+        batch_id = hashlib.sha256(f"{device.id}:{raw_batch_id}".encode()).hexdigest()[:32]
+    written = create_device_measurements(device, rows, batch_id=batch_id) if rows else 0
+    if written:
+        # Erst nach dem Schreiben: ein bereits bekannter Batch darf die Baseline nicht ein zweites Mal verschieben
+        update_baseline_from_rows(rows, device.room_id)
+
+    return jsonify({
+        "device": device.device_key,
+        "room_id": device.room_id,
+        "received": received,
+        "written": written,
+        "duplicate": bool(batch_id and rows and written == 0),
+        "rejected_count": len(rejected),
+        "rejected": rejected[:MAX_REPORTED_REJECTS],
+    })
+
+
+VIDEO_STATUSES = ("pending_upload", "uploading", "stored", "failed")
+
+
+def _encode_video_cursor(video) -> str:
+    """Opaker Cursor aus (recorded_at, id) des letzten Eintrags einer Seite."""
+    raw = f"{dt_iso(video.recorded_at)}|{video.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_video_cursor(cursor: str) -> tuple[datetime, int]:
+    """Gegenstück zu _encode_video_cursor(); ValueError bei kaputtem Cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        recorded_at, video_id = raw.rsplit("|", 1)
+        return _parse_datetime(recorded_at), int(video_id)
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def _parse_datetime(value: str) -> datetime:
+    """ISO-8601 (auch mit "Z"); ohne Zeitzone wird UTC angenommen."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
 
 
 @bp.get("/api/videos")
 def api_videos():
-    """Liefert die neuesten Videoaufnahmen fürs Dashboard."""
-    raw_limit = request.args.get("limit", "25")
+    """Liefert Videoaufnahmen fürs Dashboard, seitenweise per Keyset-Cursor (neueste zuerst).
+
+    Query-Parameter: limit (1-100), cursor (next_cursor der vorherigen Seite), before/after (ISO-Zeitpunkte),
+    status (pending_upload/uploading/stored/failed).
+    """
+    # Limit begrenzen, damit das Dashboard nicht versehentlich zu viele DB-Zeilen lädt.
+    limit = _bounded_int_arg("limit", 25, 1, 100)
+
+    status = request.args.get("status") or None
+    if status is not None and status not in VIDEO_STATUSES:
+        abort(400, description=f"status muss einer von {', '.join(VIDEO_STATUSES)} sein")
     try:
-        # Limit begrenzen, damit das Dashboard nicht versehentlich zu viele DB-Zeilen lädt.
-        limit = max(1, min(int(raw_limit), 100))
+        cursor = _decode_video_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+        before = _parse_datetime(request.args["before"]) if request.args.get("before") else None
+        after = _parse_datetime(request.args["after"]) if request.args.get("after") else None
     except ValueError:
-        limit = 25
+        abort(400, description="cursor, before und after müssen gültig sein (ISO-8601)")
+
+    # Ein Eintrag mehr laden, um zu wissen, ob es eine weitere Seite gibt
+    videos = get_video_recordings(limit=limit + 1, cursor=cursor, before=before, after=after, status=status)
+    has_more = len(videos) > limit
+    videos = videos[:limit]
 
-    videos = get_video_recordings(limit=limit)
     return jsonify({
-        "meta": {"generated_at": _dt_iso(datetime.now(timezone.utc)), "limit": limit},
-        "videos": [_video_payload(video) for video in videos],
+        "meta": {
+            "generated_at": dt_iso(datetime.now(timezone.utc)),
+            "limit": limit,
+            "status": status,
+            "before": dt_iso(before) if before else None,
+            "after": dt_iso(after) if after else None,
+            "next_cursor": _encode_video_cursor(videos[-1]) if has_more else None,
+        },
+        "videos": [video_payload(video) for video in videos],
     })
 
 
+@bp.get("/api/stream")
+def api_stream():
+    """Server-Sent Events: pusht neue Messwerte und Videoaufnahmen (Fan-out über Redis Pub/Sub)."""
+    try:
+        pubsub = live_events.subscribe(get_redis())
+    except RedisError:
+        logger.warning("Live stream unavailable", exc_info=True)
+        abort(503)
+
+    heartbeat = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    return Response(
+        live_events.sse_stream(pubsub, heartbeat_seconds=heartbeat),
+        mimetype="text/event-stream",
+        # Proxies (nginx) dürfen den Stream weder puffern noch cachen
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @bp.get("/api/videos/<int:video_id>/play")
 def play_video(video_id: int):
     """Leitet auf eine kurzlebige presigned URL für das private S3-Objekt weiter."""
@@ -145,3 +466,30 @@ def play_video(video_id: int):
         abort(502)
 
     return redirect(url, code=302)
+
+
+def _redirect_to_object(bucket: str, object_key: str):
+    """302 auf eine presigned URL; der Bucket bleibt privat."""
+    try:
+        url = create_presigned_video_url(bucket, object_key)
+    except Exception:
+        abort(502)
+    return redirect(url, code=302)
+
+
+@bp.get("/api/videos/<int:video_id>/poster")
+def video_poster(video_id: int):
+    """Leitet auf das Poster-JPEG eines Clips weiter."""
+    video = get_video_recording(video_id)
+    if video is None or not video.poster_key:
+        abort(404)
+    return _redirect_to_object(video.bucket, video.poster_key)
+
+
+@bp.get("/api/videos/<int:video_id>/sprite")
+def video_sprite(video_id: int):
+    """Leitet auf das Vorschau-Sprite eines Clips weiter (sprite_frames Kacheln nebeneinander)."""
+    video = get_video_recording(video_id)
+    if video is None or not video.sprite_key:
+        abort(404)
+    return _redirect_to_object(video.bucket, video.sprite_key)
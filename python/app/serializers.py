@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+from app.models import Measurements, VideoRecording
+
+
+def dt_iso(dt: datetime) -> str:
+    """Konvertiert ein Datum sicher nach UTC und gibt es als ISO-String zurück."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def current_payload(measurement: Measurements) -> dict:
+    """Serialisiert einen Messwert für die KPI-Kacheln des Dashboards."""
+    return {
+        "temperature": float(measurement.temperature),
+        "humidity": float(measurement.humidity),
+        "voc": float(measurement.voc),
+        "persons": int(measurement.persons),
+        "radar": bool(measurement.radar),
+        "timestamp": dt_iso(measurement.timestamp),
+    }
+
+
+def video_payload(video: VideoRecording) -> dict:
+    """Serialisiert einen Video-Datensatz für das Dashboard."""
+    return {
+        "id": video.id,
+        "recorded_at": dt_iso(video.recorded_at),
+        "duration_seconds": int(video.duration_seconds),
+        "bucket": video.bucket,
+        "object_key": video.object_key,
+        "content_type": video.content_type,
+        "size_bytes": video.size_bytes,
+        "status": video.status,
+        "error_message": video.error_message,
+        "created_at": dt_iso(video.created_at),
+        "play_url": f"/api/videos/{video.id}/play" if video.status == "stored" else None,
+        # Vorschaubilder: wenige KB pro Eintrag statt des ganzen Clips
+        "poster_url": f"/api/videos/{video.id}/poster" if video.poster_key else None,
+        "sprite_url": f"/api/videos/{video.id}/sprite" if video.sprite_key else None,
+        "sprite_frames": video.sprite_frames if video.sprite_key else None,
+    }
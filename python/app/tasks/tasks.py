@@ -1,20 +1,52 @@
+import json
 import logging
 import os
-from datetime import datetime, timezone
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import BinaryIO, Callable
 from uuid import uuid4
 
+import numpy as np
 from celery import shared_task
 from redis import Redis
-
-from app.logic.occupancy_estimator import RoomConfig, ModelConfig, Baseline, estimate_people
-from app.logic.rpi.motion_camera_capture import capture_mp4
-from app.logic.storage.s3 import get_s3_config, upload_video_file
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.extensions.redis_client import get_redis
+from app.logic import ingest_buffer, metrics
+from app.logic.baseline_tracker import BaselineTracker
+from app.logic.rpi.motion_camera_capture import capture_mp4, stream_fragmented_mp4
+from app.logic.rooms import DEFAULT_ROOM_ID
+from app.logic.sensor_backends import get_sensor_data, motion_detected
+from app.logic.retention import CsvGzipWriter, RetentionConfig, archive_object_key, get_retention_config
+from app.logic.storage.s3 import download_file, get_s3_config, upload_file, upload_video_file, upload_video_stream
+from app.logic.video_thumbnails import (
+    build_sprite,
+    extract_poster,
+    get_thumbnail_config,
+    poster_key_for,
+    sprite_key_for,
+)
+from app.models.repositories import (
+    get_expired_measurement_rows,
+    get_stale_video_uploads,
+    get_video_recording,
+    get_video_recordings_by_status,
+)
 from app.models.services import (
+    claim_video_upload,
     create_measurements,
+    create_measurements_bulk,
     create_video_recording,
+    delete_ingest_batches_older_than,
     delete_measurements_older_than,
+    delete_rollups_older_than,
+    register_device,
+    room_registry,
+    update_video_recording,
 )
 
 
@@ -26,15 +58,77 @@ logger = logging.getLogger(__name__)
 MOTION_ACTIVE_KEY = "videos:motion-active"
 CAPTURE_LOCK_KEY = "videos:capture-lock"
 
-# Feste Konfiguration für Raum und Modell (wird für die Personen-Schätzung benutzt)
-ROOM = RoomConfig(area_m2=180.0, height_m=3.0, ach_per_hour=2.0, v_ref_m3=300.0, ach_ref_per_hour=2.0)
-CFG = ModelConfig(weight_gas=0.8, weight_hum=0.2, n_max=125, i_ref_full=0.20, gas_temp_coeff_per_C=0.0)
-BASELINE = Baseline(temperature_c=21.0, rh_percent=35.0, gas_resistance_ohm=22000.0)
+# Redis-Key für den Zustand der Streaming-Baseline (überlebt Worker-Neustarts)
+BASELINE_STATE_KEY = "measurements:baseline-state"
+
+# Streaming-Baseline je Raum und Worker-Prozess; wird bei Bedarf aus Redis nachgeladen
+_baseline_trackers: dict[int, BaselineTracker] = {}
 
 
 def _redis_client() -> Redis:
-    """Erstellt den Redis-Client aus derselben URL, die Celery als Broker nutzt."""
-    return Redis.from_url(os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"), decode_responses=True)
+    """Gibt den gemeinsamen Redis-Client des Prozesses zurück (gleiche URL wie der Celery-Broker)."""
+    return get_redis()
+
+
+def _baseline_tracking_enabled() -> bool:
+    """Streaming-Baseline an/aus (BASELINE_TRACKING_ENABLED, Standard: an)."""
+    return os.getenv("BASELINE_TRACKING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def _baseline_state_key(room_id: int) -> str:
+    """Redis-Key des Baseline-Zustands eines Raums (der Standardraum behält den bisherigen Key)."""
+    return BASELINE_STATE_KEY if room_id == DEFAULT_ROOM_ID else f"{BASELINE_STATE_KEY}:{room_id}"
+
+
+def _load_baseline_tracker(redis_client: Redis, room_id: int = DEFAULT_ROOM_ID) -> BaselineTracker:
+    """Lädt den Tracker eines Raums aus Redis, falls ein anderer Prozess ihn seit dem letzten Lauf weitergeführt hat."""
+    warmup_count = int(os.getenv("BASELINE_WARMUP_COUNT", "30"))
+    window_count = int(os.getenv("BASELINE_WINDOW_COUNT", "60"))
+
+    raw = redis_client.get(_baseline_state_key(room_id))
+    state = json.loads(raw) if raw else None
+
+    # Lokaler Tracker ist aktuell: kein erneutes Aufbauen der Fenster nötig
+    tracker = _baseline_trackers.get(room_id)
+    if tracker is not None and (state is None or state.get("seen") == tracker.seen):
+        return tracker
+
+    if state is not None:
+        try:
+            tracker = BaselineTracker.from_state(state, warmup_count=warmup_count, window_count=window_count)
+            _baseline_trackers[room_id] = tracker
+            return tracker
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Ignoring invalid baseline state in Redis (room=%s)", room_id, exc_info=True)
+
+    tracker = BaselineTracker(warmup_count=warmup_count, window_count=window_count)
+    _baseline_trackers[room_id] = tracker
+    return tracker
+
+
+@lru_cache(maxsize=1)
+def _node_room_id() -> int:
+    """Raum dieses Sensor-Knotens aus ROOM_SLUG (Slug oder ID, Standard: Standardraum).
+
+    Meldet den Knoten einmal pro Prozess unter DEVICE_KEY (Standard: Hostname) in der devices-Tabelle an.
+    """
+    slug = os.getenv("ROOM_SLUG", "")
+    settings = room_registry().resolve(slug)
+    if settings is None:
+        logger.warning("Unknown ROOM_SLUG %r, using default room", slug)
+        return DEFAULT_ROOM_ID
+
+    device_key = os.getenv("DEVICE_KEY") or socket.gethostname()
+    try:
+        register_device(device_key, settings.room_id)
+    except Exception:
+        logger.warning("Failed to register device %s", device_key, exc_info=True)
+    return settings.room_id
+
+
+def _ingest_buffered() -> bool:
+    """Messwerte puffern statt einzeln zu committen (MEASUREMENT_INGEST_MODE=buffered, Standard: direct)."""
+    return os.getenv("MEASUREMENT_INGEST_MODE", "direct").lower() == "buffered"
 
 
 def _video_duration_seconds() -> int:
@@ -42,6 +136,145 @@ def _video_duration_seconds() -> int:
     return int(os.getenv("VIDEO_CAPTURE_DURATION_SECONDS", "5"))
 
 
+def _video_spool_dir() -> Path:
+    """Lokaler Spool für Clips, bis der Upload-Worker sie nach S3 geladen hat (VIDEO_SPOOL_DIR)."""
+    return Path(os.getenv("VIDEO_SPOOL_DIR", "/var/spool/asia-videos"))
+
+
+def _spool_path(object_key: str) -> Path:
+    """Spool-Datei eines Clips; gleiche Struktur wie der Object-Key, daher ohne eigene DB-Spalte auffindbar."""
+    return _video_spool_dir() / object_key
+
+
+def _upload_retry_countdown(retries: int) -> float:
+    """Exponentielles Backoff mit Jitter: VIDEO_UPLOAD_RETRY_BASE_SECONDS * 2^n, gedeckelt bei VIDEO_UPLOAD_RETRY_MAX_SECONDS."""
+    base = float(os.getenv("VIDEO_UPLOAD_RETRY_BASE_SECONDS", "10"))
+    cap = float(os.getenv("VIDEO_UPLOAD_RETRY_MAX_SECONDS", "600"))
+    delay = min(cap, base * 2 ** retries)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _upload_claim_timeout() -> timedelta:
+    """Nach VIDEO_UPLOAD_CLAIM_TIMEOUT_SECONDS (Standard 1800) gilt ein übernommener Upload als hängengeblieben."""
+    return timedelta(seconds=float(os.getenv("VIDEO_UPLOAD_CLAIM_TIMEOUT_SECONDS", "1800")))
+
+
+def _thumbnails_enabled() -> bool:
+    """Poster/Sprite nach dem Upload erzeugen (VIDEO_THUMBNAILS_ENABLED, Standard: an)."""
+    return os.getenv("VIDEO_THUMBNAILS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def _upload_thumbnails(video_path: Path, object_key: str, duration_seconds: int) -> dict:
+    """Erzeugt Poster und Sprite zu einem lokalen Clip und legt sie neben den Clip in den Bucket.
+
+    Gibt die Felder für update_video_recording() zurück; Fehler kosten nur die Vorschau, nicht den Clip.
+    """
+    config = get_thumbnail_config()
+    poster_key = poster_key_for(object_key)
+    sprite_key = sprite_key_for(object_key)
+    try:
+        with TemporaryDirectory() as tmp_dir:
+            poster = extract_poster(
+                video_path, Path(tmp_dir) / "poster.jpg", duration_seconds=duration_seconds, width=config.poster_width
+            )
+            sprite = build_sprite(
+                video_path,
+                Path(tmp_dir) / "sprite.jpg",
+                duration_seconds=duration_seconds,
+                frames=config.sprite_frames,
+                width=config.sprite_width,
+            )
+            upload_file(poster, object_key=poster_key, content_type="image/jpeg", mode="thumbnail")
+            upload_file(sprite, object_key=sprite_key, content_type="image/jpeg", mode="thumbnail")
+    except Exception:
+        logger.warning("Failed to create thumbnails for %s", object_key, exc_info=True)
+        return {}
+    return {"poster_key": poster_key, "sprite_key": sprite_key, "sprite_frames": config.sprite_frames}
+
+
+def _continuous_capture() -> bool:
+    """Clips aus dem Pre-Roll-Ringpuffer schneiden (VIDEO_CAPTURE_MODE=continuous) statt raspivid neu zu starten."""
+    return os.getenv("VIDEO_CAPTURE_MODE", "on_demand").lower() == "continuous"
+
+
+def _streaming_upload() -> bool:
+    """Aufnahme per Pipe nach S3 streamen (VIDEO_UPLOAD_MODE=streaming), während sie noch läuft.
+
+    Eine Kopie des Stroms landet im Spool; scheitert der Upload, übernimmt videos.upload den Clip mit denselben
+    Wiederholungen wie im Dateimodus. Gilt nur für die Direktaufnahme mit raspivid; Ringpuffer und
+    VIDEO_CAPTURE_COMMAND nutzen weiter den Dateiweg.
+    """
+    return (
+        os.getenv("VIDEO_UPLOAD_MODE", "file").lower() == "streaming"
+        and not _continuous_capture()
+        and not os.getenv("VIDEO_CAPTURE_COMMAND")
+    )
+
+
+class _SpoolTee:
+    """Lesbarer Strom, der alles Gelesene zusätzlich in eine Datei schreibt und das Ende der Aufnahme meldet."""
+
+    def __init__(self, stream: BinaryIO, copy: BinaryIO, on_eof: Callable[[], None]):
+        self.stream = stream
+        self.copy = copy
+        self.on_eof = on_eof
+        self.eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        if chunk:
+            self.copy.write(chunk)
+        elif not self.eof:
+            self.eof = True
+            self.on_eof()
+        return chunk
+
+    def drain(self) -> None:
+        """Liest den Rest der Aufnahme, damit die Kopie auch nach einem Upload-Fehler vollständig ist."""
+        while self.read(1024 * 1024):
+            pass
+
+
+def _release_capture_lock(lock) -> None:
+    try:
+        lock.release()
+    except Exception:
+        logger.debug("Capture lock was already released or expired", exc_info=True)
+
+
+def _stream_clip(object_key: str, spool_path: Path, duration_seconds: int, lock) -> tuple[str | None, int]:
+    """Streamt eine Aufnahme nach S3 und schreibt sie parallel in eine Spool-Kopie.
+
+    Nach erfolgreichem Upload wird die Kopie verworfen und (Bucket, Größe) zurückgegeben. Scheitert der Upload,
+    liegt der vollständige Clip danach unter `spool_path` und es kommt (None, Größe) zurück. Der Kamera-Lock
+    wird freigegeben, sobald die Aufnahme endet, nicht erst nach dem Upload (boto3-Wiederholungen).
+    """
+    with TemporaryDirectory(dir=_video_spool_dir()) as tmp_dir:
+        output_path = Path(tmp_dir) / "capture.mp4"
+        with stream_fragmented_mp4(duration_seconds) as stream, output_path.open("wb") as copy:
+            tee = _SpoolTee(stream, copy, on_eof=lambda: _release_capture_lock(lock))
+            try:
+                return upload_video_stream(tee, object_key=object_key, content_type="video/mp4")
+            except Exception:
+                logger.warning("Streaming upload of %s failed, handing the clip to videos.upload", object_key, exc_info=True)
+                tee.drain()
+        output_path.replace(spool_path)  # gleiches Dateisystem: atomar, nie halbe Dateien im Spool
+        return None, spool_path.stat().st_size
+
+
+def _capture_clip(output_path: Path, duration_seconds: int, triggered_at: datetime) -> tuple[datetime, int]:
+    """Nimmt einen Clip auf und gibt tatsächlichen Start und Gesamtdauer zurück (inkl. Pre-Roll)."""
+    if not _continuous_capture():
+        capture_mp4(output_path, duration_seconds=duration_seconds)
+        return triggered_at, duration_seconds
+
+    from app.logic.rpi.camera_ring_buffer import capture_with_preroll, get_ring_buffer_config
+
+    config = get_ring_buffer_config()
+    capture_with_preroll(output_path, duration_seconds, config, triggered_at=triggered_at.timestamp())
+    return triggered_at - timedelta(seconds=config.pre_roll_seconds), duration_seconds + config.pre_roll_seconds
+
+
 def _video_object_key(recorded_at: datetime) -> str:
     """Baut den S3-Pfad: videos/YYYY/MM/DD/<timestamp>_<uuid>.mp4."""
     stamp = recorded_at.strftime("%Y%m%dT%H%M%SZ")
@@ -49,85 +282,293 @@ def _video_object_key(recorded_at: datetime) -> str:
 
 
 def _read_motion_sensor() -> bool:
-    """Importiert den PIR-Sensor erst zur Laufzeit, damit lokale Imports ohne GPIO funktionieren."""
-    from app.logic.rpi.motion_sensor_infrared import motion_detected
-
+    """PIR-Pegel aus der konfigurierten Sensor-Quelle (SENSOR_BACKEND; GPIO wird erst dort importiert)."""
     return bool(motion_detected())
 
 
+def record_reading(temperature: float, humidity: float, voc: float, motion: bool, room_id: int | None = None) -> dict:
+    """Schätzt die Personenanzahl für eine Messung und speichert sie (direkt oder über den Ingest-Puffer).
+
+    Gemeinsamer Pfad für read_job und den dauerhaft laufenden Sampler (`flask sample-sensors`).
+    Ohne room_id gilt der Raum dieses Knotens (ROOM_SLUG); Schätzplan und Baseline kommen aus diesem Raum.
+    """
+    room_id = _node_room_id() if room_id is None else room_id
+    registry = room_registry()
+    redis_client = _redis_client()
+
+    # Baseline folgt der Sensor-Drift; bis das Fenster gefüllt ist, gilt die Start-Baseline des Raums
+    tracker = _load_baseline_tracker(redis_client, room_id) if _baseline_tracking_enabled() else None
+    plan = registry.plan(room_id, tracker.baseline() if tracker else None)
+
+    # Personenanzahl aus Klima-/VOC-Werten berechnen (ungültige Werte werfen hier einen ValueError)
+    persons = plan.estimate(temperature_c=temperature, rh_percent=humidity, gas_resistance_ohm=voc)
+
+    if _ingest_buffered():
+        # Nur in den Redis-Puffer; flush_buffer_job schreibt gesammelt per Multi-Row-INSERT
+        pending = ingest_buffer.enqueue(redis_client, ingest_buffer.encode_sample(
+            temperature=temperature, humidity=humidity, voc=voc, persons=persons, radar=motion, room_id=room_id,
+        ), max_length=ingest_buffer.get_ingest_config().max_queue_rows)
+        result = {"status": "queued", "pending": pending, "persons": persons, "motion": motion, "room_id": room_id}
+    else:
+        # Messwert in DB speichern
+        measurement_id = create_measurements(
+            temperature=temperature,
+            humidity=humidity,
+            voc=voc,
+            persons=persons,
+            radar=motion,
+            room_id=room_id,
+        )
+        result = {
+            "status": "ok",
+            "measurement_id": measurement_id,
+            "persons": persons,
+            "motion": motion,
+            "room_id": room_id,
+        }
+
+    # Erst nach dem Schreiben: ein verlorener Messwert soll die Baseline nicht verschieben (wie beim Batch-Ingest)
+    if tracker is not None:
+        tracker.update(temperature, humidity, voc)
+        redis_client.set(_baseline_state_key(room_id), json.dumps(tracker.to_state()))
+    return result
+
+
+def estimate_readings(readings: list[dict], room_id: int) -> tuple[list[dict], list[dict]]:
+    """Schätzt die Personenanzahl für einen ganzen Batch vektorisiert mit dem Plan des Raums.
+
+    Gibt (Zeilen für create_measurements_bulk, verworfene Zeilen) zurück; Werte außerhalb der plausiblen
+    Grenzen des Modells werden verworfen statt den Batch abzulehnen. Der ganze Batch nutzt die Baseline
+    vom Beginn des Batches. Die Streaming-Baseline bleibt unverändert; der Aufrufer führt sie erst nach dem
+    Schreiben mit update_baseline_from_rows() nach, damit wiederholte Batches (X-Batch-Id) nicht doppelt zählen.
+    """
+    if not readings:
+        return [], []
+
+    tracker = _load_baseline_tracker(_redis_client(), room_id) if _baseline_tracking_enabled() else None
+    plan = room_registry().plan(room_id, tracker.baseline() if tracker else None)
+
+    temperature = np.array([r["temperature"] for r in readings], dtype=np.float64)
+    humidity = np.array([r["humidity"] for r in readings], dtype=np.float64)
+    voc = np.array([r["voc"] for r in readings], dtype=np.float64)
+    valid = (
+        (plan.cfg.min_gas_ohm <= voc) & (voc <= plan.cfg.max_gas_ohm)
+        & (0.0 <= humidity) & (humidity <= 100.0)
+        & np.isfinite(temperature)
+    )
+
+    rejected = [
+        {"index": readings[i].get("index", i), "error": "Messwert außerhalb plausibler Grenzen"}
+        for i in np.flatnonzero(~valid).tolist()
+    ]
+    if not valid.any():
+        return [], rejected
+
+    persons = plan.estimate_batch(temperature[valid], humidity[valid], voc[valid])["persons"].tolist()
+    rows = [
+        {**readings[i], "persons": n, "room_id": room_id}
+        for i, n in zip(np.flatnonzero(valid).tolist(), persons)
+    ]
+
+    return rows, rejected
+
+
+def update_baseline_from_rows(rows: list[dict], room_id: int) -> None:
+    """Führt die Streaming-Baseline mit geschriebenen Batch-Zeilen in zeitlicher Reihenfolge nach und sichert sie."""
+    if not rows or not _baseline_tracking_enabled():
+        return
+    tracker = _load_baseline_tracker(_redis_client(), room_id)
+    for row in sorted(rows, key=lambda r: r["timestamp"]):
+        tracker.update(row["temperature"], row["humidity"], row["voc"])
+    _redis_client().set(_baseline_state_key(room_id), json.dumps(tracker.to_state()))
+
+
 @shared_task(bind=True, name="measurements.read_job")
 def read_job(self):
     """Liest Sensordaten, schätzt Personenanzahl und speichert einen Messwert in der DB."""
     logger.info("Task %s started: measurements.read_job", self.request.id)
 
     try:
-        from app.logic.rpi.bme680 import get_sensor_data
-
-        data = get_sensor_data()  # Sensor auslesen
+        data = get_sensor_data()  # Sensor auslesen (BME680, Simulation oder Replay, siehe SENSOR_BACKEND)
         temp = data["temperature"]
         hum = data["humidity"]
         voc = data["voc"]
         motion = data["motion"]
 
-        # Personenanzahl aus Klima-/VOC-Werten berechnen
-        persons = estimate_people(
-            temperature_c=temp,
-            rh_percent=hum,
-            gas_resistance_ohm=voc,
-            baseline=BASELINE,
-            cfg=CFG,
-            room=ROOM,
-        )
-
-        # Messwert in DB speichern
-        measurement_id = create_measurements(
-            temperature=temp,
-            humidity=hum,
-            voc=voc,
-            persons=persons,
-            radar=motion,
-        )
+        result = record_reading(temp, hum, voc, motion)
 
         logger.info(
-            "Task %s finished: measurement_id=%s temp=%s hum=%s voc=%s persons=%s motion=%s",
+            "Task %s finished: status=%s measurement_id=%s temp=%s hum=%s voc=%s persons=%s motion=%s",
             self.request.id,
-            measurement_id,
+            result["status"],
+            result.get("measurement_id"),
             temp,
             hum,
             voc,
-            persons,
+            result["persons"],
             motion,
         )
 
-        return {"status": "ok", "measurement_id": measurement_id, "persons": persons, "motion": motion}
+        return result
     except Exception:
         logger.exception("Task %s failed: measurements.read_job", self.request.id)
         raise
 
 
+def _decode_batch(samples: list[str]) -> list[dict]:
+    """Dekodiert einen Batch; kaputte Einträge werden geloggt und verworfen, statt den Puffer zu blockieren."""
+    rows = []
+    for raw in samples:
+        try:
+            rows.append(ingest_buffer.decode_sample(raw))
+        except (KeyError, TypeError, ValueError):
+            logger.error("Dropping invalid buffered measurement: %r", raw)
+    return rows
+
+
+@shared_task(bind=True, name="measurements.flush_buffer")
+def flush_buffer_job(self):
+    """Schreibt gepufferte Messwerte, sobald Größe oder Alter die Schwelle erreichen (Multi-Row-INSERT)."""
+    redis_client = _redis_client()
+    config = ingest_buffer.get_ingest_config()
+
+    if not ingest_buffer.should_flush(redis_client, config):
+        return {"status": "idle"}
+
+    # Nur ein Flusher gleichzeitig, sonst würden zwei Prozesse denselben offenen Batch schreiben
+    lock = redis_client.lock(ingest_buffer.FLUSH_LOCK_KEY, timeout=120, blocking_timeout=0)
+    if not lock.acquire(blocking=False):
+        return {"status": "busy"}
+
+    written = batches = dead_lettered = 0
+    try:
+        while ingest_buffer.should_flush(redis_client, config):
+            batch = ingest_buffer.claim(redis_client, config.max_rows)
+            if not batch.samples:
+                break
+            if batch.recovered:
+                logger.warning("Re-flushing ingest batch %s (%s rows) after crash", batch.batch_id, len(batch.samples))
+
+            # DB-Fehler: Batch bleibt in der Processing-Liste und wird beim nächsten Lauf erneut versucht
+            try:
+                written += create_measurements_bulk(_decode_batch(batch.samples), batch_id=batch.batch_id)
+            except (OperationalError, InterfaceError):
+                raise  # DB nicht erreichbar: beliebig oft wiederholen, der Batch selbst ist nicht schuld
+            except Exception:
+                # Daten werden abgelehnt (z. B. gelöschter Raum): nach einigen Versuchen aussortieren,
+                # sonst blockiert der Batch jeden weiteren Flush und der Puffer wächst unbegrenzt
+                attempts = ingest_buffer.record_failure(redis_client, batch.batch_id)
+                if attempts < config.max_attempts:
+                    raise
+                logger.exception(
+                    "Moving ingest batch %s (%s rows) to %s after %s failed attempts",
+                    batch.batch_id, len(batch.samples), ingest_buffer.DEAD_LETTER_KEY, attempts,
+                )
+                ingest_buffer.dead_letter(redis_client)
+                dead_lettered += 1
+                continue
+            ingest_buffer.ack(redis_client)
+            batches += 1
+
+        logger.info(
+            "Task %s finished: flushed %s measurements in %s batches (%s dead-lettered)",
+            self.request.id, written, batches, dead_lettered,
+        )
+        return {"status": "ok", "written": written, "batches": batches, "dead_lettered": dead_lettered}
+    except Exception:
+        logger.exception("Task %s failed: measurements.flush_buffer", self.request.id)
+        raise
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            logger.debug("Ingest flush lock was already released or expired", exc_info=True)
+
+
+def _archive_expired_measurements(cutoff: datetime, config: RetentionConfig) -> tuple[str | None, int, int | None]:
+    """Exportiert alle Messwerte vor `cutoff` als CSV.gz nach S3, bevor sie gelöscht werden.
+
+    Liest blockweise per PK (keine langen Snapshots) in eine temporäre Datei und lädt sie in einem Stück hoch.
+    Gibt Object-Key, Zeilenzahl und höchste exportierte ID zurück; gelöscht wird danach nur bis zu dieser ID.
+    """
+    last_id = 0
+    with TemporaryDirectory() as tmp_dir:
+        with CsvGzipWriter(Path(tmp_dir) / "measurements.csv.gz") as writer:
+            while True:
+                rows = get_expired_measurement_rows(cutoff, after_id=last_id, max_id=None, limit=config.chunk_rows)
+                if not rows:
+                    break
+                writer.write(rows)
+                last_id = rows[-1].id
+                if len(rows) < config.chunk_rows:
+                    break
+
+        if not writer.rows:
+            return None, 0, None
+        object_key = archive_object_key(config.archive_prefix, cutoff)
+        upload_file(writer.path, object_key=object_key, content_type="application/gzip")
+    return object_key, writer.rows, last_id
+
+
 @shared_task(bind=True, name="measurements.delete_old")
 def delete_job(self, days: int = 30):
-    """Löscht Messwerte, die älter als X Tage sind (Standard: 30)."""
+    """Löscht Messwerte, die älter als X Tage sind (Standard: 30), sowie abgelaufene Rollups.
+
+    Gelöscht wird in kleinen PK-Bereichen mit Pausen; mit RETENTION_ARCHIVE_ENABLED werden die Zeilen
+    vorher als CSV.gz in den Bucket exportiert (schlägt der Export fehl, wird nichts gelöscht).
+    """
     logger.info("Task %s started: delete_job(days=%s)", self.request.id, days)
     try:
-        deleted = delete_measurements_older_than(days=days)
-        logger.info("Task %s finished: deleted=%s", self.request.id, deleted)
-        return {"status": "ok", "deleted": deleted, "days": days}
+        config = get_retention_config()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+        archive_key, archived, max_id = None, 0, None
+        if config.archive:
+            archive_key, archived, max_id = _archive_expired_measurements(cutoff, config)
+            logger.info("Task %s archived %s measurements to %s", self.request.id, archived, archive_key)
+
+        deleted = 0
+        if not config.archive or max_id is not None:
+            deleted = delete_measurements_older_than(
+                days=days,
+                cutoff=cutoff,
+                max_id=max_id,
+                chunk_rows=config.chunk_rows,
+                pause_seconds=config.pause_seconds,
+            )
+        deleted_rollups = delete_rollups_older_than()
+        delete_ingest_batches_older_than()
+        logger.info("Task %s finished: deleted=%s deleted_rollups=%s", self.request.id, deleted, deleted_rollups)
+        return {
+            "status": "ok",
+            "deleted": deleted,
+            "deleted_rollups": deleted_rollups,
+            "days": days,
+            "archived": archived,
+            "archive_key": archive_key,
+        }
     except Exception:
         logger.exception("Task %s failed: delete_job(days=%s)", self.request.id, days)
         raise
 
 
 @shared_task(bind=True, name="videos.capture_on_motion")
-def capture_on_motion(self):
-    """Nimmt pro zusammenhängender Bewegung genau einen Clip auf und lädt ihn nach S3."""
+def capture_on_motion(self, motion: bool | None = None):
+    """Nimmt pro zusammenhängender Bewegung genau einen Clip auf und lädt ihn nach S3.
+
+    `motion` kommt vom Bewegungsdienst (`flask motion-events`, GPIO-Flanke); ohne Angabe wird der PIR
+    wie beim Beat-Polling selbst gelesen.
+    """
     logger.info("Task %s started: videos.capture_on_motion", self.request.id)
     redis_client = _redis_client()
     duration_seconds = _video_duration_seconds()
 
     try:
+        if motion is None:
+            motion = _read_motion_sensor()
+
         # Keine Bewegung: Bewegungsphase beenden, damit die nächste Bewegung wieder aufnehmen darf.
-        if not _read_motion_sensor():
+        if not motion:
             redis_client.delete(MOTION_ACTIVE_KEY)
             return {"status": "idle", "motion": False}
 
@@ -142,7 +583,9 @@ def capture_on_motion(self):
             blocking_timeout=0,
         )
         if not lock.acquire(blocking=False):
+            metrics.CAPTURE_LOCK.labels(result="contended").inc()
             return {"status": "locked", "motion": True}
+        metrics.CAPTURE_LOCK.labels(result="acquired").inc()
 
         recorded_at = datetime.now(timezone.utc)
         config = get_s3_config()
@@ -156,29 +599,73 @@ def capture_on_motion(self):
             # Status bleibt gesetzt, bis der Sensor wieder "keine Bewegung" meldet.
             redis_client.set(MOTION_ACTIVE_KEY, "1", ex=max(duration_seconds + 3600, 3600))
 
-            # Video nur temporär lokal halten; danach wird es nach S3/MinIO geladen.
-            with TemporaryDirectory() as tmp_dir:
-                output_path = Path(tmp_dir) / "capture.mp4"
-                capture_mp4(output_path, duration_seconds=duration_seconds)
-                size_bytes = output_path.stat().st_size
-                bucket = upload_video_file(output_path, object_key=object_key, content_type="video/mp4")
+            spool_path = _spool_path(object_key)
+            spool_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Fragmentiertes MP4 aus der Pipe; volle Parts gehen schon während der Aufnahme nach S3.
+            # Ohne Bucket ist der Upload gescheitert und der Clip liegt im Spool (weiter wie im Dateimodus).
+            bucket = None
+            streaming = _streaming_upload()
+            if streaming:
+                bucket, size_bytes = _stream_clip(object_key, spool_path, duration_seconds, lock)
+
+            if bucket is not None:
+                # In MariaDB nur Metadaten speichern; die Videodatei liegt im privaten Bucket.
+                recording_id = create_video_recording(
+                    recorded_at=recorded_at,
+                    duration_seconds=duration_seconds,
+                    bucket=bucket,
+                    object_key=object_key,
+                    content_type="video/mp4",
+                    size_bytes=size_bytes,
+                    status="stored",
+                )
+                if _thumbnails_enabled():
+                    # Kein lokaler Clip vorhanden: Vorschau im Upload-Worker aus dem Bucket erzeugen
+                    _enqueue_thumbnails(recording_id)
+                return {
+                    "status": "stored",
+                    "motion": True,
+                    "video_recording_id": recording_id,
+                    "bucket": bucket,
+                    "object_key": object_key,
+                }
+
+            # Clip in den Spool legen; hochgeladen wird im Hintergrund (Queue "uploads"), damit die Kamera
+            # sofort für die nächste Bewegung frei ist und ein S3-Ausfall keine Aufnahme kostet.
+            if not streaming:
+                with TemporaryDirectory(dir=_video_spool_dir()) as tmp_dir:
+                    output_path = Path(tmp_dir) / "capture.mp4"
+                    # Im Dauerbetrieb beginnt der Clip schon vor dem Auslöser (Pre-Roll)
+                    recorded_at, duration_seconds = _capture_clip(output_path, duration_seconds, recorded_at)
+                    size_bytes = output_path.stat().st_size
+                    output_path.replace(spool_path)  # gleiches Dateisystem: atomar, nie halbe Dateien im Spool
 
-            # In MariaDB nur Metadaten speichern; die Videodatei liegt im privaten Bucket.
-            recording_id = create_video_recording(
-                recorded_at=recorded_at,
-                duration_seconds=duration_seconds,
-                bucket=bucket,
-                object_key=object_key,
-                content_type="video/mp4",
-                size_bytes=size_bytes,
-                status="stored",
-            )
+            try:
+                recording_id = create_video_recording(
+                    recorded_at=recorded_at,
+                    duration_seconds=duration_seconds,
+                    bucket=config.bucket,
+                    object_key=object_key,
+                    content_type="video/mp4",
+                    size_bytes=size_bytes,
+                    status="pending_upload",
+                )
+            except Exception:
+                spool_path.unlink(missing_ok=True)
+                raise
+
+            try:
+                upload_video.apply_async(args=[recording_id])
+            except Exception:
+                # Broker nicht erreichbar: der Clip bleibt im Spool, requeue_pending_uploads holt ihn nach
+                logger.warning("Failed to enqueue upload for video recording id=%s", recording_id, exc_info=True)
 
             return {
-                "status": "stored",
+                "status": "pending_upload",
                 "motion": True,
                 "video_recording_id": recording_id,
-                "bucket": bucket,
+                "bucket": config.bucket,
                 "object_key": object_key,
             }
         except Exception as exc:
@@ -195,10 +682,120 @@ def capture_on_motion(self):
             )
             raise
         finally:
-            try:
-                lock.release()
-            except Exception:
-                logger.debug("Capture lock was already released or expired", exc_info=True)
+            _release_capture_lock(lock)
     except Exception:
         logger.exception("Task %s failed: videos.capture_on_motion", self.request.id)
         raise
+
+
+@shared_task(bind=True, name="videos.upload", max_retries=int(os.getenv("VIDEO_UPLOAD_MAX_RETRIES", "8")), acks_late=True)
+def upload_video(self, recording_id: int):
+    """Lädt einen Clip aus dem Spool nach S3 und setzt die Aufnahme auf "stored".
+
+    Läuft in der eigenen Queue "uploads" (begrenzte Parallelität über den Upload-Worker). Fehlschläge werden
+    mit exponentiellem Backoff wiederholt; erst danach wird die Aufnahme "failed", der Clip bleibt im Spool.
+    Vor dem Upload wird die Aufnahme atomar übernommen ("uploading"), sodass doppelt eingestellte Tasks
+    (Retry und requeue_pending_uploads) nie gleichzeitig hochladen.
+    """
+    recording = claim_video_upload(recording_id, stale_after=_upload_claim_timeout())
+    if recording is None:
+        return {"status": "skipped", "video_recording_id": recording_id}
+
+    spool_path = _spool_path(recording.object_key)
+    if not spool_path.exists():
+        # Nur überschreiben, wenn kein anderer Task die Aufnahme inzwischen gespeichert hat (Spool dann gelöscht)
+        updated = update_video_recording(
+            recording_id,
+            status="failed",
+            error_message=f"Spool-Datei fehlt: {spool_path}",
+            expected_status="uploading",
+        )
+        return {"status": "failed" if updated else "skipped", "video_recording_id": recording_id}
+
+    try:
+        bucket = upload_video_file(spool_path, object_key=recording.object_key, content_type=recording.content_type)
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            logger.exception("Task %s failed: videos.upload id=%s, giving up", self.request.id, recording_id)
+            update_video_recording(
+                recording_id, status="failed", error_message=str(exc)[:2000], expected_status="uploading"
+            )
+            raise
+        # Freigeben, damit der geplante Retry (oder ein erneut eingestellter Task) die Aufnahme übernehmen kann
+        update_video_recording(
+            recording_id, status="pending_upload", error_message=str(exc)[:2000], expected_status="uploading"
+        )
+        countdown = _upload_retry_countdown(self.request.retries)
+        logger.warning(
+            "Upload of video recording id=%s failed (attempt %s), retrying in %.0fs",
+            recording_id,
+            self.request.retries + 1,
+            countdown,
+            exc_info=True,
+        )
+        raise self.retry(exc=exc, countdown=countdown)
+
+    # Vorschau aus der noch vorhandenen Spool-Datei, damit der Clip nicht erneut geladen werden muss
+    thumbnails = (
+        _upload_thumbnails(spool_path, recording.object_key, recording.duration_seconds)
+        if _thumbnails_enabled()
+        else {}
+    )
+    update_video_recording(
+        recording_id, status="stored", size_bytes=spool_path.stat().st_size, expected_status="uploading", **thumbnails
+    )
+    spool_path.unlink(missing_ok=True)
+    logger.info("Task %s finished: uploaded video recording id=%s to %s", self.request.id, recording_id, bucket)
+    return {"status": "stored", "video_recording_id": recording_id, "bucket": bucket}
+
+
+@shared_task(bind=True, name="videos.requeue_pending_uploads")
+def requeue_pending_uploads(self, older_than_minutes: int = 30):
+    """Stellt Uploads erneut ein, deren Task verloren ging (Broker-Neustart, Enqueue-Fehler beim Capture, Absturz).
+
+    Läuft für eine Aufnahme noch ein Retry, ist der zusätzliche Task harmlos: nur einer übernimmt sie per
+    claim_video_upload(), der andere endet mit "skipped".
+    """
+    now = datetime.now(timezone.utc)
+    created_before = now - timedelta(minutes=older_than_minutes)
+    recordings = get_video_recordings_by_status("pending_upload", created_before=created_before)
+    recordings += get_stale_video_uploads(started_before=now - _upload_claim_timeout())
+    for recording in recordings:
+        upload_video.apply_async(args=[recording.id])
+    if recordings:
+        logger.info("Task %s finished: requeued %s pending uploads", self.request.id, len(recordings))
+    return {"status": "ok", "requeued": len(recordings)}
+
+
+def _enqueue_thumbnails(recording_id: int) -> None:
+    """Stellt die Vorschau-Erzeugung ein; ein Broker-Fehler kostet nur die Vorschau."""
+    try:
+        generate_thumbnails.apply_async(args=[recording_id])
+    except Exception:
+        logger.warning("Failed to enqueue thumbnails for video recording id=%s", recording_id, exc_info=True)
+
+
+@shared_task(bind=True, name="videos.thumbnails")
+def generate_thumbnails(self, recording_id: int, force: bool = False):
+    """Erzeugt Poster/Sprite für einen gespeicherten Clip aus dem Bucket (Streaming-Upload, Nachholen für Altbestand)."""
+    recording = get_video_recording(recording_id)
+    if recording is None or recording.status != "stored":
+        return {"status": "skipped", "video_recording_id": recording_id}
+    if recording.poster_key and recording.sprite_key and not force:
+        return {"status": "exists", "video_recording_id": recording_id}
+
+    with TemporaryDirectory() as tmp_dir:
+        video_path = download_file(recording.bucket, recording.object_key, Path(tmp_dir) / "clip.mp4")
+        thumbnails = _upload_thumbnails(video_path, recording.object_key, recording.duration_seconds)
+
+    if not thumbnails:
+        return {"status": "failed", "video_recording_id": recording_id}
+
+    update_video_recording(
+        recording_id,
+        status=recording.status,
+        error_message=recording.error_message,
+        **thumbnails,
+    )
+    logger.info("Task %s finished: thumbnails for video recording id=%s", self.request.id, recording_id)
+    return {"status": "ok", "video_recording_id": recording_id, **thumbnails}
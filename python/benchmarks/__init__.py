@@ -0,0 +1 @@
+"""Benchmarks für die Hot Paths des Projekts (Start z. B. mit `uv run python -m benchmarks.estimator_batch`)."""
@@ -0,0 +1,88 @@
+"""Gemeinsame Hilfen für Benchmarks: lokale Test-DB anlegen und mit synthetischen Messwerten füllen."""
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Engine
+
+from app.logic.rooms import DEFAULT_ROOM_ID, DEFAULT_ROOM_SLUG
+from app.models.measurements import Measurements
+from app.models.room import Room
+
+DEFAULT_DB_URL = "sqlite:////tmp/asia-benchmark.sqlite"
+
+
+def make_engine(url: str = DEFAULT_DB_URL) -> Engine:
+    """Erstellt eine Engine für SQLite (Standard) oder z. B. eine lokale MariaDB (mysql+pymysql://...)."""
+    return create_engine(url)
+
+
+def reset_measurements(engine: Engine, *, with_indexes: bool = True) -> None:
+    """Legt die measurements-Tabelle frisch an (optional ohne Sekundärindizes); der Standardraum muss existieren."""
+    rooms = Room.__table__
+    rooms.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        if conn.execute(select(rooms.c.id).where(rooms.c.id == DEFAULT_ROOM_ID)).first() is None:
+            conn.execute(rooms.insert().values(id=DEFAULT_ROOM_ID, slug=DEFAULT_ROOM_SLUG, name="Gastraum"))
+
+    table = Measurements.__table__
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    if not with_indexes:
+        for index in table.indexes:
+            index.drop(engine)
+
+
+def seed_measurements(
+    engine: Engine,
+    rows: int,
+    *,
+    step_seconds: int = 60,
+    end: datetime | None = None,
+    chunk_size: int = 50_000,
+    seed: int = 42,
+) -> None:
+    """Schreibt `rows` Messwerte im Abstand von `step_seconds`, der letzte liegt bei `end` (Standard: jetzt)."""
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc)
+    start = end - timedelta(seconds=step_seconds * (rows - 1))
+    table = Measurements.__table__
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk_size):
+            batch = []
+            for i in range(offset, min(offset + chunk_size, rows)):
+                persons = rng.randint(0, 125)
+                batch.append({
+                    "timestamp": start + timedelta(seconds=step_seconds * i),
+                    "temperature": round(18.0 + persons * 0.06 + rng.uniform(-0.5, 0.5), 2),
+                    "humidity": round(rng.uniform(35.0, 55.0), 2),
+                    "voc": float(rng.randint(100, 1200)),
+                    "persons": persons,
+                    "radar": persons > 0,
+                })
+            conn.execute(table.insert(), batch)
+
+
+def time_call(fn: Callable[[], object], *, repeat: int = 5) -> float:
+    """Median-Laufzeit von fn in Sekunden über `repeat` Durchläufe."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """q-Perzentil (0..100) per linearer Interpolation; 0.0 für eine leere Liste."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
@@ -0,0 +1,75 @@
+"""
+Benchmark: get_since() (ORM-Objekte) vs. get_columns_since() (nur benötigte Spalten) für /api/dashboard.
+
+Misst pro Request Latenz und Spitzen-Speicher (tracemalloc) für das Laden des 24h-Fensters und das
+Aufbauen der Chart-Punkte. Standard: 1-Minuten-Takt für mehrere Räume in einer lokalen SQLite-DB.
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.dashboard_projection --rooms 5
+"""
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app import create_app
+from app.extensions.db import db
+from app.models.repositories import get_columns_since, get_since
+from app.serializers import dt_iso
+from benchmarks._common import DEFAULT_DB_URL, reset_measurements, seed_measurements, time_call
+
+
+def _orm_request(since: datetime) -> list:
+    points = [{"t": dt_iso(r.timestamp), "temperature": float(r.temperature), "x": int(r.persons)}
+              for r in get_since(since)]
+    db.session.remove()  # Identity-Map wie am Ende eines Requests verwerfen
+    return points
+
+
+def _projection_request(since: datetime) -> list:
+    points = [{"t": dt_iso(ts), "temperature": float(temp), "x": int(persons)}
+              for ts, temp, persons in get_columns_since(since, ("timestamp", "temperature", "persons"))]
+    db.session.remove()
+    return points
+
+
+def _peak_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=5, help="Räume mit je einem Messwert pro Minute (Standard: 5)")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help=f"SQLAlchemy-URL (Standard: {DEFAULT_DB_URL})")
+    parser.add_argument("--repeat", type=int, default=7, help="Wiederholungen pro Variante (Median)")
+    args = parser.parse_args()
+
+    rows = 1440 * args.rooms
+    flask_app = create_app({"SQLALCHEMY_DATABASE_URI": args.db_url})
+    with flask_app.app_context():
+        now = datetime.now(timezone.utc)
+        reset_measurements(db.engine)
+        seed_measurements(db.engine, rows, step_seconds=max(1, 86400 // rows), end=now)
+        since = now - timedelta(hours=24)
+
+        results = {}
+        for name, fn in (("get_since (ORM)", _orm_request), ("get_columns_since", _projection_request)):
+            fn(since)  # Warmup (Statement-Cache, Verbindungen)
+            latency = time_call(lambda: fn(since), repeat=args.repeat)
+            results[name] = (latency, _peak_bytes(lambda: fn(since)))
+
+    print(f"rows in 24h window: {rows}")
+    print(f"{'variant':<22}{'latency ms':>12}{'peak KiB':>12}")
+    for name, (latency, peak) in results.items():
+        print(f"{name:<22}{latency * 1000:>12.2f}{peak / 1024:>12.0f}")
+
+    (orm_latency, orm_peak), (proj_latency, proj_peak) = results.values()
+    print(f"saved per request: {(orm_latency - proj_latency) * 1000:.2f} ms, {(orm_peak - proj_peak) / 1024:.0f} KiB peak")
+
+
+if __name__ == "__main__":
+    main()
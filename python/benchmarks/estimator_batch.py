@@ -0,0 +1,83 @@
+"""
+Benchmark: estimate_people() in einer Schleife vs. EstimatorPlan.estimate() vs. estimate_people_batch().
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.estimator_batch --rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.logic.occupancy_estimator import (
+    Baseline,
+    EstimatorPlan,
+    ModelConfig,
+    RoomConfig,
+    estimate_people,
+    estimate_people_batch,
+)
+
+ROOM = RoomConfig(area_m2=180.0, height_m=3.0, ach_per_hour=2.0, v_ref_m3=300.0, ach_ref_per_hour=2.0)
+CFG = ModelConfig(weight_gas=0.8, weight_hum=0.2, n_max=125, i_ref_full=0.20, gas_temp_coeff_per_C=0.0)
+BASELINE = Baseline(temperature_c=21.0, rh_percent=35.0, gas_resistance_ohm=22000.0)
+
+
+def synthetic_history(rows: int, seed: int = 42) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Erzeugt plausible Sensorwerte in BME680-Auflösung (Temp/Feuchte 0.01, Gas ganze Ohm)."""
+    rng = np.random.default_rng(seed)
+    temps = np.round(rng.uniform(15.0, 30.0, rows), 2)
+    rhs = np.round(rng.uniform(25.0, 60.0, rows), 2)
+    gases = np.round(rng.uniform(5_000.0, 30_000.0, rows))
+    return temps, rhs, gases
+
+
+def run(rows: int) -> dict:
+    """Misst beide Pfade und prüft, dass sie identische Ergebnisse liefern."""
+    temps, rhs, gases = synthetic_history(rows)
+
+    start = time.perf_counter()
+    scalar = [
+        estimate_people(t, rh, g, BASELINE, CFG, ROOM)
+        for t, rh, g in zip(temps.tolist(), rhs.tolist(), gases.tolist())
+    ]
+    scalar_s = time.perf_counter() - start
+
+    plan = EstimatorPlan.compile(BASELINE, CFG, ROOM)
+    start = time.perf_counter()
+    planned = [plan.estimate(t, rh, g) for t, rh, g in zip(temps.tolist(), rhs.tolist(), gases.tolist())]
+    plan_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = estimate_people_batch(temps, rhs, gases, BASELINE, CFG, ROOM)
+    batch_s = time.perf_counter() - start
+
+    if batch["persons"].tolist() != scalar:
+        raise AssertionError("Batch-Ergebnis weicht von estimate_people() ab")
+    if planned != scalar:
+        raise AssertionError("EstimatorPlan-Ergebnis weicht von estimate_people() ab")
+
+    return {
+        "rows": rows,
+        "scalar_rows_per_s": rows / scalar_s,
+        "plan_rows_per_s": rows / plan_s,
+        "batch_rows_per_s": rows / batch_s,
+        "speedup": scalar_s / batch_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Anzahl Messwerte (Standard: 100000)")
+    args = parser.parse_args()
+
+    result = run(args.rows)
+    print(f"rows:    {result['rows']}")
+    print(f"scalar:  {result['scalar_rows_per_s']:>14,.0f} rows/s")
+    print(f"plan:    {result['plan_rows_per_s']:>14,.0f} rows/s")
+    print(f"batch:   {result['batch_rows_per_s']:>14,.0f} rows/s")
+    print(f"speedup: {result['speedup']:>14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: create_measurements() (ein Commit pro Messwert) vs. create_measurements_bulk() (Multi-Row-INSERT).
+
+Beide Varianten schreiben inklusive Rollup-Upsert in dieselbe DB; die Redis-Nacharbeit nach dem Commit
+(Regressionsfenster, Dashboard-Cache, SSE) wird ausgeklammert, damit nur der DB-Pfad gemessen wird.
+Für realistische Zahlen gegen die MariaDB des Pi laufen lassen (--db-url mysql+pymysql://...).
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.ingest_bulk --rows 2000 --batch-sizes 50 500
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app import create_app
+from app.extensions.db import db
+from app.models import services
+from app.models.measurement_rollup import MeasurementRollup
+from benchmarks._common import DEFAULT_DB_URL, reset_measurements
+
+
+def _samples(rows: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(seconds=rows)
+    samples = []
+    for i in range(rows):
+        persons = rng.randint(0, 125)
+        samples.append({
+            "timestamp": start + timedelta(seconds=i),
+            "temperature": round(18.0 + persons * 0.06 + rng.uniform(-0.5, 0.5), 2),
+            "humidity": round(rng.uniform(35.0, 55.0), 2),
+            "voc": float(rng.randint(100, 1200)),
+            "persons": persons,
+            "radar": persons > 0,
+        })
+    return samples
+
+
+def _reset() -> None:
+    reset_measurements(db.engine)
+    MeasurementRollup.__table__.drop(db.engine, checkfirst=True)
+    MeasurementRollup.__table__.create(db.engine)
+
+
+def _per_row(samples: list[dict]) -> float:
+    start = time.perf_counter()
+    for sample in samples:
+        services.create_measurements(
+            temperature=sample["temperature"],
+            humidity=sample["humidity"],
+            voc=sample["voc"],
+            persons=sample["persons"],
+            radar=sample["radar"],
+        )
+    return time.perf_counter() - start
+
+
+def _bulk(samples: list[dict], batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(samples), batch_size):
+        services.create_measurements_bulk(samples[offset:offset + batch_size])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Messwerte pro Variante (Standard: 2000)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500], help="Batch-Größen für den Bulk-Pfad")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help=f"SQLAlchemy-URL (Standard: {DEFAULT_DB_URL})")
+    args = parser.parse_args()
+
+    # Nur den DB-Pfad messen (siehe Docstring)
+    services._after_measurements_commit = lambda measurements: None
+    services._invalidate_measurement_caches = lambda room_ids=(): None
+
+    samples = _samples(args.rows)
+    flask_app = create_app({"SQLALCHEMY_DATABASE_URI": args.db_url})
+    results = {}
+    with flask_app.app_context():
+        _reset()
+        results["per-row commit"] = _per_row(samples)
+        for batch_size in args.batch_sizes:
+            _reset()
+            results[f"bulk (batch={batch_size})"] = _bulk(samples, batch_size)
+
+    baseline = results["per-row commit"]
+    print(f"rows per variant: {args.rows}")
+    print(f"{'variant':<22}{'seconds':>10}{'rows/s':>12}{'speedup':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<22}{seconds:>10.2f}{args.rows / seconds:>12.0f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
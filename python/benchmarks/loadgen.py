@@ -0,0 +1,202 @@
+"""
+Lastgenerator: N virtuelle Räume mit simulierten Sensoren treiben Erfassung, Schätzung und Dashboard-API.
+
+Jeder Raum bekommt einen eigenen SimulatedBackend (Zeitraffer über --time-scale, Start zur Mittagszeit)
+und einen Sensor-Knoten mit API-Token. Pro Raum laufen zwei Threads:
+- Erfassung mit --rate Messungen/s, entweder `direct` (record_reading: Schätzung + ein Commit pro Messwert)
+  oder `batch` (POST /api/measurements/batch mit gzip-NDJSON, --batch-size Messungen pro Request)
+- Dashboard-Abfragen mit --dashboard-rate Requests/s (GET /api/dashboard?room=..., mit If-None-Match wie der Browser)
+
+Gemessen wird im Prozess über den Flask-Test-Client (ohne nginx/gunicorn), gegen die konfigurierte DB und
+das Redis aus CELERY_BROKER_URL. Ausgabe: Durchsatz sowie p50/p99-Latenz je Operation.
+
+Start (im Ordner python/, Redis muss laufen):
+    uv run python -m benchmarks.loadgen --rooms 4 --rate 5 --duration 30 --mode batch
+"""
+import argparse
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app import create_app
+from app.extensions.db import db
+from app.logic.rooms import room_settings
+from app.logic.sensor_backends import SimulatedBackend
+from app.models.room import Room
+from app.models.services import issue_device_token
+from app.tasks.tasks import record_reading
+from benchmarks._common import DEFAULT_DB_URL, percentile
+
+
+class Recorder:
+    """Sammelt Latenzen (Sekunden) und Fehler je Operation, threadsicher."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rows = defaultdict(int)
+
+    def record(self, op: str, seconds: float, *, ok: bool = True, rows: int = 0) -> None:
+        with self._lock:
+            self.latencies[op].append(seconds)
+            self.rows[op] += rows
+            if not ok:
+                self.errors[op] += 1
+
+
+def _ensure_rooms(count: int) -> list[Room]:
+    """Legt die Räume loadgen-1..N an (idempotent), damit mehrere Läufe dieselbe DB nutzen können."""
+    rooms = []
+    for i in range(1, count + 1):
+        slug = f"loadgen-{i}"
+        room = db.session.query(Room).filter(Room.slug == slug).one_or_none()
+        if room is None:
+            room = Room(slug=slug, name=f"Lasttest {i}", area_m2=60.0 + 40.0 * i)
+            db.session.add(room)
+            db.session.commit()
+        rooms.append(room)
+    return rooms
+
+
+def _paced(rate: float, deadline: float, stop: threading.Event):
+    """Liefert Takte mit fester Rate bis zur Deadline (holt Verzug nicht nach, um keine Lastspitzen zu erzeugen)."""
+    interval = 1.0 / rate
+    next_tick = time.perf_counter()
+    while not stop.is_set() and next_tick < deadline:
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield
+        next_tick = max(next_tick + interval, time.perf_counter() - interval)
+
+
+def _ingest_direct(flask_app, room_id: int, sensor: SimulatedBackend, args, recorder: Recorder, deadline: float, stop):
+    with flask_app.app_context():
+        for _ in _paced(args.rate, deadline, stop):
+            reading = sensor.read()
+            start = time.perf_counter()
+            try:
+                record_reading(reading["temperature"], reading["humidity"], reading["voc"], reading["motion"], room_id=room_id)
+                recorder.record("ingest direct", time.perf_counter() - start, rows=1)
+            except Exception:
+                recorder.record("ingest direct", time.perf_counter() - start, ok=False)
+            finally:
+                db.session.remove()
+
+
+def _ingest_batch(flask_app, token: str, sensor: SimulatedBackend, args, recorder: Recorder, deadline: float, stop):
+    client = flask_app.test_client()
+    headers = {"Authorization": f"Bearer {token}", "Content-Encoding": "gzip"}
+    pending = []
+
+    def send():
+        body = gzip.compress("\n".join(json.dumps(r) for r in pending).encode())
+        start = time.perf_counter()
+        response = client.post(
+            "/api/measurements/batch", data=body, headers=headers, content_type="application/x-ndjson"
+        )
+        ok = response.status_code == 200
+        recorder.record("ingest batch", time.perf_counter() - start, ok=ok, rows=response.json["written"] if ok else 0)
+        pending.clear()
+
+    for _ in _paced(args.rate, deadline, stop):
+        reading = sensor.read()
+        pending.append({**reading, "timestamp": datetime.now(timezone.utc).isoformat()})
+        if len(pending) >= args.batch_size:
+            send()
+    if pending:
+        send()
+
+
+def _poll_dashboard(flask_app, slug: str, args, recorder: Recorder, deadline: float, stop):
+    client = flask_app.test_client()
+    etag = None
+    for _ in _paced(args.dashboard_rate, deadline, stop):
+        headers = {"If-None-Match": etag} if etag else {}
+        start = time.perf_counter()
+        response = client.get(f"/api/dashboard?room={slug}", headers=headers)
+        seconds = time.perf_counter() - start
+        if response.status_code == 304:
+            recorder.record("dashboard 304", seconds)
+        else:
+            recorder.record("dashboard 200", seconds, ok=response.status_code == 200)
+            etag = response.headers.get("ETag")
+
+
+def _report(recorder: Recorder, elapsed: float) -> None:
+    print(f"{'operation':<16}{'count':>8}{'errors':>8}{'ops/s':>10}{'rows/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for op in sorted(recorder.latencies):
+        latencies = recorder.latencies[op]
+        print(
+            f"{op:<16}{len(latencies):>8}{recorder.errors[op]:>8}{len(latencies) / elapsed:>10.1f}"
+            f"{recorder.rows[op] / elapsed:>10.1f}"
+            f"{percentile(latencies, 50) * 1000:>10.2f}{percentile(latencies, 99) * 1000:>10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=4, help="Virtuelle Räume (Standard: 4)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Messungen pro Sekunde und Raum (Standard: 5)")
+    parser.add_argument("--mode", choices=("direct", "batch"), default="batch", help="Erfassungsweg (Standard: batch)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Messungen pro Batch-Request (Standard: 50)")
+    parser.add_argument("--dashboard-rate", type=float, default=1.0, help="Dashboard-Requests pro Sekunde und Raum (0 = aus)")
+    parser.add_argument("--duration", type=float, default=15.0, help="Laufzeit in Sekunden (Standard: 15)")
+    parser.add_argument("--time-scale", type=float, default=60.0, help="Simulierte Sekunden pro echter Sekunde (Standard: 60)")
+    parser.add_argument("--seed", type=int, default=42, help="Startwert der Simulation")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help=f"SQLAlchemy-URL (Standard: {DEFAULT_DB_URL})")
+    args = parser.parse_args()
+
+    flask_app = create_app({"SQLALCHEMY_DATABASE_URI": args.db_url})
+    with flask_app.app_context():
+        db.create_all()
+        rooms = [(room.id, room.slug, room_settings(room)) for room in _ensure_rooms(args.rooms)]
+        tokens = {room_id: issue_device_token(f"loadgen-node-{room_id}", room_id) for room_id, _, _ in rooms}
+
+    # Simulierte Uhr: beginnt heute 11:30 (Mittagsgeschäft) und läuft um --time-scale schneller
+    sim_start = datetime.now().replace(hour=11, minute=30, second=0, microsecond=0).timestamp()
+    real_start = time.perf_counter()
+
+    def clock() -> float:
+        return sim_start + (time.perf_counter() - real_start) * args.time_scale
+
+    recorder = Recorder()
+    stop = threading.Event()
+    deadline = time.perf_counter() + args.duration
+    threads = []
+    for i, (room_id, slug, settings) in enumerate(rooms):
+        sensor = SimulatedBackend(settings, seed=args.seed + i, clock=clock)
+        if args.mode == "direct":
+            target, target_args = _ingest_direct, (flask_app, room_id, sensor, args, recorder, deadline, stop)
+        else:
+            target, target_args = _ingest_batch, (flask_app, tokens[room_id], sensor, args, recorder, deadline, stop)
+        threads.append(threading.Thread(target=target, args=target_args, daemon=True))
+        if args.dashboard_rate > 0:
+            threads.append(threading.Thread(
+                target=_poll_dashboard, args=(flask_app, slug, args, recorder, deadline, stop), daemon=True
+            ))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    simulated = timedelta(seconds=int(elapsed * args.time_scale))
+    print(f"rooms: {args.rooms}  mode: {args.mode}  target: {args.rate * args.rooms:.0f} readings/s  "
+          f"elapsed: {elapsed:.1f}s  simulated: {simulated}")
+    _report(recorder, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: Zeitbereichs-Abfragen auf measurements ohne und mit Index auf timestamp.
+
+Füllt eine lokale SQLite-DB (oder per --db-url eine lokale MariaDB) mit Messwerten im Minutentakt
+und misst die Abfragen von /api/dashboard (get_since, get_latest) und der Retention vor und nach
+dem Anlegen von ix_measurements_timestamp_temperature_persons.
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.measurement_indexes --rows 2000000
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+
+from app.models.measurements import Measurements
+from benchmarks._common import DEFAULT_DB_URL, make_engine, reset_measurements, seed_measurements, time_call
+
+
+def _queries(since: datetime, cutoff: datetime) -> dict:
+    """Die SQL-Formen, die Repository und Services gegen measurements absetzen."""
+    m = Measurements
+    return {
+        "get_since (24h, alle Spalten)": select(m).where(m.timestamp >= since).order_by(m.timestamp.asc()),
+        "dashboard (24h, 3 Spalten)": (
+            select(m.timestamp, m.temperature, m.persons).where(m.timestamp >= since).order_by(m.timestamp.asc())
+        ),
+        "get_latest": select(m).order_by(m.timestamp.desc()).limit(1),
+        "retention (count < cutoff)": select(func.count()).select_from(m).where(m.timestamp < cutoff),
+    }
+
+
+def _measure(engine, queries: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            results[name] = time_call(lambda: conn.execute(stmt).fetchall(), repeat=repeat)
+    return results
+
+
+def _explain(engine, queries: dict) -> None:
+    """Zeigt bei SQLite den Query-Plan, damit die Index-Nutzung sichtbar ist."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+            print(f"  {name}: " + "; ".join(row[-1] for row in plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Anzahl Messwerte (Standard: 1000000)")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help=f"SQLAlchemy-URL (Standard: {DEFAULT_DB_URL})")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Abfrage (Median)")
+    args = parser.parse_args()
+
+    engine = make_engine(args.db_url)
+    now = datetime.now(timezone.utc)
+    queries = _queries(since=now - timedelta(hours=24), cutoff=now - timedelta(days=30))
+
+    print(f"Seeding {args.rows} rows into {engine.url.render_as_string(hide_password=True)} ...")
+    reset_measurements(engine, with_indexes=False)
+    seed_measurements(engine, args.rows, end=now)
+
+    before = _measure(engine, queries, args.repeat)
+    print("Query-Plan ohne Index:")
+    _explain(engine, queries)
+
+    for index in Measurements.__table__.indexes:
+        index.create(engine)
+    after = _measure(engine, queries, args.repeat)
+    print("Query-Plan mit Index:")
+    _explain(engine, queries)
+
+    print(f"\n{'query':<32}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in queries:
+        b, a = before[name] * 1000, after[name] * 1000
+        print(f"{name:<32}{b:>12.2f}{a:>12.2f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Benchmark-Suite für die heißen Pfade: Schätzer, Baseline, Repository-Abfragen, Dashboard-Payload, Video-Serializer.
+
+Jeder Fall wird wie bei timeit kalibriert (genug Schleifen für >= 0.2 s pro Messung) und mehrfach gemessen;
+gespeichert wird die Zeit pro Aufruf (Median und Minimum). Verglichen wird das Minimum, weil es am
+wenigsten von anderen Prozessen auf der Maschine abhängt. Die DB-Fälle laufen je Tabellengröße (--sizes)
+gegen eine lokale SQLite-Datei mit einem Messwert pro Minute; die Dateien werden wiederverwendet, damit
+große Stände (1M, 10M) nur einmal befüllt werden müssen. Mit --db-url-template auch gegen eine MariaDB.
+
+Ergebnisse liegen versioniert unter benchmarks/results/, eine Referenz pro CPU-Architektur (aarch64.json für den
+Pi, x86_64.json für Entwicklungsrechner), weil sich Zeiten nur auf derselben Maschine vergleichen lassen. Ohne
+--save wird gegen die Referenz der eigenen Architektur verglichen; Fälle, die um mehr als --threshold langsamer
+sind, werden markiert und beenden den Lauf mit Exit-Code 1.
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.suite                                  # Vergleich mit results/<Architektur>.json
+    uv run python -m benchmarks.suite --sizes 10000 1000000 10000000   # große Tabellen (dauert beim ersten Mal)
+    uv run python -m benchmarks.suite --save                           # neue Referenz für diese Architektur
+"""
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app import create_app
+from app.extensions.db import db
+from app.logic.occupancy_estimator import (
+    EstimatorPlan,
+    calculate_baseline_from_window,
+    estimate_people,
+    estimate_people_batch,
+)
+from app.logic.rooms import DEFAULT_ROOM_ID, DEFAULT_ROOM_SETTINGS
+from app.models.repositories import get_columns_since, get_latest, get_since
+from app.models.video_recording import VideoRecording
+from app.serializers import video_payload
+from benchmarks._common import reset_measurements, seed_measurements
+from benchmarks.estimator_batch import synthetic_history
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_BASELINE = RESULTS_DIR / f"{platform.machine() or 'unknown'}.json"
+DEFAULT_DB_URL_TEMPLATE = "sqlite:////tmp/asia-benchmark-{size}.sqlite"
+
+ROOM, CFG, BASELINE = DEFAULT_ROOM_SETTINGS.room, DEFAULT_ROOM_SETTINGS.model, DEFAULT_ROOM_SETTINGS.baseline
+
+
+def measure(fn: Callable[[], object], *, repeat: int, min_seconds: float = 0.2) -> Dict[str, float]:
+    """Zeit pro Aufruf in Sekunden (Median/Minimum über `repeat` kalibrierte Messungen)."""
+    timer = timeit.Timer(fn)
+    loops, elapsed = timer.autorange()
+    loops = max(1, int(loops * min_seconds / max(elapsed, 1e-9))) if elapsed < min_seconds else loops
+    samples = [seconds / loops for seconds in timer.repeat(repeat=repeat, number=loops)]
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "loops": loops}
+
+
+def _estimator_cases() -> List[Tuple[str, Callable[[], object]]]:
+    temps, rhs, gases = synthetic_history(10_000)
+    t, rh, gas = float(temps[0]), float(rhs[0]), float(gases[0])
+    plan = EstimatorPlan.compile(BASELINE, CFG, ROOM)
+    window = list(zip(temps[:90].tolist(), rhs[:90].tolist(), gases[:90].tolist()))
+    return [
+        ("estimator.estimate_people", lambda: estimate_people(t, rh, gas, BASELINE, CFG, ROOM)),
+        ("estimator.plan_estimate", lambda: plan.estimate(t, rh, gas)),
+        ("estimator.estimate_people_batch[10000]", lambda: estimate_people_batch(temps, rhs, gases, BASELINE, CFG, ROOM)),
+        ("estimator.calculate_baseline_from_window", lambda: calculate_baseline_from_window(window)),
+    ]
+
+
+def _video_cases() -> List[Tuple[str, Callable[[], object]]]:
+    now = datetime.now(timezone.utc)
+    videos = [
+        VideoRecording(
+            id=i,
+            recorded_at=now - timedelta(minutes=i),
+            duration_seconds=5,
+            bucket="restaurant-videos",
+            object_key=f"videos/2026/10/17/{i:06d}.mp4",
+            content_type="video/mp4",
+            size_bytes=2_000_000,
+            status="stored",
+            created_at=now - timedelta(minutes=i),
+            poster_key=f"videos/2026/10/17/{i:06d}.poster.jpg",
+            sprite_key=f"videos/2026/10/17/{i:06d}.sprite.jpg",
+            sprite_frames=10,
+        )
+        for i in range(25)
+    ]
+    return [
+        ("serializer.video_payload", lambda: video_payload(videos[0])),
+        ("serializer.video_page[25]", lambda: json.dumps([video_payload(v) for v in videos])),
+    ]
+
+
+def _ensure_rows(engine, rows: int) -> None:
+    """Befüllt die Tabelle nur, wenn sie nicht schon genau `rows` Messwerte enthält (Endzeitpunkt = jetzt)."""
+    from sqlalchemy import func, select
+
+    from app.models.measurements import Measurements
+
+    try:
+        with engine.connect() as conn:
+            count, newest = conn.execute(select(func.count(), func.max(Measurements.timestamp))).one()
+    except Exception:
+        count, newest = None, None
+    fresh = newest is not None and datetime.now() - newest.replace(tzinfo=None) < timedelta(hours=1)
+    if count == rows and fresh:
+        return
+    print(f"  seeding {rows} rows ...", file=sys.stderr)
+    reset_measurements(engine)
+    seed_measurements(engine, rows)
+
+
+def _db_cases(flask_app, size: int) -> List[Tuple[str, Callable[[], object]]]:
+    from app import routes
+
+    def payload():
+        # Regression über den linregress-Fallback, damit die Suite ohne Redis läuft
+        original = routes._dashboard_regression
+        routes._dashboard_regression = lambda rows, now, room_id: routes._linregress_payload(
+            [int(r.persons) for r in rows], [float(r.temperature) for r in rows]
+        )
+        try:
+            with flask_app.app_context():
+                body = flask_app.json.dumps(routes._dashboard_payload(datetime.now(timezone.utc), 500, 0, DEFAULT_ROOM_ID))
+                db.session.remove()
+                return body
+        finally:
+            routes._dashboard_regression = original
+
+    def in_context(fn):
+        def run():
+            with flask_app.app_context():
+                result = fn()
+                db.session.remove()  # Identity-Map wie am Ende eines Requests verwerfen
+                return result
+        return run
+
+    since = lambda: datetime.now(timezone.utc) - timedelta(hours=24)
+    return [
+        (f"repo.get_latest[{size}]", in_context(lambda: get_latest(DEFAULT_ROOM_ID))),
+        (f"repo.get_since_24h[{size}]", in_context(lambda: get_since(since(), DEFAULT_ROOM_ID))),
+        (f"repo.get_columns_since_24h[{size}]", in_context(
+            lambda: get_columns_since(since(), ("id", "timestamp", "temperature", "persons"), DEFAULT_ROOM_ID)
+        )),
+        (f"api.dashboard_payload[{size}]", payload),
+    ]
+
+
+def run_suite(args) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    def run_cases(cases):
+        for name, fn in cases:
+            if args.filter and not any(fnmatch.fnmatch(name, pattern) for pattern in args.filter):
+                continue
+            results[name] = measure(fn, repeat=args.repeat)
+            print(f"  {name:<48}{results[name]['median_s'] * 1e6:>14.1f} µs", file=sys.stderr)
+
+    run_cases(_estimator_cases())
+    run_cases(_video_cases())
+    for size in args.sizes:
+        flask_app = create_app({"SQLALCHEMY_DATABASE_URI": args.db_url_template.format(size=size)})
+        cases = _db_cases(flask_app, size)
+        if args.filter and not any(fnmatch.fnmatch(name, p) for name, _ in cases for p in args.filter):
+            continue
+        with flask_app.app_context():
+            _ensure_rows(db.engine, size)
+        run_cases(cases)
+    return results
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Druckt die Verhältnisse zur Referenz (Minimum pro Aufruf) und gibt die Namen der Regressionen zurück."""
+    regressions = []
+    print(f"{'case':<48}{'baseline µs':>14}{'current µs':>14}{'ratio':>8}")
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<48}{'-':>14}{current['min_s'] * 1e6:>14.1f}{'new':>8}")
+            continue
+        ratio = current["min_s"] / reference["min_s"]
+        flag = "  <-- langsamer" if ratio > threshold else ""
+        print(f"{name:<48}{reference['min_s'] * 1e6:>14.1f}{current['min_s'] * 1e6:>14.1f}{ratio:>7.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Tabellengrößen für die DB-Fälle")
+    parser.add_argument("--db-url-template", default=DEFAULT_DB_URL_TEMPLATE, help="SQLAlchemy-URL mit {size}-Platzhalter")
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen pro Fall (Standard: 5)")
+    parser.add_argument("--filter", nargs="+", default=None, help="Nur Fälle mit passendem Namen (Glob, z. B. 'repo.*')")
+    parser.add_argument(
+        "--save", type=Path, nargs="?", const=DEFAULT_BASELINE, default=None,
+        help=f"Ergebnisse als JSON speichern (ohne Pfad: neue Referenz {DEFAULT_BASELINE})",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"Referenz zum Vergleich (Standard: {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Ab diesem Faktor gilt ein Fall als Regression (Standard: 1.25)")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": _environment(),
+            "results": results,
+        }
+        args.save.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+        print(f"saved {len(results)} results to {args.save}")
+        return
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; create one with --save {args.baseline}")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    print(f"baseline: {baseline['created_at']} ({baseline['environment']['platform']}, Python {baseline['environment']['python']})")
+    if baseline["environment"]["machine"] != platform.machine():
+        print(f"warning: baseline is from {baseline['environment']['machine']}, this is {platform.machine()}")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.2f}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
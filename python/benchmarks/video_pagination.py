@@ -0,0 +1,81 @@
+"""
+Benchmark: Blättern in video_recordings per OFFSET vs. Keyset-Cursor auf (recorded_at, id).
+
+Füllt eine lokale SQLite-DB (oder per --db-url eine lokale MariaDB) mit Aufnahmen und misst die Abfrage
+einer Seite in zunehmender Tiefe. OFFSET muss alle übersprungenen Zeilen lesen, der Cursor springt direkt
+in den Index ix_video_recordings_recorded_at_id.
+
+Start (im Ordner python/):
+    uv run python -m benchmarks.video_pagination --rows 500000
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+
+from app.models.video_recording import VideoRecording
+from benchmarks._common import DEFAULT_DB_URL, make_engine, time_call
+
+
+def _seed(engine, rows: int, chunk_size: int = 50_000) -> None:
+    table = VideoRecording.__table__
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    start = datetime.now(timezone.utc) - timedelta(minutes=rows)
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk_size):
+            conn.execute(table.insert(), [
+                {
+                    "recorded_at": start + timedelta(minutes=i),
+                    "duration_seconds": 5,
+                    "bucket": "restaurant-videos",
+                    "object_key": f"videos/bench/{i}.mp4",
+                    "content_type": "video/mp4",
+                    "size_bytes": 300_000,
+                    "status": "failed" if i % 50 == 0 else "stored",
+                    "created_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + chunk_size, rows))
+            ])
+
+
+def _order(stmt):
+    v = VideoRecording
+    return stmt.order_by(v.recorded_at.desc(), v.id.desc())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Anzahl Aufnahmen (Standard: 200000)")
+    parser.add_argument("--page-size", type=int, default=25, help="Seitengröße (Standard: 25)")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help=f"SQLAlchemy-URL (Standard: {DEFAULT_DB_URL})")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Abfrage (Median)")
+    args = parser.parse_args()
+
+    engine = make_engine(args.db_url)
+    print(f"Seeding {args.rows} recordings into {engine.url.render_as_string(hide_password=True)} ...")
+    _seed(engine, args.rows)
+
+    v = VideoRecording
+    columns = select(v.id, v.recorded_at, v.status)
+    depths = [d for d in (0, 1_000, 10_000, 100_000, args.rows - args.page_size) if 0 <= d < args.rows]
+
+    print(f"\n{'depth':>10}{'offset ms':>12}{'keyset ms':>12}{'speedup':>10}")
+    with engine.connect() as conn:
+        for depth in depths:
+            offset_stmt = _order(columns).offset(depth).limit(args.page_size)
+            # Cursor = letzter Eintrag der vorherigen Seite (wie next_cursor der API)
+            anchor = conn.execute(_order(columns).offset(max(0, depth - 1)).limit(1)).one()
+            keyset_stmt = columns if depth == 0 else columns.where(
+                v.recorded_at <= anchor.recorded_at,
+                or_(v.recorded_at < anchor.recorded_at, v.id < anchor.id),
+            )
+            keyset_stmt = _order(keyset_stmt).limit(args.page_size)
+
+            offset_s = time_call(lambda: conn.execute(offset_stmt).fetchall(), repeat=args.repeat)
+            keyset_s = time_call(lambda: conn.execute(keyset_stmt).fetchall(), repeat=args.repeat)
+            print(f"{depth:>10}{offset_s * 1000:>12.2f}{keyset_s * 1000:>12.2f}{offset_s / keyset_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""add video thumbnails
+
+Revision ID: 3f6c9b1d8e42
+Revises: 9d4b6a2e1f57
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f6c9b1d8e42"
+down_revision = "9d4b6a2e1f57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("video_recordings", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("poster_key", sa.String(length=1024), nullable=True))
+        batch_op.add_column(sa.Column("sprite_key", sa.String(length=1024), nullable=True))
+        batch_op.add_column(sa.Column("sprite_frames", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("video_recordings", schema=None) as batch_op:
+        batch_op.drop_column("sprite_frames")
+        batch_op.drop_column("sprite_key")
+        batch_op.drop_column("poster_key")
@@ -0,0 +1,40 @@
+"""add measurement rollups
+
+Revision ID: 5e8a1f3c7b20
+Revises: c41e7d2f9a83
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5e8a1f3c7b20"
+down_revision = "c41e7d2f9a83"
+branch_labels = None
+depends_on = None
+
+METRICS = ("temperature", "humidity", "voc", "persons")
+
+
+def upgrade():
+    metric_columns = [
+        sa.Column(f"{metric}_{stat}", sa.Float(), nullable=False)
+        for metric in METRICS
+        for stat in ("min", "max", "sum", "sum_sq")
+    ]
+    op.create_table(
+        "measurement_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_seconds", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        *metric_columns,
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bucket_seconds", "bucket_start", name="uq_measurement_rollups_bucket"),
+    )
+
+
+def downgrade():
+    op.drop_table("measurement_rollups")
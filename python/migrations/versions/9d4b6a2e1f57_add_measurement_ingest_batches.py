@@ -0,0 +1,30 @@
+"""add measurement ingest batches
+
+Revision ID: 9d4b6a2e1f57
+Revises: 5e8a1f3c7b20
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4b6a2e1f57"
+down_revision = "5e8a1f3c7b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "measurement_ingest_batches",
+        sa.Column("batch_id", sa.String(length=32), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("batch_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("measurement_ingest_batches")
@@ -0,0 +1,41 @@
+"""add video recordings keyset indexes
+
+Revision ID: a7e2d94c1b36
+Revises: 3f6c9b1d8e42
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7e2d94c1b36"
+down_revision = "3f6c9b1d8e42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset-Pagination sortiert und sucht auf (recorded_at, id); id explizit im Index, damit auch
+    # der Tie-Break bei gleichem Zeitstempel ohne Filesort aus dem Index kommt.
+    op.create_index(
+        "ix_video_recordings_recorded_at_id",
+        "video_recordings",
+        ["recorded_at", "id"],
+        unique=False,
+    )
+    # Gleiches Keyset mit Statusfilter (z. B. nur failed), ohne über alle gespeicherten Clips zu laufen
+    op.create_index(
+        "ix_video_recordings_status_recorded_at_id",
+        "video_recordings",
+        ["status", "recorded_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_video_recordings_recorded_at", table_name="video_recordings")
+
+
+def downgrade():
+    op.create_index("ix_video_recordings_recorded_at", "video_recordings", ["recorded_at"], unique=False)
+    op.drop_index("ix_video_recordings_status_recorded_at_id", table_name="video_recordings")
+    op.drop_index("ix_video_recordings_recorded_at_id", table_name="video_recordings")
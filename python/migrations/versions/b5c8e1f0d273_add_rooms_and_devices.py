@@ -0,0 +1,113 @@
+"""add rooms and devices
+
+Revision ID: b5c8e1f0d273
+Revises: a7e2d94c1b36
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b5c8e1f0d273"
+down_revision = "a7e2d94c1b36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    rooms = op.create_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("slug", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("area_m2", sa.Float(), nullable=False),
+        sa.Column("height_m", sa.Float(), nullable=False),
+        sa.Column("ach_per_hour", sa.Float(), nullable=False),
+        sa.Column("v_ref_m3", sa.Float(), nullable=False),
+        sa.Column("ach_ref_per_hour", sa.Float(), nullable=False),
+        sa.Column("weight_gas", sa.Float(), nullable=False),
+        sa.Column("weight_hum", sa.Float(), nullable=False),
+        sa.Column("n_max", sa.Integer(), nullable=False),
+        sa.Column("i_ref_full", sa.Float(), nullable=False),
+        sa.Column("gas_temp_coeff_per_c", sa.Float(), nullable=False),
+        sa.Column("baseline_temperature_c", sa.Float(), nullable=False),
+        sa.Column("baseline_rh_percent", sa.Float(), nullable=False),
+        sa.Column("baseline_gas_resistance_ohm", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("slug"),
+    )
+    # Bisheriger Einzelraum mit den Konstanten aus tasks.py; alle vorhandenen Messwerte gehören zu ihm
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(rooms, [{
+        "id": 1,
+        "slug": "default",
+        "name": "Gastraum",
+        "area_m2": 180.0,
+        "height_m": 3.0,
+        "ach_per_hour": 2.0,
+        "v_ref_m3": 300.0,
+        "ach_ref_per_hour": 2.0,
+        "weight_gas": 0.8,
+        "weight_hum": 0.2,
+        "n_max": 125,
+        "i_ref_full": 0.20,
+        "gas_temp_coeff_per_c": 0.0,
+        "baseline_temperature_c": 21.0,
+        "baseline_rh_percent": 35.0,
+        "baseline_gas_resistance_ohm": 22000.0,
+        "created_at": now,
+        "updated_at": now,
+    }])
+
+    op.create_table(
+        "devices",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("device_key", sa.String(length=64), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("device_key"),
+    )
+    op.create_index("ix_devices_room_id", "devices", ["room_id"], unique=False)
+
+    with op.batch_alter_table("measurements", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("room_id", sa.Integer(), nullable=False, server_default="1"))
+        batch_op.create_foreign_key("fk_measurements_room_id", "rooms", ["room_id"], ["id"])
+    op.create_index(
+        "ix_measurements_room_timestamp_temperature_persons",
+        "measurements",
+        ["room_id", "timestamp", "temperature", "persons"],
+        unique=False,
+    )
+
+    with op.batch_alter_table("measurement_rollups", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("room_id", sa.Integer(), nullable=False, server_default="1"))
+        batch_op.drop_constraint("uq_measurement_rollups_bucket", type_="unique")
+        batch_op.create_unique_constraint(
+            "uq_measurement_rollups_room_bucket", ["room_id", "bucket_seconds", "bucket_start"]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("measurement_rollups", schema=None) as batch_op:
+        batch_op.drop_constraint("uq_measurement_rollups_room_bucket", type_="unique")
+        batch_op.create_unique_constraint("uq_measurement_rollups_bucket", ["bucket_seconds", "bucket_start"])
+        batch_op.drop_column("room_id")
+
+    op.drop_index("ix_measurements_room_timestamp_temperature_persons", table_name="measurements")
+    with op.batch_alter_table("measurements", schema=None) as batch_op:
+        batch_op.drop_constraint("fk_measurements_room_id", type_="foreignkey")
+        batch_op.drop_column("room_id")
+
+    op.drop_index("ix_devices_room_id", table_name="devices")
+    op.drop_table("devices")
+    op.drop_table("rooms")
@@ -0,0 +1,32 @@
+"""add measurements timestamp index
+
+Revision ID: c41e7d2f9a83
+Revises: 7b3a2c91e405
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c41e7d2f9a83"
+down_revision = "7b3a2c91e405"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ein Index für alle Zugriffe über die Zeit: timestamp vorne für Bereichsfilter/Sortierung
+    # (get_since, get_latest, Retention-Delete), temperature + persons dahinter, damit das
+    # Dashboard seine Spalten direkt aus dem Index lesen kann (Covering Index).
+    op.create_index(
+        "ix_measurements_timestamp_temperature_persons",
+        "measurements",
+        ["timestamp", "temperature", "persons"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_measurements_timestamp_temperature_persons", table_name="measurements")
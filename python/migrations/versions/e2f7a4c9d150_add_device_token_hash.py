@@ -0,0 +1,29 @@
+"""add device token hash
+
+Revision ID: e2f7a4c9d150
+Revises: b5c8e1f0d273
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e2f7a4c9d150"
+down_revision = "b5c8e1f0d273"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SHA-256 des API-Tokens (hex); der Klartext wird nur einmal beim Anlegen ausgegeben
+    with op.batch_alter_table("devices", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("token_hash", sa.String(length=64), nullable=True))
+        batch_op.create_index("ix_devices_token_hash", ["token_hash"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("devices", schema=None) as batch_op:
+        batch_op.drop_index("ix_devices_token_hash")
+        batch_op.drop_column("token_hash")
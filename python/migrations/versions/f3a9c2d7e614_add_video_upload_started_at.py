@@ -0,0 +1,29 @@
+"""add video upload started at
+
+Revision ID: f3a9c2d7e614
+Revises: e2f7a4c9d150
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3a9c2d7e614"
+down_revision = "e2f7a4c9d150"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Zeitpunkt, zu dem ein Upload-Task die Aufnahme übernommen hat (Status "uploading"); erkennt hängende Uploads
+    with op.batch_alter_table("video_recordings", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("upload_started_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    # Übernommene Uploads wieder einreihen, den Status "uploading" kennt die alte Version nicht
+    op.execute("UPDATE video_recordings SET status = 'pending_upload' WHERE status = 'uploading'")
+    with op.batch_alter_table("video_recordings", schema=None) as batch_op:
+        batch_op.drop_column("upload_started_at")
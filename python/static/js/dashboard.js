@@ -1,8 +1,13 @@
 (() => {
-    const apiUrl = "/api/dashboard";
+    // Raum aus der Seiten-URL (?room=Slug oder ID) an die API durchreichen
+    const room = new URLSearchParams(window.location.search).get("room");
+    const apiUrl = room ? `/api/dashboard?room=${encodeURIComponent(room)}` : "/api/dashboard";
     const videosUrl = "/api/videos?limit=25";
+    const streamUrl = "/api/stream";
     const locale = "de-DE";
     const pollMs = 30000;
+    const windowMs = 24 * 60 * 60 * 1000;
+    const maxVideos = 25;
 
     const navButtons = Array.from(document.querySelectorAll(".nav-btn"));
     const panels = Array.from(document.querySelectorAll("[data-panel]"));
@@ -17,6 +22,9 @@
     let activeView = "dashboard";
     let lastData = null;
     let lastVideos = [];
+    let nextVideoCursor = null;
+    let olderVideosLoaded = false;
+    let loadingOlderVideos = false;
     let selectedVideoId = null;
 
     function setActiveView(view) {
@@ -94,6 +102,8 @@
     let tempChart, scatterChart;
     let pollTimer = null;
     let inFlight = false;
+    let stream = null;
+    let streamLost = false;
 
     const fmtTime = (iso) =>
         new Date(iso).toLocaleString(locale, { hour: "2-digit", minute: "2-digit" });
@@ -105,14 +115,16 @@
     };
 
     async function loadDashboard(signal) {
-        const res = await fetch(apiUrl, { cache: "no-store", signal });
+        // "no-cache": Browser revalidiert per ETag, unveränderte Daten kommen als 304 ohne neuen Body.
+        const res = await fetch(apiUrl, { cache: "no-cache", signal });
         if (!res.ok) throw new Error("API Fehler: " + res.status);
         return await res.json();
     }
 
-    async function loadVideos(signal) {
+    async function loadVideos(signal, cursor = null) {
         // Separater API-Call, damit Messwerte/Charts und Videoverlauf unabhängig bleiben.
-        const res = await fetch(videosUrl, { cache: "no-store", signal });
+        const url = cursor ? `${videosUrl}&cursor=${encodeURIComponent(cursor)}` : videosUrl;
+        const res = await fetch(url, { cache: "no-store", signal });
         if (!res.ok) throw new Error("Video API Fehler: " + res.status);
         return await res.json();
     }
@@ -190,6 +202,8 @@
         }
 
         if (player.dataset.videoId !== String(video.id)) {
+            if (video.poster_url) player.poster = video.poster_url;
+            else player.removeAttribute("poster");
             player.src = video.play_url;
             player.dataset.videoId = String(video.id);
             player.load();
@@ -198,6 +212,34 @@
         metaEl.textContent = `${fmtDateTime(video.recorded_at)} · ${video.duration_seconds}s · ${fmtBytes(video.size_bytes)}`;
     }
 
+    function videoPreview(video) {
+        // Poster als Vorschau (wenige KB statt des Clips); mit Sprite zeigt Mausbewegung den Verlauf des Clips.
+        if (!video.poster_url && !video.sprite_url) return null;
+
+        const preview = document.createElement("div");
+        preview.className = "mb-2 aspect-video w-full overflow-hidden rounded-xl bg-black bg-no-repeat";
+        preview.style.backgroundSize = "cover";
+        preview.style.backgroundPosition = "center";
+        if (video.poster_url) preview.style.backgroundImage = `url("${video.poster_url}")`;
+
+        const frames = video.sprite_frames || 0;
+        if (video.sprite_url && frames > 1) {
+            preview.addEventListener("mousemove", (e) => {
+                const rect = preview.getBoundingClientRect();
+                const frame = Math.min(frames - 1, Math.floor(((e.clientX - rect.left) / rect.width) * frames));
+                preview.style.backgroundImage = `url("${video.sprite_url}")`;
+                preview.style.backgroundSize = `${frames * 100}% 100%`;
+                preview.style.backgroundPosition = `${(frame / (frames - 1)) * 100}% 0`;
+            });
+            preview.addEventListener("mouseleave", () => {
+                preview.style.backgroundImage = video.poster_url ? `url("${video.poster_url}")` : "";
+                preview.style.backgroundSize = "cover";
+                preview.style.backgroundPosition = "center";
+            });
+        }
+        return preview;
+    }
+
     function renderVideos(videos) {
         // Rendert die Historie und wählt automatisch den neuesten abspielbaren Clip aus.
         const listEl = document.getElementById("video-list");
@@ -215,6 +257,8 @@
 
         countEl.textContent = `${videos.length}`;
         emptyEl.hidden = videos.length > 0;
+        const moreEl = document.getElementById("video-more");
+        if (moreEl) moreEl.hidden = !nextVideoCursor;
         listEl.innerHTML = "";
 
         videos.forEach((video) => {
@@ -234,18 +278,21 @@
             timestamp.textContent = fmtDateTime(video.recorded_at);
 
             const status = document.createElement("div");
+            const pending = video.status === "pending_upload" || video.status === "uploading";
             status.className = video.status === "stored"
                 ? "text-xs text-emerald-300"
-                : "text-xs text-rose-300";
-            status.textContent = video.status === "stored" ? "Gespeichert" : "Fehler";
+                : pending ? "text-xs text-amber-300" : "text-xs text-rose-300";
+            status.textContent = video.status === "stored" ? "Gespeichert" : video.status === "uploading" ? "Upload läuft" : pending ? "Upload ausstehend" : "Fehler";
 
             const details = document.createElement("div");
             details.className = "mt-2 text-xs text-neutral-400";
-            details.textContent = video.status === "stored"
+            details.textContent = video.status === "stored" || pending
                 ? `${video.duration_seconds}s · ${fmtBytes(video.size_bytes)}`
                 : (video.error_message || "Aufnahme fehlgeschlagen");
 
             topRow.append(timestamp, status);
+            const preview = videoPreview(video);
+            if (preview) button.append(preview);
             button.append(topRow, details);
             button.addEventListener("click", () => {
                 selectedVideoId = video.id;
@@ -391,7 +438,16 @@
             try {
                 // Videos separat behandeln: Fehler im Videoverlauf sollen die Messwert-Charts nicht blockieren.
                 const videoData = await loadVideos(controller.signal);
-                lastVideos = videoData.videos || [];
+                const firstPage = videoData.videos || [];
+                if (olderVideosLoaded && firstPage.length) {
+                    // Nachgeladene ältere Seiten behalten, nur den Kopf der Liste erneuern.
+                    const oldest = firstPage[firstPage.length - 1];
+                    const older = lastVideos.filter((v) => compareVideos(v, oldest) > 0);
+                    lastVideos = [...firstPage, ...older];
+                } else {
+                    lastVideos = firstPage;
+                    nextVideoCursor = videoData.meta?.next_cursor || null;
+                }
                 if (activeView === "Videos") renderVideos(lastVideos);
             } catch (e) {
                 console.error(e);
@@ -410,13 +466,113 @@
         }, pollMs);
     }
 
+    function stopPolling() {
+        if (pollTimer) clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    function predict(regression, x) {
+        if (regression?.slope == null || regression?.intercept == null) return null;
+        return regression.slope * x + regression.intercept;
+    }
+
+    function applyMeasurements(update) {
+        // Delta aus dem Stream: neue Punkte anhängen, aus dem 24h-Fenster gefallene Punkte entfernen.
+        const items = update.measurements || [];
+        if (!lastData || !items.length) return;
+        // Der Stream enthält alle Räume; nur Messwerte des angezeigten Raums übernehmen
+        if ((update.room_id ?? 1) !== (lastData.meta?.room_id ?? 1)) return;
+
+        const line = lastData.line?.points || [];
+        const scatter = lastData.scatter?.points || [];
+        items.forEach((m) => {
+            line.push({ t: m.timestamp, temperature: m.temperature });
+            scatter.push({ x: m.persons, y: m.temperature });
+        });
+
+        const cutoff = Date.now() - windowMs;
+        const trimmed = line.filter((p) => new Date(p.t).getTime() >= cutoff);
+        // Scatterpunkte tragen keinen Zeitstempel; sie sind parallel zu den Linienpunkten aufgebaut.
+        while (scatter.length > trimmed.length) scatter.shift();
+
+        lastData.line = { points: trimmed };
+        lastData.scatter = { points: scatter };
+        lastData.current = items[items.length - 1];
+        if (update.regression) {
+            lastData.regression = update.regression;
+            lastData.predictions = {
+                p0: predict(update.regression, 0),
+                p60: predict(update.regression, 60),
+                p120: predict(update.regression, 120),
+            };
+        }
+
+        setKpis(lastData);
+        setRegression(lastData);
+        renderForView(activeView, lastData);
+    }
+
+    function compareVideos(a, b) {
+        // Gleiche Reihenfolge wie die API: recorded_at absteigend, bei Gleichstand id absteigend.
+        return new Date(b.recorded_at) - new Date(a.recorded_at) || b.id - a.id;
+    }
+
+    async function loadOlderVideos() {
+        // Keyset-Pagination: nächste Seite ab dem Cursor der letzten, gleich schnell egal wie weit zurück.
+        if (!nextVideoCursor || loadingOlderVideos) return;
+        loadingOlderVideos = true;
+        try {
+            const videoData = await loadVideos(undefined, nextVideoCursor);
+            const known = new Set(lastVideos.map((v) => v.id));
+            lastVideos = [...lastVideos, ...(videoData.videos || []).filter((v) => !known.has(v.id))];
+            nextVideoCursor = videoData.meta?.next_cursor || null;
+            olderVideosLoaded = true;
+            renderVideos(lastVideos);
+        } catch (e) {
+            console.error(e);
+        } finally {
+            loadingOlderVideos = false;
+        }
+    }
+
+    function applyVideo(video) {
+        // Neue oder aktualisierte Aufnahme einsortieren, statt den ganzen Verlauf neu zu laden.
+        const others = lastVideos.filter((v) => v.id !== video.id);
+        lastVideos = [video, ...others]
+            .sort(compareVideos)
+            .slice(0, olderVideosLoaded ? undefined : maxVideos);
+        if (activeView === "Videos") renderVideos(lastVideos);
+    }
+
+    function connectStream() {
+        // Push-Kanal; solange er steht, wird nicht gepollt. Bei Abbruch übernimmt das Polling.
+        if (!window.EventSource) return false;
+
+        stream = new EventSource(streamUrl);
+        stream.addEventListener("open", () => {
+            stopPolling();
+            // Nach einem Verbindungsabbruch verpasste Events per Vollabruf nachholen.
+            if (streamLost) refreshOnce();
+            streamLost = false;
+        });
+        stream.addEventListener("error", () => {
+            streamLost = true;
+            if (!pollTimer) startPolling();
+        });
+        stream.addEventListener("measurements", (e) => applyMeasurements(JSON.parse(e.data)));
+        stream.addEventListener("video", (e) => applyVideo(JSON.parse(e.data)));
+        return true;
+    }
+
     const btnRefresh = document.getElementById("btnRefresh");
     const btnRefreshTop = document.getElementById("btnRefreshTop");
     if (btnRefresh) btnRefresh.addEventListener("click", refreshOnce);
     if (btnRefreshTop) btnRefreshTop.addEventListener("click", refreshOnce);
+    const btnVideoMore = document.getElementById("video-more");
+    if (btnVideoMore) btnVideoMore.addEventListener("click", loadOlderVideos);
 
     applyChartDefaults();
     setActiveView("dashboard");
     refreshOnce();
-    startPolling();
+    if (!connectStream()) startPolling();
 })();